@@ -0,0 +1,209 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from functools import wraps
+from collections import defaultdict
+from typing import Any, Callable, Dict, List
+from root import ROOT_PATH
+from core.api.api_flow import Case
+from core.api.core import Context, Request
+from core.api.executor import Executor
+from utils.yaml_parse import read_yaml
+from utils.stub_server import StubServer
+from utils.allure_reports import CustomAllure
+
+BENCH_PATH = os.path.join(ROOT_PATH, "bench")
+
+# 需要计时的阶段：阶段名 -> (所属类, 方法名...)
+PHASES = {
+    "template": (Context, "parse_and_replace"),
+    "encode": (Request, "_encode"),
+    "record": (Request, "_record_request", "_record_response"),
+    "extract": (Request, "extractor"),
+    "validate": (Request, "validator"),
+}
+
+
+class PhaseTimer:
+    """按阶段累计单个用例一次执行中的耗时(纳秒)"""
+
+    def __init__(self):
+        self.current: Dict[str, int] = defaultdict(int)
+
+    def wrap(self, phase: str, function: Callable) -> Callable:
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.current[phase] += time.perf_counter_ns() - start
+
+        return timed
+
+    def take(self) -> Dict[str, int]:
+        current, self.current = self.current, defaultdict(int)
+        return current
+
+
+def _instrument(executor: Executor, timer: PhaseTimer):
+    """在执行器实例与 CustomAllure 上挂载计时包装，附件耗时包含在各阶段内单独列出"""
+    request = executor.request
+    for phase, (owner, *names) in PHASES.items():
+        target = request.context if owner is Context else request
+        for name in names:
+            setattr(target, name, timer.wrap(phase, getattr(target, name)))
+
+    session = request.context.session
+    session.request = timer.wrap("network", session.request)
+    CustomAllure.attach = timer.wrap("attach", CustomAllure.attach)
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def run(
+    iterations: int = 200,
+    warmup: int = 20,
+    attach_level: str = "full",
+    cases_file: str = os.path.join(BENCH_PATH, "cases.yaml"),
+    routes_file: str = os.path.join(BENCH_PATH, "stub_routes.yaml"),
+) -> Dict[str, Any]:
+    """
+    对桩服务循环执行基准用例，统计每个用例各阶段的框架开销
+
+    :param iterations: 计入统计的执行轮数
+    :type iterations: int
+    :param warmup: 预热轮数，不计入统计
+    :type warmup: int
+    :param attach_level: 附件详细程度
+    :type attach_level: str
+    :return: 用例名 -> 阶段 -> 平均耗时(微秒)，overhead 为总耗时减去网络耗时
+    :rtype: Dict[str, Any]
+    """
+    cases = [Case(**item) for item in read_yaml(cases_file)]
+    samples: Dict[str, Dict[str, List[float]]] = {
+        case.name: defaultdict(list) for case in cases
+    }
+
+    # 保存原始的类方法描述符，结束时还原
+    level, attach = CustomAllure.level, CustomAllure.__dict__["attach"]
+    CustomAllure.configure(level=attach_level)
+    timer = PhaseTimer()
+
+    try:
+        with StubServer(read_yaml(routes_file)) as server:
+            executor = Executor(Request(base_url=server.url))
+            _instrument(executor, timer)
+
+            for iteration in range(warmup + iterations):
+                for case in cases:
+                    start = time.perf_counter_ns()
+                    executor.execute_test_case(case)
+                    total = time.perf_counter_ns() - start
+                    phases = timer.take()
+                    if iteration < warmup:
+                        continue
+                    phases["total"] = total
+                    phases["overhead"] = total - phases.get("network", 0)
+                    for phase, value in phases.items():
+                        samples[case.name][phase].append(value / 1000)
+            executor.request.context.session.close()
+    finally:
+        CustomAllure.attach = attach
+        CustomAllure.configure(level=level)
+
+    return {
+        name: {
+            phase: {
+                "mean": round(statistics.fmean(values), 1),
+                "p50": round(_percentile(values, 50), 1),
+                "p95": round(_percentile(values, 95), 1),
+            }
+            for phase, values in phases.items()
+        }
+        for name, phases in samples.items()
+    }
+
+
+def compare(
+    result: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.2,
+    floor: float = 50,
+) -> List[str]:
+    """
+    与基线比较各用例的框架开销中位数
+
+    :param tolerance: 允许的相对增长比例
+    :type tolerance: float
+    :param floor: 忽略的绝对增长(微秒)，避免测量噪声误报
+    :type floor: float
+    :return: 回归描述列表，为空表示通过
+    :rtype: List[str]
+    """
+    regressions = []
+    for name, phases in result.items():
+        if name not in baseline:
+            continue
+        current = phases["overhead"]["p50"]
+        expected = baseline[name]["overhead"]["p50"]
+        if current > expected * (1 + tolerance) and current - expected > floor:
+            regressions.append(
+                f"{name}: 框架开销 {current}µs, 基线 {expected}µs "
+                f"(+{(current / expected - 1):.0%})"
+            )
+    return regressions
+
+
+def _print_report(result: Dict[str, Any]):
+    columns = ["template", "encode", "record", "extract", "validate", "attach"]
+    columns += ["network", "overhead", "total"]
+    print(f"{'用例(平均µs)':<12}" + "".join(f"{c:>10}" for c in columns))
+    for name, phases in result.items():
+        values = "".join(
+            f"{phases[c]['mean'] if c in phases else 0:>10}" for c in columns
+        )
+        print(f"{name:<12}{values}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="执行器框架开销基准测试")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--attach-level",
+        default="full",
+        choices=["off", "summary", "on-failure", "full"],
+    )
+    parser.add_argument("-o", "--output", default=None, help="结果JSON文件路径")
+    parser.add_argument(
+        "--baseline", default=None, help="基线JSON文件，超出时退出码为1"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的增长比例")
+    args = parser.parse_args(argv)
+
+    result = run(args.iterations, args.warmup, args.attach_level)
+    _print_report(result)
+
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if args.baseline:
+        with open(args.baseline, mode="r", encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"[回归] {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
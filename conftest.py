@@ -1,20 +1,34 @@
 import os
 import pytest
 from pathlib import Path
+from root import ROOT_PATH
 from configs import configure
-from core.api.core import Request
-from core.api.executor import Executor
+from core.api.core import AsyncRequest, Request
+from core.api.cassette import Cassette, CassetteAdapter, CassetteMode, use_cassette
+from core.api.executor import AsyncExecutor, Executor
+from core.api.transport import TimedAdapter, adapter_options, pool_stats
+from utils.db_sever import close_pools
 from utils.yaml_parse import read_yaml
+from utils.case_cache import read_cases
+from utils.shared_cache import SharedCache, WORKER_ENV
+from utils.metrics import metrics
+from utils import sharding
+from utils.history import HistoryStore, response_log
 from core.api.settings import Configuration
 from utils.allure_reports import CustomAllure
 
+# 运行历史：(历史记录库, 运行编号, 环境名称)
+HISTORY_KEY = pytest.StashKey[tuple]()
+# 本次运行是否使用了接口请求夹具
+API_KEY = pytest.StashKey[bool]()
+
 
 # 注册自定义标记
 def pytest_configure(config):
 
     config.addinivalue_line("markers", "demo: demo标记.")
     config.addinivalue_line("markers", "env(name): 环境标记.")
-    config.addinivalue_line("markers", "data(file): 数据标记.")
+    config.addinivalue_line("markers", "data(file, group=False): 数据标记.")
 
 
 # 设置环境变量
@@ -24,21 +38,67 @@ def env(request):
     environment = request.config.getoption("-E", default="local")
 
     config = read_yaml(configure.settings).get(environment)
+    configuration = Configuration(**config)
+
+    # 设置报告附件详细程度，命令行参数优先
+    report = configuration.report
+    CustomAllure.configure(
+        level=request.config.getoption("--attach-level") or report.verbosity,
+        max_body_size=report.max_body_size,
+        oversize=report.oversize,
+        buffer_size=report.buffer_size,
+    )
 
     CustomAllure.attach(config, f"读取配置文件设置环境: {environment}", "json")
 
-    return Configuration(**config)
+    return configuration
+
+
+# 录制回放夹具
+@pytest.fixture(scope="session")
+def cassette(request):
+    """根据 --cassette 选项加载录制文件，录制模式在会话结束时保存"""
+    mode = request.config.getoption("--cassette")
+    if mode == CassetteMode.OFF:
+        return None
+
+    path = request.config.getoption("--cassette-path") or os.path.join(
+        "tests", "cassettes", f"{request.config.getoption('-E')}.jsonl.gz"
+    )
+    _cassette = Cassette(os.path.join(ROOT_PATH, path))
+    if mode == CassetteMode.RECORD:
+        _cassette.clear()
+        request.addfinalizer(_cassette.save)
+
+    return CassetteAdapter(_cassette, mode)
 
 
 # 定义测试夹具
 @pytest.fixture(scope="session")
-def api(env):
+def api(env, cassette, request):
+
+    # 加载变量，命令行参数优先于环境配置
+    compress = request.config.getoption("--compress") or env.server.compress
+    req = Request(
+        base_url=env.server.url, compress=compress, timeout=env.server.timeout
+    )
 
-    # 加载变量
-    req = Request(base_url=env.server.url)
+    # 协商响应压缩方式
+    if env.server.accept_encoding:
+        req.context.session.headers["Accept-Encoding"] = env.server.accept_encoding
+
+    # 按环境配置挂载连接池，录制或回放请求时使用相同配置
+    pool = adapter_options(env.server.pool)
+    if cassette:
+        use_cassette(req.context.session, cassette.cassette, cassette.mode, **pool)
+    else:
+        adapter = TimedAdapter(**pool)
+        req.context.session.mount("http://", adapter)
+        req.context.session.mount("https://", adapter)
 
     # 设置环境变量
     req.context.variables.setdefault("data-source", env.data_source.copy())
+    request.config.stash[API_KEY] = True
 
     CustomAllure.attach(env, "初始化配置配置", "json")
 
@@ -57,8 +117,11 @@ def executor(api, request):
         # 清理
         api.context.session.close()
         api.context.variables.clear()
+        close_pools()
 
         CustomAllure.attach("执行器资源释放完成", "执行器资源释放完成", "txt")
+        CustomAllure.attach(pool_stats(), "连接池统计", "json")
+        CustomAllure.flush()
 
         print("\r\n====== Teardown =======")
 
@@ -67,7 +130,153 @@ def executor(api, request):
 
     CustomAllure.attach("执行器初始化完成", "初始化执行器", "txt")
 
-    return Executor(request=api)
+    # 多进程运行时共享登录令牌等提取变量
+    return Executor(request=api, shared_cache=SharedCache.from_env())
+
+
+# 定义异步执行器夹具
+@pytest.fixture(scope="session")
+def async_executor(env, api, cassette, request):
+    """并发执行器fixture，与同步执行器共享会话与变量"""
+    limit = request.config.getoption("--concurrency")
+
+    req = AsyncRequest(
+        base_url=api.base_url,
+        context=api.context,
+        compress=api.compress,
+        timeout=api.timeout,
+        limit=limit,
+    )
+
+    request.addfinalizer(req.close)
+
+    CustomAllure.attach(f"并发数: {limit}", "初始化并发执行器", "txt")
+
+    executor = AsyncExecutor(
+        request=req,
+        pool=adapter_options(env.server.pool),
+        shared_cache=SharedCache.from_env(),
+    )
+
+    # 并发执行器会重新挂载连接池，录制回放适配器需按相同配置重新挂载
+    if cassette:
+        use_cassette(
+            req.context.session, cassette.cassette, cassette.mode, **executor.pool
+        )
+
+    return executor
+
+
+# 附件写入夹具
+@pytest.fixture(autouse=True)
+def flush_attachments():
+    """每个测试结束时等待后台附件写入完成，保证报告完整"""
+    yield
+    CustomAllure.flush()
+
+
+# 开始记录运行历史
+def pytest_sessionstart(session):
+    config = session.config
+    if config.getoption("--no-history") or config.option.collectonly:
+        return
+    # 回放的响应不经过网络，耗时与结果不代表服务的真实表现
+    if config.getoption("--cassette") == CassetteMode.REPLAY:
+        return
+
+    env = config.getoption("-E")
+    store = HistoryStore()
+    config.stash[HISTORY_KEY] = (store, store.start_run(env), env)
+    response_log.enabled = True
+
+
+# 测试失败时写入暂存的详细附件，测试结束时丢弃
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    report = (yield).get_result()
+    if report.failed:
+        CustomAllure.release()
+    if report.when == "teardown":
+        CustomAllure.discard()
+
+    # 记录测试结果与请求耗时，前置失败或跳过时没有执行阶段
+    history = item.config.stash.get(HISTORY_KEY, None)
+    executed = report.when == "call" or (report.when == "setup" and not report.passed)
+    if history and executed:
+        store, run_id, env = history
+        store.add_result(
+            run_id,
+            env,
+            item.nodeid,
+            report.outcome,
+            report.duration,
+            response_log.drain(),
+        )
+
+
+# 按历史耗时分片与排序
+def pytest_collection_modifyitems(session, config, items):
+    shard = config.getoption("--shard")
+    slowest_first = config.getoption("--slowest-first")
+    if not (shard or slowest_first):
+        return
+
+    try:
+        shard = sharding.parse_shard(shard) if shard else None
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+    store = HistoryStore()
+    try:
+        durations = store.durations(config.getoption("-E"))
+    finally:
+        store.close()
+
+    by_id = {item.nodeid: item for item in items}
+    selected = sharding.plan(list(by_id), durations, shard, slowest_first)
+
+    chosen = set(selected)
+    deselected = [item for item in items if item.nodeid not in chosen]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+    items[:] = [by_id[nodeid] for nodeid in selected]
+
+
+# 会话结束时写入剩余附件并导出执行指标
+def pytest_sessionfinish(session):
+    CustomAllure.flush()
+
+    history = session.config.stash.get(HISTORY_KEY, None)
+    if history:
+        history[0].close()
+
+    if metrics:
+        # 多进程运行时每个进程单独导出
+        worker = os.environ.get(WORKER_ENV)
+        metrics.export(
+            os.path.join(ROOT_PATH, "report", "metrics"),
+            f"metrics-{worker}" if worker else "metrics",
+        )
+
+
+# 会话结束时输出连接池统计，复用率低或等待较多时应调整连接池配置
+# 仅在使用了接口请求夹具时输出，普通单元测试不显示
+def pytest_terminal_summary(terminalreporter):
+    if not terminalreporter.config.stash.get(API_KEY, False):
+        return
+    stats = pool_stats()
+    if not stats:
+        return
+    terminalreporter.write_sep("=", "connection pool")
+    columns = ("host", "created", "reused", "expired", "discarded", "waited")
+    terminalreporter.write_line(
+        "".join(f"{c:>12}" for c in columns) + f"{'wait(s)':>12}{'reuse':>8}"
+    )
+    for row in stats:
+        terminalreporter.write_line(
+            "".join(f"{row[c]!s:>12}" for c in columns)
+            + f"{round(row['wait_seconds'], 3):>12}{row['reuse_ratio']!s:>8}"
+        )
 
 
 # 添加命令行选项
@@ -79,6 +288,64 @@ def pytest_addoption(parser):
         default="test",
         help="only run test matching the environment NAME.",
     )
+    parser.addoption(
+        "--attach-level",
+        action="store",
+        metavar="LEVEL",
+        default=None,
+        choices=["off", "summary", "on-failure", "full"],
+        help="allure attachment verbosity, overrides report.verbosity in settings.",
+    )
+    parser.addoption(
+        "--concurrency",
+        action="store",
+        type=int,
+        metavar="N",
+        default=10,
+        help="max number of in-flight requests for the async executor.",
+    )
+    parser.addoption(
+        "--compress",
+        action="store",
+        metavar="ENCODING",
+        default=None,
+        choices=["gzip", "deflate", "identity"],
+        help="compress request bodies, overrides server.compress in settings.",
+    )
+    parser.addoption(
+        "--cassette",
+        action="store",
+        metavar="MODE",
+        default=CassetteMode.OFF,
+        choices=[CassetteMode.OFF, CassetteMode.RECORD, CassetteMode.REPLAY],
+        help="record responses to, or replay them from, the cassette file.",
+    )
+    parser.addoption(
+        "--cassette-path",
+        action="store",
+        metavar="PATH",
+        default=None,
+        help="cassette file, defaults to tests/cassettes/<env>.jsonl.gz.",
+    )
+    parser.addoption(
+        "--no-history",
+        action="store_true",
+        default=False,
+        help="do not record the run history, replay runs are never recorded.",
+    )
+    parser.addoption(
+        "--shard",
+        action="store",
+        metavar="I/N",
+        default=None,
+        help="only run shard I of N, balanced by historical durations.",
+    )
+    parser.addoption(
+        "--slowest-first",
+        action="store_true",
+        default=False,
+        help="run the slowest test groups first, by historical durations.",
+    )
 
 
 # 根据环境变量跳过测试
@@ -95,6 +362,7 @@ def pytest_generate_tests(metafunc):
 
     当测试或类上使用了 `@pytest.mark.data('case')` 时，读取 `tests/test_data/case.yml` 或
     `case.yaml` 并把读取到的列表传给 `parametrize("data", dataset)`。
+    使用 `@pytest.mark.data('case', group=True)` 时整个列表作为一个参数传入。
     """
     data_mark = getattr(metafunc.definition, "get_closest_marker", None)
     if not data_mark:
@@ -121,5 +389,13 @@ def pytest_generate_tests(metafunc):
         metafunc.parametrize("data", [])
         return
 
-    dataset = read_yaml(data_file_candidate) or []
+    # 使用编译用例缓存，未启用 pytest 缓存插件时直接解析yaml
+    cache = getattr(metafunc.config, "cache", None)
+    cache_dir = cache.mkdir("case_cache") if cache else None
+    dataset = read_cases(data_file_candidate, cache_dir) or []
+
+    # group=True 时整个文件作为一个参数，交由流程调度器统一编排
+    if marker.kwargs.get("group"):
+        dataset = [dataset]
+
     metafunc.parametrize("data", dataset)
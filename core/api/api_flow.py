@@ -1,6 +1,8 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Union
+from functools import cached_property
 from utils.yaml_parse import read_yaml
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+from core.api.template import Template, compile_template
 
 
 @dataclass
@@ -15,11 +17,17 @@ class ReqestParameter:
     data: Dict[str, Any] = None
     cookies: Dict[str, Any] = None
     files: Dict[str, object] = None
-    # timeout: int = 15
+    # 超时(秒)，单个数值或 [连接超时, 读取超时]，为空时使用环境配置
+    timeout: Union[float, List[float]] = None
 
     def __post_init__(self):
         self.method = self.method.upper()
 
+    @cached_property
+    def template(self) -> Template:
+        """请求参数模板，首次访问时编译并缓存"""
+        return compile_template(asdict(self))
+
 
 @dataclass
 class Case:
@@ -32,10 +40,24 @@ class Case:
     request: ReqestParameter = field(default_factory=ReqestParameter)
     precondition: Dict[str, Any] = None
     postcondition: Dict[str, Any] = None
+    depends: List[str] = None
+    # 数据驱动的数据表，如 {file: tests/test_data/tables/users.csv, limit: 1000}
+    dataset: Union[str, Dict[str, Any]] = None
+    # 多进程运行时提取变量的共享有效期(秒)，如登录令牌
+    cache_ttl: int = None
+    # 流式读取响应，只查找提取与断言用到的字段，适用于体积很大的JSON响应
+    stream: bool = False
+    # 请求体压缩方式 ['gzip','deflate']，覆盖全局配置，identity 表示不压缩
+    compress: str = None
 
     def __post_init__(self):
         self.request = ReqestParameter(**self.request)
 
+    @cached_property
+    def validate_template(self) -> Template:
+        """验证信息模板，数据驱动时用于将数据行绑定到期望值中"""
+        return compile_template(self.validate)
+
 
 @dataclass
 class Information:
@@ -43,6 +65,12 @@ class Information:
 
     project: str = field(default="Project")
     module: str = field(default="Module")
+    # 流程总时限(秒)，超时后未完成的步骤取消并标记为超时
+    deadline: float = None
+    # 流程标识(用例文件路径)、当前步骤序号与步骤总数，读取用例文件时填充
+    flow: str = None
+    step: int = None
+    steps: int = None
 
 
 @dataclass
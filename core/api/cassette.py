@@ -0,0 +1,251 @@
+import io
+import os
+import re
+import gzip
+import json
+import base64
+import hashlib
+import time
+import threading
+from datetime import timedelta
+from functools import partial
+from types import SimpleNamespace
+from http.client import HTTPMessage
+from urllib3 import HTTPResponse
+from collections import defaultdict
+from typing import Any, Dict, List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from requests import PreparedRequest, Response, Session
+from requests.exceptions import ConnectionError
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from core.api.transport import TimedAdapter
+from utils.multipart import MultipartEncoder
+
+_BOUNDARY = re.compile(r"boundary=([^;\s]+)")
+
+
+class CassetteMode:
+    """录制回放模式"""
+
+    OFF = "off"  # 直接请求服务
+    RECORD = "record"  # 请求服务并录制响应
+    REPLAY = "replay"  # 只从录制文件回放，不访问服务
+
+
+class CassetteMissError(ConnectionError):
+    """回放模式下没有匹配的录制记录"""
+
+
+def _normalize_url(url: str) -> str:
+    """协议与主机名转为小写，查询参数按名称排序"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit(
+        (parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, "")
+    )
+
+
+def _body_digest(request: PreparedRequest) -> str:
+    body = request.body
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if isinstance(body, MultipartEncoder):
+        # 上传文件不读取内容，按字段、文件名与文件大小匹配
+        return body.fingerprint()
+    if not isinstance(body, bytes):
+        # 其他流式请求体无法在发送前读取，只按方法与地址匹配
+        return "stream"
+
+    # multipart 的分隔符每次随机生成，计算摘要前统一替换
+    match = _BOUNDARY.search(request.headers.get("Content-Type", ""))
+    if match:
+        body = body.replace(match.group(1).encode(), b"boundary")
+    return hashlib.sha1(body).hexdigest()
+
+
+def _restore_elapsed(elapsed: timedelta, response: Response, **kwargs) -> Response:
+    """会话在适配器返回后以本地耗时覆盖 elapsed，响应钩子在其后执行，恢复录制时的耗时"""
+    response.elapsed = elapsed
+    return response
+
+
+def request_key(request: PreparedRequest) -> str:
+    """
+    计算请求的录制键：方法 + 规范化URL + 请求体摘要
+
+    :param request: 已准备的请求
+    :type request: PreparedRequest
+    """
+    return "|".join(
+        (request.method.upper(), _normalize_url(request.url), _body_digest(request))
+    )
+
+
+class Cassette:
+    """
+    录制文件，gzip压缩的JSON Lines，每行一条请求的响应
+
+    同一请求键的多次响应按录制顺序回放，回放完后重复最后一条。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursor: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, mode="rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[entry["key"]].append(entry)
+
+    def save(self):
+        """原子写入录制文件"""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with self._lock, gzip.open(tmp_path, mode="wt", encoding="utf-8") as f:
+            for entries in self._entries.values():
+                for entry in entries:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def find(self, key: str) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                return None
+            index = min(self._cursor[key], len(entries) - 1)
+            self._cursor[key] += 1
+            return entries[index]
+
+    def clear(self):
+        """重新录制前清空旧记录"""
+        with self._lock:
+            self._entries.clear()
+            self._cursor.clear()
+            self.dirty = True
+
+    def record(self, key: str, response: Response):
+        content = response.content or b""
+        try:
+            body, encoding = content.decode("utf-8"), "text"
+        except UnicodeDecodeError:
+            body, encoding = base64.b64encode(content).decode("ascii"), "base64"
+
+        entry = {
+            "key": key,
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            "body": body,
+            "encoding": encoding,
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        with self._lock:
+            self._entries[key].append(entry)
+            self.dirty = True
+
+
+class CassetteAdapter(TimedAdapter):
+    """
+    录制回放传输适配器，挂载到 :attr:`Context.session` 上
+
+    录制模式下正常发送请求并保存响应；回放模式下直接从内存中的录制记录构造响应，
+    响应经过与真实请求相同的提取与断言逻辑。
+    """
+
+    def __init__(self, cassette: Cassette, mode: str = CassetteMode.REPLAY, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.mode = mode
+
+    def send(self, request: PreparedRequest, **kwargs) -> Response:
+        key = request_key(request)
+
+        if self.mode == CassetteMode.REPLAY:
+            entry = self.cassette.find(key)
+            if entry is None:
+                raise CassetteMissError(
+                    f"录制文件中没有匹配的请求: {key}", request=request
+                )
+            return self._build(request, entry)
+
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        if self.mode == CassetteMode.RECORD:
+            # 会话在适配器返回后才设置 elapsed，录制时在此计时
+            response.elapsed = timedelta(seconds=time.perf_counter() - start)
+            self.cassette.record(key, response)
+        return response
+
+    def _build(self, request: PreparedRequest, entry: Dict[str, Any]) -> Response:
+        response = Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        # 录制时响应已解压，回放时去掉压缩与分块相关的响应头
+        headers = CaseInsensitiveDict(entry["headers"])
+        for name in ("Content-Encoding", "Transfer-Encoding"):
+            headers.pop(name, None)
+        response.headers = headers
+        body = entry["body"]
+        response._content = (
+            base64.b64decode(body)
+            if entry["encoding"] == "base64"
+            else body.encode("utf-8")
+        )
+        response.encoding = get_encoding_from_headers(headers)
+        # 构造原始响应，会话可按录制的 Set-Cookie 更新 cookies
+        message = HTTPMessage()
+        for name, value in headers.items():
+            message[name] = value
+        response.raw = HTTPResponse(
+            body=io.BytesIO(response._content),
+            headers=dict(headers),
+            status=response.status_code,
+            reason=response.reason,
+            preload_content=False,
+            original_response=SimpleNamespace(msg=message),
+        )
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.elapsed = timedelta(seconds=entry.get("elapsed", 0))
+        response.replayed = True
+        request.hooks["response"].append(partial(_restore_elapsed, response.elapsed))
+        return response
+
+
+def use_cassette(session: Session, cassette: Cassette, mode: str, **kwargs):
+    """
+    在会话上挂载录制回放适配器
+
+    :param session: 请求会话
+    :type session: Session
+    :param cassette: 录制文件
+    :type cassette: Cassette
+    :param mode: 录制回放模式 ['record','replay']
+    :type mode: str
+    :param kwargs: 传递给 :class:`TimedAdapter` 的连接池参数
+    """
+    adapter = CassetteAdapter(cassette, mode, **kwargs)
+    if mode == CassetteMode.REPLAY:
+        # 回放不访问网络，跳过代理与 netrc 等环境配置的查找
+        session.trust_env = False
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return adapter
@@ -1,13 +1,33 @@
-import re
-import json
-import jsonpath
-from urllib.parse import urljoin
-from typing import Any, Dict, List
+import time
+import asyncio
+import threading
+from urllib.parse import urljoin, urlsplit
+from typing import Any, Callable, Dict, List, Mapping, Tuple
 from requests import Response, Session
+from requests.exceptions import ConnectTimeout, Timeout
 from utils.assertions import Assertions
 from core.api.settings import DataSource
+from core.api.response import STREAM_CHUNK_SIZE, ResponseView, StreamedResponseView
+from functools import partial
+from contextlib import nullcontext
 from dataclasses import dataclass, field
+from concurrent.futures import Future, ThreadPoolExecutor
 from utils.allure_reports import CustomAllure
+from core.api.template import compile_template
+from core.api.transport import timed_session
+from utils.metrics import metrics
+from utils.multipart import MultipartEncoder, multipart_headers
+from utils.compression import compress_request
+
+# 请求内部阶段耗时：网络、响应解码与报告记录
+REQUEST_PHASE_METRIC = "request_phase_seconds"
+# 文件上传字节数与耗时，二者之比即上传吞吐量
+UPLOAD_BYTES_METRIC = "http_upload_bytes_total"
+UPLOAD_SECONDS_METRIC = "http_upload_seconds"
+# 请求体字节数，kind=raw 为压缩前、kind=wire 为实际发送的字节数
+REQUEST_BYTES_METRIC = "http_request_bytes_total"
+# 请求超时次数，kind=connect 为连接超时、kind=read 为读取超时
+TIMEOUT_METRIC = "http_timeouts_total"
 
 
 class ValidateMessage:
@@ -28,73 +48,52 @@ class ValidateStatus:
 class Context:
 
     variables: Dict[str, Any] = field(default_factory=dict)
-    session: Session = field(default_factory=Session)
-
-    def _replace(self, data: Any) -> Any:
-        if isinstance(data, dict):
-            data = {k: self._replace(v) for k, v in data.items()}
-        if isinstance(data, list):
-            data = [self._replace(item) for item in data]
-        if isinstance(data, str):
-            for placeholder in ["${%s}", "{{%s}}"]:
-                for k, v in self.variables.items():
-                    key = placeholder % k
-                    if key in data:
-                        data = data.replace(key, str(v))
-        return data
-
-    def parse_and_replace(self, data: Any):
-        """
-        解析Yaml中的使用占位符占位的变量，并替换为目标值。
+    session: Session = field(default_factory=timed_session)
 
-        :param data: 含有占位符的任意类型数据
-        :type data: Any
+    def _call(self, function: str, params: List[str]) -> Any:
         """
+        利用反射调用占位函数，如 ${access_token()}
 
-        data_str = (
-            data
-            if isinstance(data, str)
-            else json.dumps(data, indent=2, ensure_ascii=False)
-        )
-
-        if "${" in data_str and "}" in data_str:
-
-            CustomAllure.attach(data_str, "原始变量", "json")
+        :param function: 函数名
+        :type function: str
+        :param params: 函数参数
+        :type params: List[str]
+        """
+        value = getattr(self, function)(*params)
 
-            for _ in range(data_str.count("${")):
-                start_index = data_str.index("$")
-                end_index = data_str.index("}", start_index)
-                variable = data_str[start_index : end_index + 1]
+        log = {"function": function, "params": params, "result": value}
+        CustomAllure.attach(log, "提取并执行占位函数", "json", detail=True)
 
-                # 正则提取变量
-                match = re.match(r"\$\{(\w+)\((.*?)\)\}", variable)
+        return value
 
-                if match:
+    def parse_and_replace(self, data: Any, variables: Mapping[str, Any] = None):
+        """
+        解析Yaml中的使用占位符占位的变量，并替换为目标值。
 
-                    function, params = match.groups()
-                    params = params.split(",") if params else []
+        支持 ``${var}`` 、 ``{{var}}`` 与 ``${func(args)}`` 三种占位符，模板只编译一次，
+        整个字段仅为一个占位符时保留变量的原始类型。
 
-                    # 利用反射调用获参数值的方法
-                    value = getattr(self, function)(*params)
+        :param data: 含有占位符的任意类型数据或已编译的模板
+        :type data: Any
+        :param variables: 替换使用的变量，默认为上下文变量；数据驱动时传入数据行与上下文变量的组合
+        :type variables: Mapping[str, Any]
+        """
 
-                    # 替换原始数值
-                    data_str = re.sub(re.escape(variable), str(value), data_str)
+        template = compile_template(data)
+        variables = self.variables if variables is None else variables
 
-                    log = {
-                        "match": str(match),
-                        "function": function,
-                        "params": params,
-                        "result": value,
-                    }
+        if not template.placeholders:
+            return template.render(variables)
 
-                    CustomAllure.attach(log, "提取并执行占位函数", "json")
+        CustomAllure.attach(template.source, "原始变量", "json", detail=True)
 
-                if not match:
-                    data_str = self._replace(data_str)
+        result = template.render(variables, self._call)
 
-            CustomAllure.attach(data_str, "替换变量值", "json")
+        # 附件以引用方式记录，请求参数随后还会加入流式读取、超时等配置，记录副本
+        snapshot = dict(result) if isinstance(result, dict) else result
+        CustomAllure.attach(snapshot, "替换变量值", "json", detail=True)
 
-        return json.loads(data_str)
+        return result
 
     def access_token(self):
         return self.variables.get("access_token")
@@ -106,10 +105,14 @@ class Request:
 
     base_url: str = field(default="")
     context: Context = field(default_factory=Context)
+    # 全局请求体压缩方式 ['gzip','deflate']，用例中的 compress 优先
+    compress: str = field(default=None)
+    # 全局超时(秒)，单个数值或 [连接超时, 读取超时]，用例中的 timeout 优先
+    timeout: Any = field(default=None)
 
     def request(
         self, method: str, path: str, files: Any = None, **kwargs: Dict[str, Any]
-    ) -> Response:
+    ) -> ResponseView:
         """
         发送http请求
 
@@ -120,30 +123,161 @@ class Request:
         :param kwargs: 由请求参数组装的字典
         :type kwargs: Dict[str, Any]
         :return: 请求响应结果
-        :rtype: Response
+        :rtype: ResponseView
         """
 
         # 构建完整URL
         url = self._build_url(path)
 
         # 记录请求信息
-        self._record_request(method, url, **kwargs)
+        with metrics.timer(REQUEST_PHASE_METRIC, phase="record"):
+            self._record_request(method, url, **kwargs)
 
         # 发送请求
-        response = self.context.session.request(method, url, files=files, **kwargs)
-        response = self._encode(response)
+        response = self._send(method, url, files=files, **kwargs)
+        with metrics.timer(REQUEST_PHASE_METRIC, phase="encode"):
+            response = self._encode(response, kwargs.get("stream", False))
 
         # 记录响应信息
-        self._record_response(response)
+        with metrics.timer(REQUEST_PHASE_METRIC, phase="record"):
+            self._record_response(response)
+
+        return response
+
+    def measure(
+        self, method: str, path: str, files: Any = None, **kwargs: Dict[str, Any]
+    ) -> Tuple[float, int]:
+        """
+        重新发送请求并计时，不记录报告信息与请求指标，用于耗时采样
+
+        :param method: 请求方法
+        :type method: str
+        :param path: 请求路径
+        :type path: str
+        :return: (耗时(秒)，含读取完整响应体, 状态码)
+        :rtype: Tuple[float, int]
+        """
+        url = self._build_url(path)
+        start = time.perf_counter()
+        response = self._send(method, url, files=files, metered=False, **kwargs)
+        if kwargs.get("stream"):
+            # 流式请求同样读取完整响应体，但不保留内容
+            for _ in response.iter_content(STREAM_CHUNK_SIZE):
+                pass
+        elapsed = time.perf_counter() - start
+        if getattr(response, "replayed", False):
+            # 回放的响应不经过网络，使用录制时的耗时
+            elapsed = response.elapsed.total_seconds()
+        response.close()
+        return elapsed, response.status_code
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        files: Any = None,
+        compress: str = None,
+        timeout: Any = None,
+        metered: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Response:
+        """
+        通过会话发送请求，超时时记录超时次数
+
+        :param compress: 请求体压缩方式，为空时使用全局配置，identity 表示不压缩；
+            上传文件的 multipart 请求体不压缩
+        :type compress: str
+        :param timeout: 超时(秒)，单个数值或 [连接超时, 读取超时]，为空时使用全局配置
+        :type timeout: Any
+        :param metered: 是否记录网络耗时、请求体与上传字节数及超时次数，耗时采样时不记录
+        :type metered: bool
+        """
+        timeout = self.timeout if timeout is None else timeout
+        kwargs["timeout"] = tuple(timeout) if isinstance(timeout, list) else timeout
+        try:
+            if files:
+                return self._upload(method, url, files, metered, **kwargs)
+            return self._send_body(method, url, compress, metered, **kwargs)
+        except Timeout as e:
+            if metered:
+                kind = "connect" if isinstance(e, ConnectTimeout) else "read"
+                metrics.inc(TIMEOUT_METRIC, host=urlsplit(url).hostname, kind=kind)
+            raise
+
+    def _send_body(
+        self,
+        method: str,
+        url: str,
+        compress: str = None,
+        metered: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Response:
+        """
+        压缩请求体后发送，记录网络耗时(含建立连接、传输与读取响应体)与请求体字节数
 
+        :param compress: 请求体压缩方式，为空时使用全局配置
+        :type compress: str
+        :param metered: 是否记录网络耗时与请求体字节数
+        :type metered: bool
+        """
+        encoding = self.compress if compress is None else compress
+        kwargs, raw, wire = compress_request(kwargs, encoding)
+        with self._network_timer(metered):
+            response = self.context.session.request(method, url, **kwargs)
+
+        if not metered:
+            return response
+        if not wire:
+            raw = wire = _body_size(response.request.body)
+        if wire:
+            host = urlsplit(url).hostname
+            metrics.inc(REQUEST_BYTES_METRIC, raw, host=host, kind="raw")
+            metrics.inc(REQUEST_BYTES_METRIC, wire, host=host, kind="wire")
         return response
 
-    def extractor(self, res: Response, mapping: Dict[str, str]) -> Dict[str, Any]:
+    def _upload(
+        self,
+        method: str,
+        url: str,
+        files: Dict[str, Any],
+        metered: bool = True,
+        **kwargs: Dict[str, Any],
+    ) -> Response:
+        """
+        以流式 multipart 请求体上传文件，发送结束后关闭文件并记录上传字节数与耗时
+
+        :param files: Yaml中的上传文件配置
+        :type files: Dict[str, Any]
+        :param metered: 是否记录网络耗时与上传字节数
+        :type metered: bool
+        """
+        with MultipartEncoder(files, kwargs.pop("data", None)) as body:
+            kwargs["headers"] = multipart_headers(body, kwargs.get("headers"))
+            with self._network_timer(metered):
+                response = self.context.session.request(
+                    method, url, data=body, **kwargs
+                )
+
+        if not metered:
+            return response
+        stats = body.stats()
+        host = urlsplit(url).hostname
+        metrics.inc(UPLOAD_BYTES_METRIC, stats["bytes"], host=host)
+        metrics.observe(UPLOAD_SECONDS_METRIC, stats["seconds"], host=host)
+        return response
+
+    def _network_timer(self, metered: bool = True):
+        """网络阶段计时，不记录指标时返回空的上下文"""
+        if not metered:
+            return nullcontext()
+        return metrics.timer(REQUEST_PHASE_METRIC, phase="network")
+
+    def extractor(self, res: ResponseView, mapping: Dict[str, str]) -> Dict[str, Any]:
         """
         参数提取器，用于从接口响应信息中提取目标参数值
 
         :param res: 接口响应信息
-        :type res: Response
+        :type res: ResponseView
         :param mapping: 目标参数key与提取表达式组成的字典
         :type mapping: Dict[str, str]
         :return: 返回目标参数key与参数值组成的字典
@@ -151,9 +285,8 @@ class Request:
         """
         extracted_vars = {}
         try:
-            data = res.json()
             for var_name, expr in mapping.items():
-                value: List[Any] = jsonpath.jsonpath(data, expr)
+                value: List[Any] = res.find(expr)
                 if len(value) > 0:
                     self.context.variables[var_name] = value[0]
                     extracted_vars[var_name] = value[0]
@@ -165,22 +298,28 @@ class Request:
         return extracted_vars
 
     def validator(
-        self, res: Response, validates: List[Dict[str, Any]], dataSource: DataSource
+        self,
+        res: ResponseView,
+        validates: List[Dict[str, Any]],
+        dataSource: DataSource,
+        resend: Callable[[], Tuple[float, int]] = None,
     ):
         """
         接口响应信息验证器，用于校验接口返回信息是否满足预期结果
 
         :param self: 说明
         :param res: 说明
-        :type res: Response
+        :type res: ResponseView
         :param validates: 说明
         :type validates: List[Dict[str, Any]]
+        :param resend: 重新发送当前请求的函数，用于耗时断言
+        :type resend: Callable[[], Tuple[float, int]]
         """
 
         result = {}
         try:
 
-            assert_result = Assertions.assert_result(validates, res, dataSource)
+            assert_result = Assertions.assert_result(validates, res, dataSource, resend)
             if assert_result == 0:
                 result.setdefault("passed", ValidateStatus.PASSED)
                 result.setdefault("message", ValidateMessage.PASSED)
@@ -214,21 +353,21 @@ class Request:
 
         return urljoin(self.base_url, path)
 
-    def _encode(self, res: Response) -> Response:
+    def _encode(self, res: Response, stream: bool = False) -> ResponseView:
         """
-        处理接口返回值出现unicode编码时，如：\\u767b
+        包装为响应视图，响应体只解码一次，JSON解析时同时处理unicode编码，如：\\u767b
 
-        :param self: 说明
-        :param res: 说明
+        :param res: 接口响应信息
         :type res: Response
-        :return: 说明
-        :rtype: Response
+        :param stream: 是否为流式请求，流式请求包装为 :class:`StreamedResponseView`
+        :type stream: bool
+        :return: 接口响应视图
+        :rtype: ResponseView
         """
 
-        match = re.search(r"\\u[0-9a-fA-F]{4}", res.text)
-        result = res.text.encode().decode("unicode_escape") if match else res
-
-        return result
+        if isinstance(res, ResponseView):
+            return res
+        return StreamedResponseView(res) if stream else ResponseView(res)
 
     def _record_request(self, method: str, path: str, **kwargs: Dict[str, Any]):
         """
@@ -238,28 +377,28 @@ class Request:
         _log = {"method": method, "url": path}
         _log.update(kwargs)
 
-        CustomAllure.attach(_log, "请求参数", "json")
+        summary = {"method": method, "url": path}
+        CustomAllure.attach(_log, "请求参数", "json", detail=True, summary=summary)
 
-    def _record_response(self, res: Response):
+    def _record_response(self, res: ResponseView):
         """
         记录接口响应信息到allure中
         """
 
         _log = {
             "status_code": res.status_code,
-            "headers": dict(res.headers),
-            "cookies": res.cookies.get_dict() if res.cookies.get_dict() else None,
-            "body": json.loads(
-                (
-                    res.json()
-                    if "applicathion/json" in res.json().get("Content-Type", "")
-                    else res.text
-                ),
-            ),
-            "elapsed": res.elapsed.total_seconds(),
+            "headers": res.headers,
+            "cookies": res.cookies or None,
+            "body": res.body,
+            "elapsed": res.elapsed,
         }
 
-        CustomAllure.attach(_log, "请求结果", "json")
+        # 响应体解压前后的字节数，用于发现体积过大的接口
+        size = {"size": res.size, "wire_size": res.wire_size}
+        _log.update(size)
+
+        summary = {"status_code": res.status_code, "elapsed": res.elapsed, **size}
+        CustomAllure.attach(_log, "请求结果", "json", detail=True, summary=summary)
 
     def _record_extract_variables(
         self, mapping: Dict[str, str], extracted: Dict[str, Any]
@@ -268,7 +407,7 @@ class Request:
         记录变量提取到allure中
         """
 
-        CustomAllure.attach(mapping, "提取表达式", "json")
+        CustomAllure.attach(mapping, "提取表达式", "json", detail=True)
         CustomAllure.attach(extracted, "提取结果", "json")
 
     def _record_validate_results(
@@ -283,3 +422,124 @@ class Request:
         _log = {"validates": validators, "validate_results": results}
 
         CustomAllure.attach(_log, "接口响应验证结果", "json")
+
+
+def _body_size(body: Any) -> int:
+    """已编码请求体的字节数，流式请求体不计"""
+    if isinstance(body, bytes):
+        return len(body)
+    if isinstance(body, str):
+        return len(body.encode("utf-8"))
+    return 0
+
+
+@dataclass
+class AsyncRequest(Request):
+    """
+    异步请求处理类
+
+    请求仍通过 ``requests`` 同步发送：阻塞的网络调用交给线程池执行，事件循环只负责调度；
+    请求与响应的记录、变量提取与结果验证仍在事件循环所在的测试线程中完成，保证Allure报告结构不变。
+    包含多次请求或数据库访问的同步流程通过 :meth:`run` 在独立线程中执行。
+    """
+
+    limit: int = field(default=10)
+
+    def __post_init__(self):
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.limit, thread_name_prefix="async-request"
+        )
+
+    async def send(
+        self, method: str, path: str, files: Any = None, **kwargs: Dict[str, Any]
+    ) -> Response:
+        """
+        异步发送http请求，不记录报告信息
+
+        :param method: 请求方法
+        :type method: str
+        :param path: 请求路径
+        :type path: str
+        :param kwargs: 由请求参数组装的字典
+        :type kwargs: Dict[str, Any]
+        :return: 请求响应结果
+        :rtype: Response
+        """
+
+        url = self._build_url(path)
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self._pool, partial(self._send, method, url, files=files, **kwargs)
+        )
+
+    def record(
+        self, method: str, path: str, response: Response, **kwargs
+    ) -> ResponseView:
+        """
+        记录请求与响应信息到allure中
+
+        :param method: 请求方法
+        :type method: str
+        :param path: 请求路径
+        :type path: str
+        :param response: 请求响应结果
+        :type response: Response
+        :return: 接口响应视图
+        :rtype: ResponseView
+        """
+
+        self._record_request(method, self._build_url(path), **kwargs)
+
+        response = self._encode(response, kwargs.get("stream", False))
+        self._record_response(response)
+
+        return response
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        在新线程中执行包含阻塞调用的同步函数，如数据驱动、共享变量缓存与耗时断言的重新采样
+
+        新线程在事件循环继续调度之前继承测试线程当前的报告位置，函数中的报告步骤挂在测试下，
+        不与事件循环线程中其他用例的步骤交错；线程结束后由报告插件清理其上下文。
+
+        :param func: 同步函数
+        :type func: Callable[..., Any]
+        :return: 函数返回值
+        :rtype: Any
+        """
+        future, started = Future(), threading.Event()
+
+        def target():
+            CustomAllure.enter_thread()
+            started.set()
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=target, name="async-request-step", daemon=True).start()
+        started.wait()
+        return await asyncio.wrap_future(future)
+
+    async def arequest(
+        self, method: str, path: str, files: Any = None, **kwargs: Dict[str, Any]
+    ) -> ResponseView:
+        """
+        异步发送http请求并记录报告信息，同步的 :meth:`request` 仍可在事件循环外使用
+
+        :param method: 请求方法
+        :type method: str
+        :param path: 请求路径
+        :type path: str
+        :return: 接口响应视图
+        :rtype: ResponseView
+        """
+        response = await self.send(method, path, files=files, **kwargs)
+        return self.record(method, path, response, **kwargs)
+
+    def close(self):
+        """释放线程池资源"""
+        self._pool.shutdown(wait=False)
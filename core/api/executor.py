@@ -1,19 +1,61 @@
+import time
+import json
 import allure
-from dataclasses import asdict
-from core.api.core import Request
+import hashlib
+import pytest
+import asyncio
+from collections import ChainMap
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, List, Mapping, Set, Tuple
+from requests.exceptions import Timeout
 from core.api.api_flow import Case, Flow
+from core.api.core import AsyncRequest, Request
+from core.api.response import ResponseView, StreamedResponseView, stream_targets
+from core.api.scheduler import FlowScheduler, StepStatus
+from core.api.transport import TimedAdapter
 from utils.allure_reports import CustomAllure
+from utils.data_table import open_table
+from utils.shared_cache import SharedCache
+from utils.metrics import metrics
+from utils.history import response_log
+
+# 数据驱动时记录完整报告步骤的行数
+REPORT_ROWS = 100
+# 数据驱动时保留详细信息的失败行数
+MAX_FAILURES = 100
+
+# 执行阶段耗时、服务端响应耗时与用例结果指标
+PHASE_METRIC = "executor_phase_seconds"
+TTFB_METRIC = "http_ttfb_seconds"
+CASES_METRIC = "executor_cases_total"
+# 响应体字节数，kind=decoded 为解压后、kind=wire 为实际传输的字节数
+RESPONSE_BYTES_METRIC = "http_response_bytes_total"
+
+
+@dataclass
+class FlowRun:
+    """按步骤分别执行的流程的运行状态"""
+
+    # 截止时间(:func:`time.monotonic`)，未设置总时限时为空
+    expires: float = None
+    # 已开始执行的步骤与其中未通过(失败、跳过或超时)步骤的序号
+    flows: List[Flow] = field(default_factory=list)
+    failed: Set[int] = field(default_factory=set)
 
 
 class Executor:
     """执行器类负责按文件定义的测试流程执行测试"""
 
-    def __init__(self, request: Request = None):
+    def __init__(self, request: Request = None, shared_cache: SharedCache = None):
         self.request = request if request else Request()
+        self.shared_cache = shared_cache
+        # 同步执行业务流程时各流程(用例文件)的运行状态
+        self._flows: Dict[str, FlowRun] = {}
 
     def execute_test_case(self, case: Case):
         """
-        单接口测试
+        单接口测试，配置了数据表时按数据行逐行执行
 
         :param case: 测试用例
         :type case: CaseConfig
@@ -28,50 +70,298 @@ class Executor:
             if not isinstance(case, Case):
                 raise TypeError(f"参数类型错误: {type(case)}，必须是 CaseConfig 类型")
 
-            # 处理数据步骤
-            with allure.step("数据预处理"):
-                # TODO 数据预处理逻辑:变量替换、数据格式化
-                # 替换请求参数中的变量
-                params = self.request.context.parse_and_replace(asdict(case.request))
-
-            # 发送请求步骤
-            with allure.step("发送请求"):
-                files = params.pop("files", None)
-                if files:
-                    for k, v in files.items():
-                            files = {k: open(v, "rb")}
-                            
-                response = self.request.request(files=files, **params)
-
-            # 提取变量步骤（如果有）
-            if case.extract:
-                with allure.step("提取变量"):
-                    self.request.extractor(response, case.extract)
-
-            # 验证接口响应信息（如果有）
-            if case.validate:
-                with allure.step("验证接口响应信息"):
-                    assert_result = self.request.validator(
-                        response,
-                        case.validate,
-                        self.request.context.variables.get("data-source"),
-                    )
-
-                # 使用更明确的断言
-                if not assert_result.get("passed"):
-                    raise AssertionError(
-                        f"验证失败: {assert_result.get('message', '未知错误')}"
-                    )
+            if case.dataset:
+                self._execute_data_table(case)
+            else:
+                self._execute_step(case)
 
         except Exception as e:
             # 记录异常到Allure报告
             CustomAllure.attach(str(e), "异常信息", "txt")
             raise
 
+    def _execute_step(self, case: Case, expires: float = None):
+        """
+        执行一次用例，配置了 cache_ttl 且启用共享缓存时提取变量在多个进程间共享
+
+        :param case: 测试用例
+        :type case: Case
+        :param expires: 所属流程的截止时间(:func:`time.monotonic`)，为空时不限制
+        :type expires: float
+        """
+        if not (case.cache_ttl and case.extract and self.shared_cache):
+            self._execute_case(case, expires=expires)
+            return
+
+        def extract() -> Dict[str, Any]:
+            self._execute_case(case, expires=expires)
+            variables = self.request.context.variables
+            return {k: variables[k] for k in case.extract if k in variables}
+
+        key = self._cache_key(case)
+        extracted, hit = self.shared_cache.get_or_create(key, extract, case.cache_ttl)
+
+        if hit:
+            self.request.context.variables.update(extracted)
+            CustomAllure.attach(extracted, "共享变量缓存命中", "json")
+
+    def _cache_key(self, case: Case) -> str:
+        """
+        共享缓存键：用例名称、提取变量名与替换变量后请求的摘要，
+        相同名称但请求方法、路径、查询参数或请求体不同(如不同账号登录)的用例互不共享
+
+        :param case: 测试用例
+        :type case: Case
+        """
+        context = self.request.context
+        rendered = case.request.template.render(context.variables, context._call)
+        request = {k: rendered.get(k) for k in ("path", "params", "json", "data")}
+        request["method"] = str(rendered.get("method")).upper()
+        digest = hashlib.sha1(
+            json.dumps(
+                request, sort_keys=True, ensure_ascii=False, default=str
+            ).encode()
+        ).hexdigest()
+        return f"{case.name}:{','.join(sorted(case.extract))}:{digest}"
+
+    def _execute_case(
+        self,
+        case: Case,
+        variables: Mapping[str, Any] = None,
+        step: Callable[[str], ContextManager] = allure.step,
+        expires: float = None,
+    ):
+        """
+        执行一次用例：变量替换、发送请求、提取变量与验证
+
+        :param case: 测试用例
+        :type case: Case
+        :param variables: 替换使用的变量，默认为上下文变量
+        :type variables: Mapping[str, Any]
+        :param step: 报告步骤，静默执行时传入不记录步骤的上下文
+        :type step: Callable[[str], ContextManager]
+        :param expires: 所属流程的截止时间，请求超时不超过剩余时限
+        :type expires: float
+        """
+
+        outcome = "failed"
+        response = None
+        with self._phase(case, "total"):
+            try:
+                # 处理数据步骤
+                with step("数据预处理"), self._phase(case, "template"):
+                    # TODO 数据预处理逻辑:变量替换、数据格式化
+                    # 替换请求参数中的变量
+                    params = self.request.context.parse_and_replace(
+                        case.request.template, variables
+                    )
+                    self._transfer_options(case, params, expires)
+
+                # 发送请求步骤
+                with step("发送请求"), self._phase(case, "send"):
+                    response = self.request.request(**params)
+                    self._expect_stream(case, response)
+                # 服务端耗时：发送请求到解析完响应头
+                metrics.observe(TTFB_METRIC, response.elapsed, case=case.name)
+
+                self._check_response(case, response, params, variables, step)
+                outcome = "passed"
+            finally:
+                self._finish_case(case, response, outcome)
+
+    def _check_response(
+        self,
+        case: Case,
+        response: ResponseView,
+        params: Dict[str, Any],
+        variables: Mapping[str, Any] = None,
+        step: Callable[[str], ContextManager] = allure.step,
+    ):
+        """
+        提取变量并验证接口响应信息
+
+        :param case: 测试用例
+        :type case: Case
+        :param response: 接口响应视图
+        :type response: ResponseView
+        :param params: 变量替换后的请求参数，耗时断言按相同参数重新发送请求
+        :type params: Dict[str, Any]
+        :param variables: 数据驱动时替换验证信息使用的变量
+        :type variables: Mapping[str, Any]
+        :param step: 报告步骤
+        :type step: Callable[[str], ContextManager]
+        """
+        # 提取变量步骤（如果有）
+        if case.extract:
+            with step("提取变量"), self._phase(case, "extract"):
+                self.request.extractor(response, case.extract)
+
+        # 验证接口响应信息（如果有）
+        if case.validate:
+            with step("验证接口响应信息"), self._phase(case, "validate"):
+                validate = None
+                if variables is not None:
+                    context = self.request.context
+                    validate = case.validate_template.render(variables, context._call)
+
+                # 耗时断言按相同参数重新发送请求采样
+                def resend() -> Tuple[float, int]:
+                    return self.request.measure(**params)
+
+                self._assert_validate(response, case, validate, resend)
+
+    def _finish_case(self, case: Case, response: Any, outcome: str):
+        """
+        记录响应字节数、运行历史与用例结果
+
+        流式响应在提取与断言后才确定读取的字节数，因此在用例结束时记录。
+        """
+        if isinstance(response, ResponseView):
+            self._count_response(case, response)
+            response_log.add(case.name, response)
+        metrics.inc(CASES_METRIC, case=case.name, outcome=outcome)
+
+    def _transfer_options(
+        self, case: Case, params: Dict[str, Any], expires: float = None
+    ):
+        """
+        将用例的流式读取与请求体压缩配置加入请求参数
+
+        :param case: 测试用例
+        :type case: Case
+        :param params: 变量替换后的请求参数
+        :type params: Dict[str, Any]
+        :param expires: 所属流程的截止时间(:func:`time.monotonic`)，请求超时不超过剩余时限
+        :type expires: float
+        """
+        if case.stream:
+            params["stream"] = True
+        if case.compress is not None:
+            params["compress"] = case.compress
+        if expires is not None:
+            # 请求超时不超过流程剩余时限
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"超出流程总时限，取消执行: {case.name}")
+            timeout = params.get("timeout")
+            if timeout is None:
+                timeout = self.request.timeout
+            params["timeout"] = _cap_timeout(timeout, remaining)
+
+    def _count_response(self, case: Case, response: ResponseView):
+        """记录响应体解压前后的字节数，未读取的流式响应不记录"""
+        if response.size is None:
+            return
+        metrics.inc(
+            RESPONSE_BYTES_METRIC, response.size, case=case.name, kind="decoded"
+        )
+        metrics.inc(
+            RESPONSE_BYTES_METRIC, response.wire_size, case=case.name, kind="wire"
+        )
+
+    def _expect_stream(self, case: Case, response: ResponseView):
+        """
+        流式响应在第一次查找前登记提取与断言需要查找的字段，没有需要查找的字段时直接关闭
+
+        :param case: 测试用例
+        :type case: Case
+        :param response: 接口响应视图
+        :type response: ResponseView
+        """
+        if not isinstance(response, StreamedResponseView):
+            return
+        targets = stream_targets(case.extract, case.validate)
+        if targets:
+            response.expect(targets)
+        else:
+            response.close()
+
+    def _phase(self, case: Case, phase: str) -> ContextManager:
+        """用例执行阶段计时"""
+        return metrics.timer(PHASE_METRIC, case=case.name, phase=phase)
+
+    def _execute_data_table(self, case: Case, expires: float = None):
+        """
+        数据驱动测试，流式读取数据表并将每一行绑定到用例占位符中执行
+
+        数据行优先于上下文变量；只有前 ``report_rows`` 行记录完整的报告步骤，
+        其余行静默执行，失败信息汇总到“数据表执行结果”中，内存占用与数据表行数无关。
+
+        :param case: 配置了 dataset 的测试用例
+        :type case: Case
+        :param expires: 所属流程的截止时间，请求超时不超过剩余时限
+        :type expires: float
+        """
+        dataset = case.dataset
+        report_rows = REPORT_ROWS
+        if isinstance(dataset, dict):
+            report_rows = dataset.get("report_rows", REPORT_ROWS)
+
+        total, failed, failures = 0, 0, []
+        for index, row in enumerate(open_table(dataset), start=1):
+            total += 1
+            variables = ChainMap(row, self.request.context.variables)
+            try:
+                if index <= report_rows:
+                    with allure.step(f"数据行 {index}"):
+                        self._execute_case(case, variables, expires=expires)
+                else:
+                    with CustomAllure.muted():
+                        self._execute_case(
+                            case, variables, lambda _: nullcontext(), expires
+                        )
+            except Exception as e:
+                failed += 1
+                if len(failures) < MAX_FAILURES:
+                    failures.append({"row": index, "data": row, "message": str(e)})
+
+        result = {"total": total, "passed": total - failed, "failed": failed}
+        CustomAllure.attach({**result, "failures": failures}, "数据表执行结果", "json")
+
+        if failed:
+            raise AssertionError(f"数据表共 {total} 行，{failed} 行未通过")
+
+    def _assert_validate(
+        self,
+        response: ResponseView,
+        case: Case,
+        validate: List[Dict[str, Any]] = None,
+        resend: Callable[[], Tuple[float, int]] = None,
+    ):
+        """
+        验证接口响应信息，未通过时抛出断言异常
+
+        :param response: 接口响应信息
+        :type response: ResponseView
+        :param case: 测试用例
+        :type case: Case
+        :param validate: 已替换变量的验证信息，默认使用用例中的验证信息
+        :type validate: List[Dict[str, Any]]
+        :param resend: 重新发送当前请求的函数，用于耗时断言
+        :type resend: Callable[[], Tuple[float, int]]
+        """
+        assert_result = self.request.validator(
+            response,
+            validate if validate is not None else case.validate,
+            self.request.context.variables.get("data-source"),
+            resend,
+        )
+
+        # 使用更明确的断言
+        if not assert_result.get("passed"):
+            raise AssertionError(
+                f"验证失败: {assert_result.get('message', '未知错误')}"
+            )
+
     def execute_test_flow(self, flow: Flow):
         """
         业务流程测试
 
+        同一流程(用例文件)的步骤按 :class:`FlowScheduler` 相同的规则确定上游步骤，
+        上游步骤未通过时跳过当前步骤。流程信息中设置了 ``deadline`` 时，总时限从第一个步骤开始计时，
+        进行中请求的超时不超过剩余时限，超出时限后的步骤不再发送请求并抛出 :class:`TimeoutError` 。
+        流程状态在最后一个步骤结束后清除，再次执行该流程时重新开始。
+
         :param case_info: 测试用例配置信息
         :type case_info: CaseConfig
         :return: 测试执行结果汇总
@@ -92,39 +382,299 @@ class Executor:
                     f"参数类型错误: {type(flow.case)}，必须是 CaseConfig 类型"
                 )
 
-            # 处理数据步骤
-            with allure.step("数据预处理"):
-                # TODO 数据预处理逻辑:变量替换、数据格式化
-                # 替换请求参数中的变量
-                params = self.request.context.parse_and_replace(
-                    asdict(flow.case.request)
-                )
+            info = flow.info
+            run = self._flow_run(flow)
+            expires = run.expires
+            message = f"超出流程总时限 {info.deadline}s，取消执行: {flow.case.name}"
+            passed = False
+            try:
+                upstream = self._failed_upstream(run)
+                if upstream is not None:
+                    skipped = f"上游步骤 {upstream} 未通过，跳过执行"
+                    CustomAllure.attach(skipped, f"{flow.case.name}: 跳过", "txt")
+                    pytest.skip(skipped)
 
-            # 发送请求步骤
-            with allure.step("发送请求"):
-                response = self.request.request(**params)
-
-            # 提取变量步骤（如果有）
-            if flow.case.extract:
-                with allure.step("提取变量"):
-                    self.request.extractor(response, flow.case.extract)
-
-            # 验证接口响应信息（如果有）
-            if flow.case.validate:
-                with allure.step("验证接口响应信息"):
-                    assert_result = self.request.validator(
-                        response,
-                        flow.case.validate,
-                        self.request.context.variables.get("data-source"),
-                    )
+                if expires is not None and time.monotonic() >= expires:
+                    raise TimeoutError(message)
 
-                # 使用更明确的断言
-                if not assert_result.get("passed"):
-                    raise AssertionError(
-                        f"验证失败: {assert_result.get('message', '未知错误')}"
-                    )
+                self._execute_step(flow.case, expires)
+                passed = True
+            except Timeout as e:
+                if expires is None or time.monotonic() < expires:
+                    raise
+                raise TimeoutError(message) from e
+            finally:
+                if not passed:
+                    run.failed.add(len(run.flows) - 1)
+                if info.steps is not None and info.step == info.steps - 1:
+                    self._flows.pop(info.flow, None)
 
         except Exception as e:
             # 记录异常到Allure报告
             CustomAllure.attach(str(e), "多接口业务流程测试异常信息", "txt")
             raise
+
+    def _flow_run(self, flow: Flow) -> FlowRun:
+        """
+        步骤所属流程的运行状态，执行流程的第一个步骤时开始记录并计时；
+        未标识所属流程(非读取用例文件构造)的步骤单独记录
+
+        :param flow: 流程步骤
+        :type flow: Flow
+        :return: 已加入当前步骤的流程运行状态
+        :rtype: FlowRun
+        """
+        info = flow.info
+        if info.flow is None or info.step == 0 or info.flow not in self._flows:
+            run = FlowRun()
+            if info.deadline is not None:
+                run.expires = time.monotonic() + info.deadline
+            if info.flow is not None:
+                self._flows[info.flow] = run
+        else:
+            run = self._flows[info.flow]
+        run.flows.append(flow)
+        return run
+
+    def _failed_upstream(self, run: FlowRun) -> str:
+        """
+        当前(最后加入的)步骤未通过的上游步骤名称，上游步骤均通过时为空
+
+        :param run: 流程运行状态
+        :type run: FlowRun
+        """
+        step = FlowScheduler._build_graph(run.flows, strict=False)[-1]
+        for index in sorted(step.depends):
+            if index in run.failed:
+                return run.flows[index].case.name
+        return None
+
+
+def _cap_timeout(timeout: Any, limit: float) -> Any:
+    """
+    将单个数值或 [连接超时, 读取超时] 形式的超时限制在 limit 秒以内
+
+    :param timeout: 超时(秒)，为空时表示不限制
+    :type timeout: Any
+    :param limit: 上限(秒)
+    :type limit: float
+    """
+    if timeout is None:
+        return limit
+    if isinstance(timeout, (list, tuple)):
+        return tuple(limit if t is None else min(t, limit) for t in timeout)
+    return min(timeout, limit)
+
+
+def _in_step(title: str, func: Callable[..., Any], *args: Any) -> Any:
+    """在报告步骤中执行函数"""
+    with allure.step(title):
+        return func(*args)
+
+
+def _blocking_validate(case: Case) -> bool:
+    """验证信息中是否包含需要重新发送请求(latency)或访问数据库(sql)的断言"""
+    return any(
+        mode in ("latency", "sql")
+        for expect in case.validate or []
+        if isinstance(expect, dict)
+        for mode in expect
+    )
+
+
+class AsyncExecutor(Executor):
+    """
+    异步执行器，并发执行相互独立的测试用例
+
+    同时在途的请求数由 ``limit`` 控制，总耗时取决于最慢的请求而不是所有请求耗时之和。
+    请求仍通过 ``requests`` 同步发送，由 :class:`AsyncRequest` 的线程池执行，事件循环不等待网络。
+    每个用例的报告步骤在等待网络之前或之后同步完成，不会与其他用例的步骤交错。
+    阶段耗时、响应字节数、运行历史、共享变量缓存与耗时断言的行为与 :class:`Executor` 一致；
+    数据驱动、共享变量缓存以及需要重新发送请求或访问数据库的验证在独立线程中执行，不阻塞事件循环。
+
+    测试中通过 ``async_executor`` 夹具执行业务流程(:meth:`execute_test_flows`)，
+    相互独立的单接口用例也可以通过 :meth:`execute_test_cases` 并发执行。
+    """
+
+    def __init__(
+        self,
+        request: AsyncRequest = None,
+        limit: int = 10,
+        pool: Dict[str, Any] = None,
+        shared_cache: SharedCache = None,
+    ):
+        """
+        :param request: 异步请求处理类
+        :type request: AsyncRequest
+        :param limit: 未传入 request 时的并发数
+        :type limit: int
+        :param pool: :class:`TimedAdapter` 参数，由环境的连接池配置生成
+        :type pool: Dict[str, Any]
+        :param shared_cache: 多进程共享的提取变量缓存
+        :type shared_cache: SharedCache
+        """
+        super().__init__(
+            request if request else AsyncRequest(limit=limit), shared_cache
+        )
+        self.limit = self.request.limit
+
+        # 连接池容量不低于并发数，避免并发请求反复建立连接
+        self.pool = dict(pool or {})
+        for key in ("pool_connections", "pool_maxsize"):
+            self.pool[key] = max(self.pool.get(key, 0), self.limit)
+        adapter = TimedAdapter(**self.pool)
+        self.request.context.session.mount("http://", adapter)
+        self.request.context.session.mount("https://", adapter)
+
+    async def execute_test_case_async(
+        self, case: Case, expires: float = None
+    ) -> Dict[str, Any]:
+        """
+        异步执行单接口测试，指标、运行历史与断言与同步执行一致
+
+        配置了数据表或共享变量缓存的用例包含多次请求或需要在文件锁内执行，
+        通过 :meth:`AsyncRequest.run` 在独立线程中按同步方式执行，报告步骤不与其他用例交错。
+
+        :param case: 测试用例
+        :type case: Case
+        :param expires: 所属流程的截止时间(:func:`time.monotonic`)，请求超时不超过剩余时限，
+            超时的请求在线程池中同样按时结束
+        :type expires: float
+        :return: 用例执行结果
+        :rtype: Dict[str, Any]
+        """
+
+        result = {"name": case.name, "passed": False}
+        try:
+            # 验证输入参数类型
+            if not isinstance(case, Case):
+                raise TypeError(f"参数类型错误: {type(case)}，必须是 CaseConfig 类型")
+
+            if case.dataset:
+                await self.request.run(
+                    _in_step, case.name, self._execute_data_table, case, expires
+                )
+            elif case.cache_ttl and case.extract and self.shared_cache:
+                await self.request.run(
+                    _in_step, case.name, self._execute_step, case, expires
+                )
+            else:
+                await self._execute_case_async(case, expires)
+
+            result["passed"] = True
+
+        except Exception as e:
+            result["message"] = str(e)
+            CustomAllure.attach(str(e), f"{case.name}: 异常信息", "txt")
+
+        return result
+
+    async def _execute_case_async(self, case: Case, expires: float = None):
+        """
+        异步执行一次用例，只在等待网络时让出事件循环
+
+        :param case: 测试用例
+        :type case: Case
+        :param expires: 所属流程的截止时间，请求超时不超过剩余时限
+        :type expires: float
+        """
+
+        def step(title: str) -> ContextManager:
+            return allure.step(f"{case.name}: {title}")
+
+        outcome = "failed"
+        response = None
+        with self._phase(case, "total"):
+            try:
+                with step("数据预处理"), self._phase(case, "template"):
+                    params = self.request.context.parse_and_replace(
+                        case.request.template
+                    )
+                    self._transfer_options(case, params, expires)
+
+                with self._phase(case, "send"):
+                    response = await self.request.send(**params)
+                    with step("发送请求"):
+                        response = self.request.record(response=response, **params)
+                        self._expect_stream(case, response)
+                metrics.observe(TTFB_METRIC, response.elapsed, case=case.name)
+
+                if _blocking_validate(case):
+                    # 耗时断言重新发送请求、数据库断言查询数据库，在独立线程中执行
+                    await self.request.run(
+                        self._check_response, case, response, params, None, step
+                    )
+                else:
+                    self._check_response(case, response, params, step=step)
+                outcome = "passed"
+            finally:
+                self._finish_case(case, response, outcome)
+
+    async def execute_test_cases_async(self, cases: List[Case]) -> List[Dict[str, Any]]:
+        """
+        并发执行多个相互独立的测试用例
+
+        :param cases: 测试用例列表
+        :type cases: List[Case]
+        :return: 按输入顺序排列的用例执行结果
+        :rtype: List[Dict[str, Any]]
+        """
+        return await asyncio.gather(
+            *(self.execute_test_case_async(case) for case in cases)
+        )
+
+    def execute_test_cases(self, cases: List[Case]) -> List[Dict[str, Any]]:
+        """
+        并发执行多个相互独立的测试用例，存在失败用例时抛出断言异常
+
+        :param cases: 测试用例列表
+        :type cases: List[Case]
+        :return: 按输入顺序排列的用例执行结果
+        :rtype: List[Dict[str, Any]]
+        """
+
+        results = asyncio.run(self.execute_test_cases_async(cases))
+
+        CustomAllure.attach(results, "并发执行结果", "json")
+
+        failed = [r for r in results if not r.get("passed")]
+        if failed:
+            raise AssertionError(
+                f"{len(failed)}/{len(results)} 个用例执行未通过: "
+                + ", ".join(f"{r['name']}({r.get('message')})" for r in failed)
+            )
+
+        return results
+
+    def execute_test_flows(self, flows: List[Flow]) -> List[Dict[str, Any]]:
+        """
+        按依赖图执行业务流程，无数据依赖的步骤并发执行，上游失败的步骤直接跳过，
+        超出流程信息中 ``deadline`` 总时限的步骤取消并标记为超时
+
+        :param flows: 按文件顺序排列的流程步骤
+        :type flows: List[Flow]
+        :return: 按步骤顺序排列的执行结果
+        :rtype: List[Dict[str, Any]]
+        """
+
+        deadline = None
+        if flows:
+            allure.dynamic.epic(flows[0].info.project)
+            deadline = flows[0].info.deadline
+
+        scheduler = FlowScheduler(flows, deadline)
+
+        CustomAllure.attach(scheduler.graph, "流程依赖图", "json")
+
+        results = asyncio.run(scheduler.run(self))
+
+        CustomAllure.attach(results, "流程执行结果", "json")
+
+        failed = [r for r in results if r["status"] != StepStatus.PASSED]
+        if failed:
+            raise AssertionError(
+                f"{len(failed)}/{len(results)} 个流程步骤未通过: "
+                + ", ".join(f"{r['name']}[{r['status']}]" for r in failed)
+            )
+
+        return results
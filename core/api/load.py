@@ -0,0 +1,446 @@
+import os
+import json
+import math
+import time
+import argparse
+import threading
+from pathlib import Path
+from root import ROOT_PATH
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List
+from configs import configure
+from core.api.api_flow import Case, Flow
+from core.api.core import Context, Request
+from core.api.executor import Executor
+from core.api.response import ResponseView
+from core.api.settings import Configuration
+from utils.db_sever import close_pools
+from utils.yaml_parse import read_yaml
+from utils.allure_reports import AttachLevel, CustomAllure
+
+
+class LatencyHistogram:
+    """
+    HDR风格的延迟直方图
+
+    以微秒记录延迟，按2的幂分段，每段再线性划分为固定数量的子桶，
+    相对误差不超过 ``1 / 2 ** (sub_bucket_bits - 1)`` ，内存占用与样本数量无关。
+    """
+
+    def __init__(self, significant_figures: int = 2):
+        # 子桶数量需覆盖 2 * 10^有效位数，保证各段的相对精度
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10**significant_figures))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._sum = 0
+
+    def _index(self, value: int) -> int:
+        if value < self.sub_bucket_count:
+            return value
+        shift = value.bit_length() - self.sub_bucket_bits
+        return (
+            self.sub_bucket_count
+            + (shift - 1) * self.sub_bucket_half
+            + ((value >> shift) - self.sub_bucket_half)
+        )
+
+    def _value(self, index: int) -> int:
+        """桶内的最大值"""
+        if index < self.sub_bucket_count:
+            return index
+        shift, offset = divmod(index - self.sub_bucket_count, self.sub_bucket_half)
+        shift += 1
+        return ((offset + self.sub_bucket_half + 1) << shift) - 1
+
+    def record(self, seconds: float):
+        """
+        记录一次延迟
+
+        :param seconds: 延迟(秒)
+        :type seconds: float
+        """
+        value = max(int(seconds * 1_000_000), 0)
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self._sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个直方图的样本"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self._sum += other._sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def percentile(self, percent: float) -> float:
+        """
+        返回百分位延迟(毫秒)
+
+        :param percent: 百分位，如 99
+        :type percent: float
+        """
+        if not self.total:
+            return 0.0
+        target = max(math.ceil(self.total * percent / 100), 1)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._value(index), self.max) / 1000
+        return self.max / 1000
+
+    @property
+    def mean(self) -> float:
+        """平均延迟(毫秒)"""
+        return self._sum / self.total / 1000 if self.total else 0.0
+
+    def buckets(self) -> List[List[float]]:
+        """非空桶的 [上界(毫秒), 样本数] 列表"""
+        return [
+            [self._value(index) / 1000, self.counts[index]]
+            for index in sorted(self.counts)
+        ]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.total,
+            "min": (self.min or 0) / 1000,
+            "mean": round(self.mean, 3),
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max / 1000,
+        }
+
+
+class _Pacer:
+    """按目标RPS为全部虚拟用户分配发送时刻"""
+
+    def __init__(self, rps: float):
+        self.interval = 1 / rps
+        self._next = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def wait(self, stop: threading.Event):
+        with self._lock:
+            now = time.perf_counter()
+            slot = self._next = max(self._next, now)
+            self._next += self.interval
+        delay = slot - time.perf_counter()
+        if delay > 0:
+            stop.wait(delay)
+
+
+class _TimedRequest(Request):
+    """记录最近一次请求耗时的请求类"""
+
+    latency: float = 0.0
+    response: ResponseView = None
+
+    def request(self, method: str, path: str, files=None, **kwargs) -> ResponseView:
+        start = time.perf_counter()
+        try:
+            response = super().request(method, path, files=files, **kwargs)
+        finally:
+            self.latency = time.perf_counter() - start
+        self.response = response
+        return response
+
+
+@dataclass
+class StepStats:
+    """单个用例的压测统计"""
+
+    requests: int = 0
+    errors: int = 0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    messages: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "StepStats"):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.histogram.merge(other.histogram)
+        for message, count in other.messages.items():
+            self.messages[message] = self.messages.get(message, 0) + count
+
+
+def _no_step(title: str):
+    return nullcontext()
+
+
+class VirtualUser(threading.Thread):
+    """
+    虚拟用户，拥有独立的会话与变量上下文
+
+    循环执行场景中的用例，占位符替换与变量提取与功能测试一致；
+    某一步失败时放弃本轮剩余步骤，从场景开头重新执行。
+    """
+
+    def __init__(
+        self,
+        index: int,
+        scenario: List[Case],
+        base_url: str,
+        variables: Dict[str, Any],
+        stop: threading.Event,
+        pacer: _Pacer = None,
+        check_status: bool = True,
+    ):
+        super().__init__(name=f"virtual-user-{index}", daemon=True)
+        self.scenario = scenario
+        self.stop = stop
+        self.pacer = pacer
+        self.check_status = check_status
+        self.request = _TimedRequest(
+            base_url=base_url, context=Context(variables=dict(variables))
+        )
+        self.executor = Executor(self.request)
+        self.stats: Dict[str, StepStats] = {case.name: StepStats() for case in scenario}
+
+    def run(self):
+        while not self.stop.is_set():
+            for case in self.scenario:
+                if self.stop.is_set():
+                    return
+                if self.pacer:
+                    self.pacer.wait(self.stop)
+                    if self.stop.is_set():
+                        return
+                if not self._execute(case):
+                    break
+
+    def _execute(self, case: Case) -> bool:
+        stats = self.stats[case.name]
+        self.request.latency = 0.0
+        self.request.response = None
+        error = None
+        try:
+            self.executor._execute_case(case, step=_no_step)
+            response = self.request.response
+            if self.check_status and response is not None:
+                if response.status_code >= 400:
+                    error = f"HTTP {response.status_code}"
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+
+        stats.requests += 1
+        stats.histogram.record(self.request.latency)
+        if error:
+            stats.errors += 1
+            stats.messages[error] = stats.messages.get(error, 0) + 1
+        return error is None
+
+    def close(self):
+        self.request.context.session.close()
+
+
+class LoadRunner:
+    """
+    压测执行器，复用 YAML 中的 :class:`Case` / :class:`Flow` 定义
+
+    按虚拟用户数(并发)或目标RPS在固定时长内循环执行场景，统计吞吐量、错误率与延迟分布。
+    """
+
+    def __init__(
+        self,
+        scenario: List[Case],
+        base_url: str,
+        variables: Dict[str, Any] = None,
+        users: int = 10,
+        duration: float = 60,
+        rps: float = None,
+        check_status: bool = True,
+    ):
+        """
+        :param scenario: 每个虚拟用户循环执行的用例序列
+        :type scenario: List[Case]
+        :param base_url: 服务地址
+        :type base_url: str
+        :param variables: 每个虚拟用户的初始变量
+        :type variables: Dict[str, Any]
+        :param users: 虚拟用户数，即最大并发数
+        :type users: int
+        :param duration: 压测时长(秒)
+        :type duration: float
+        :param rps: 全部虚拟用户合计的目标RPS，为空时不限速
+        :type rps: float
+        :param check_status: 是否将 4xx/5xx 响应计为错误
+        :type check_status: bool
+        """
+        if not scenario:
+            raise ValueError("压测场景中没有用例")
+        self.scenario = scenario
+        self.base_url = base_url
+        self.variables = variables or {}
+        self.users = users
+        self.duration = duration
+        self.rps = rps
+        self.check_status = check_status
+
+    def run(self) -> Dict[str, Any]:
+        """
+        执行压测并返回统计结果
+
+        :return: 总体与各用例的吞吐量、错误率及延迟百分位
+        :rtype: Dict[str, Any]
+        """
+        # 压测期间不记录报告附件
+        level = CustomAllure.level
+        CustomAllure.configure(level=AttachLevel.OFF)
+
+        stop = threading.Event()
+        pacer = _Pacer(self.rps) if self.rps else None
+        users = [
+            VirtualUser(
+                i,
+                self.scenario,
+                self.base_url,
+                self.variables,
+                stop,
+                pacer,
+                self.check_status,
+            )
+            for i in range(self.users)
+        ]
+
+        start = time.perf_counter()
+        try:
+            for user in users:
+                user.start()
+            stop.wait(self.duration)
+        finally:
+            stop.set()
+            for user in users:
+                user.join()
+                user.close()
+            CustomAllure.configure(level=level)
+        elapsed = time.perf_counter() - start
+
+        steps: Dict[str, StepStats] = {case.name: StepStats() for case in self.scenario}
+        for user in users:
+            for name, stats in user.stats.items():
+                steps[name].merge(stats)
+
+        total = StepStats()
+        for stats in steps.values():
+            total.merge(stats)
+
+        result = self._summary(total, elapsed)
+        result.update(
+            users=self.users,
+            target_rps=self.rps,
+            histogram=total.histogram.buckets(),
+            steps={name: self._summary(s, elapsed) for name, s in steps.items()},
+        )
+        return result
+
+    @staticmethod
+    def _summary(stats: StepStats, elapsed: float) -> Dict[str, Any]:
+        return {
+            "duration": round(elapsed, 3),
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "throughput": round(stats.requests / elapsed, 2) if elapsed else 0.0,
+            "error_rate": (
+                round(stats.errors / stats.requests, 4) if stats.requests else 0.0
+            ),
+            "latency": stats.histogram.summary(),
+            "error_messages": stats.messages,
+        }
+
+
+def _resolve(name: str) -> str:
+    """用例名称对应 tests/test_data 下的 yml/yaml 文件，也可直接传入文件路径"""
+    path = os.path.join(ROOT_PATH, name)
+    if os.path.exists(path):
+        return path
+    data_path = Path(ROOT_PATH) / "tests" / "test_data" / name
+    for suffix in (".yml", ".yaml"):
+        if os.path.exists(f"{data_path}{suffix}"):
+            return f"{data_path}{suffix}"
+    raise FileNotFoundError(f"未找到用例文件: {name}")
+
+
+def load_scenario(names: Iterable[str], validate: bool = True) -> List[Case]:
+    """
+    按顺序读取用例文件组成压测场景，文件中的 Case 与 Flow 均按定义顺序执行
+
+    :param names: 用例名称或文件路径
+    :type names: Iterable[str]
+    :param validate: 是否执行用例中的验证信息
+    :type validate: bool
+    """
+    scenario = []
+    for name in names:
+        for item in read_yaml(_resolve(name)):
+            case = Flow(*item).case if isinstance(item, list) else Case(**item)
+            if not validate:
+                case.validate = None
+            scenario.append(case)
+    return scenario
+
+
+def _print_report(result: Dict[str, Any]):
+    rows = [("总计", result)] + list(result["steps"].items())
+    print(
+        f"{'用例':<16}{'请求数':>8}{'错误率':>8}{'RPS':>10}"
+        f"{'p50(ms)':>10}{'p90(ms)':>10}{'p99(ms)':>10}"
+    )
+    for name, stats in rows:
+        latency = stats["latency"]
+        print(
+            f"{name:<16}{stats['requests']:>8}{stats['error_rate']:>8.2%}"
+            f"{stats['throughput']:>10}{latency['p50']:>10}"
+            f"{latency['p90']:>10}{latency['p99']:>10}"
+        )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="复用 YAML 用例的压测模式")
+    parser.add_argument("cases", nargs="+", help="用例名称(tests/test_data 下)或路径")
+    parser.add_argument("-E", dest="env", default="local", help="环境名称")
+    parser.add_argument("-u", "--users", type=int, default=10, help="虚拟用户数")
+    parser.add_argument("-d", "--duration", type=float, default=60, help="时长(秒)")
+    parser.add_argument("--rps", type=float, default=None, help="目标RPS")
+    parser.add_argument(
+        "--no-validate", action="store_true", help="不执行用例中的验证信息"
+    )
+    parser.add_argument("-o", "--output", default=None, help="结果JSON文件路径")
+    args = parser.parse_args(argv)
+
+    config = read_yaml(configure.settings).get(args.env)
+    env = Configuration(**config)
+
+    runner = LoadRunner(
+        load_scenario(args.cases, validate=not args.no_validate),
+        base_url=env.server.url,
+        variables={"data-source": env.data_source.copy()},
+        users=args.users,
+        duration=args.duration,
+        rps=args.rps,
+    )
+    try:
+        result = runner.run()
+    finally:
+        close_pools()
+
+    _print_report(result)
+    if args.output:
+        with open(args.output, mode="w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    return result
+
+
+if __name__ == "__main__":
+    main()
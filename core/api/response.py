@@ -0,0 +1,232 @@
+from requests import Response
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Set, Tuple
+from utils.json_path import build_key_index, compile_path
+from utils.json_stream import StreamResult, scan
+
+# 流式读取响应体的块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class ResponseView:
+    """
+    接口响应视图
+
+    响应体只解码、解析一次，解析结果、响应头与耗时均缓存在视图上，
+    供记录、提取与断言共同使用。未定义的属性透传给原始 :class:`Response`。
+    """
+
+    def __init__(self, response: Response):
+        self.response = response
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    @property
+    def status_code(self) -> int:
+        return self.response.status_code
+
+    @cached_property
+    def headers(self) -> Dict[str, str]:
+        return dict(self.response.headers)
+
+    @cached_property
+    def cookies(self) -> Dict[str, str]:
+        return self.response.cookies.get_dict()
+
+    @cached_property
+    def elapsed(self) -> float:
+        """服务端响应耗时(秒)"""
+        return self.response.elapsed.total_seconds()
+
+    @cached_property
+    def text(self) -> str:
+        return self.response.text
+
+    @cached_property
+    def _parsed(self):
+        try:
+            return True, self.response.json()
+        except ValueError:
+            return False, None
+
+    @property
+    def is_json(self) -> bool:
+        return self._parsed[0]
+
+    def json(self) -> Any:
+        """
+        返回缓存的JSON解析结果
+
+        :raises ValueError: 响应内容不是有效的JSON
+        """
+        ok, data = self._parsed
+        if not ok:
+            raise ValueError("响应内容不是有效的JSON")
+        return data
+
+    @property
+    def body(self) -> Any:
+        """JSON响应返回解析结果，否则返回文本"""
+        ok, data = self._parsed
+        return data if ok else self.text
+
+    @property
+    def size(self) -> int:
+        """解压后的响应体字节数"""
+        return len(self.response.content)
+
+    @property
+    def wire_size(self) -> int:
+        """
+        网络上实际传输的响应体字节数，压缩传输时小于 :attr:`size` ；
+        回放等没有网络传输时与 :attr:`size` 相同
+        """
+        tell = getattr(self.response.raw, "tell", None)
+        return (tell() if tell else 0) or self.size
+
+    @cached_property
+    def key_index(self) -> Dict[str, List[Any]]:
+        """一次遍历建立的 key -> 值列表 索引，用于回答全部 ``$..key`` 查询"""
+        return build_key_index(self.json())
+
+    def find(self, expr: str) -> List[Any]:
+        """
+        使用JSONPath表达式查找响应中的值，表达式编译结果跨用例缓存
+
+        :param expr: JSONPath表达式
+        :type expr: str
+        :return: 匹配值列表，未匹配时返回空列表
+        :rtype: List[Any]
+        """
+        path = compile_path(expr)
+        key = path.descendant_key
+        if key is not None:
+            return self.key_index.get(key, [])
+        return path.find(self.json())
+
+
+class StreamedResponseView(ResponseView):
+    """
+    流式响应视图，用于体积很大的JSON响应
+
+    请求时需传入 ``stream=True`` ；提取与断言用到的JSONPath表达式预先通过 :meth:`expect` 登记，
+    第一次查找时边读取边解析，不保留响应文本。查找结果与顺序与 :class:`ResponseView` 一致：
+    只由子节点组成的表达式(如 ``$.data.id`` )全部找到后立即停止读取并关闭响应；
+    含 ``..`` 或 ``*`` 的表达式读取完整响应，只保留匹配值及其祖先结构。
+    """
+
+    def __init__(self, response: Response, chunk_size: int = STREAM_CHUNK_SIZE):
+        super().__init__(response)
+        self.chunk_size = chunk_size
+        self.targets: Set[str] = set()
+
+    def expect(self, exprs: Iterable[str]):
+        """
+        登记需要查找的JSONPath表达式，须在第一次查找前调用
+
+        :param exprs: JSONPath表达式
+        :type exprs: Iterable[str]
+        """
+        if self._scanned:
+            raise RuntimeError("响应已读取，不能再登记查找表达式")
+        self.targets.update(exprs)
+
+    @cached_property
+    def _result(self) -> Tuple[StreamResult, ValueError]:
+        """响应体只能读取一次，解析失败时同样缓存"""
+        try:
+            result = scan(
+                self.response.iter_content(self.chunk_size),
+                sorted(self.targets),
+                self.response.encoding or "utf-8",
+            )
+            return result, None
+        except ValueError as e:
+            return None, e
+        finally:
+            self.response.close()
+
+    @property
+    def _scan(self) -> StreamResult:
+        result, error = self._result
+        if error is not None:
+            raise ValueError(f"响应内容不是有效的JSON: {error}")
+        return result
+
+    @property
+    def _scanned(self) -> bool:
+        return "_result" in self.__dict__
+
+    @cached_property
+    def _parsed(self):
+        try:
+            return True, self._scan.top
+        except ValueError:
+            return False, None
+
+    @cached_property
+    def text(self) -> str:
+        raise ValueError("流式读取的响应不保留响应文本")
+
+    @property
+    def body(self) -> Any:
+        """响应体的读取情况，响应内容本身不保留"""
+        info = {"stream": True, "targets": sorted(self.targets)}
+        result, error = self._result if self._scanned else (None, None)
+        if result is not None:
+            info["bytes_read"] = result.bytes_read
+            info["complete"] = result.complete
+        if error is not None:
+            info["error"] = str(error)
+        return info
+
+    @property
+    def size(self) -> int:
+        """已读取的解压后字节数，读取前为空"""
+        result = self._result[0] if self._scanned else None
+        return result.bytes_read if result is not None else None
+
+    def json(self) -> Dict[str, Any]:
+        """
+        返回查找过程中命中的顶层字段
+
+        :raises ValueError: 响应内容不是有效的JSON
+        """
+        ok, data = self._parsed
+        if not ok:
+            raise ValueError("响应内容不是有效的JSON")
+        return data
+
+    def find(self, expr: str) -> List[Any]:
+        """
+        返回登记的JSONPath表达式的匹配值
+
+        :param expr: JSONPath表达式
+        :type expr: str
+        :return: 匹配值列表，未匹配时返回空列表
+        :rtype: List[Any]
+        """
+        if expr not in self.targets:
+            self.expect([expr])
+        return self._scan.found.get(expr, [])
+
+    def close(self):
+        self.response.close()
+
+
+def stream_targets(extract: Dict[str, str], validate: List[Dict[str, Any]]) -> Set[str]:
+    """
+    流式模式下需要查找的表达式：提取变量的表达式与 contain、eq、ne 断言的 ``$..key``
+
+    :param extract: 提取变量的配置
+    :type extract: Dict[str, str]
+    :param validate: 验证信息
+    :type validate: List[Dict[str, Any]]
+    """
+    targets = set((extract or {}).values())
+    for item in validate or []:
+        for mode, expected in item.items():
+            if mode in ("contain", "eq", "ne") and isinstance(expected, dict):
+                targets.update(f"$..{key}" for key in expected)
+    return targets
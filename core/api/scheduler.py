@@ -0,0 +1,176 @@
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Set
+from core.api.api_flow import Flow
+from utils.allure_reports import CustomAllure
+
+
+class StepStatus:
+    """流程步骤执行状态"""
+
+    PASSED = "passed"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+    TIMEOUT = "timeout"
+
+
+@dataclass
+class Step:
+    """流程图中的一个步骤"""
+
+    index: int
+    flow: Flow
+    produces: Set[str] = field(default_factory=set)
+    consumes: Set[str] = field(default_factory=set)
+    depends: Set[int] = field(default_factory=set)
+
+    @property
+    def name(self) -> str:
+        return self.flow.case.name
+
+
+class FlowScheduler:
+    """
+    多接口流程调度器
+
+    根据每个步骤 ``extract`` 产出的变量与请求中引用的占位符构建依赖图(DAG)，
+    没有数据依赖的步骤并发执行，存在依赖的步骤保持先后顺序；
+    上游步骤失败时，所有下游步骤立即标记为跳过。
+    设置了总时限时，超出时限仍未完成的步骤被取消，与其下游步骤一起标记为超时；
+    请求超时不超过剩余时限，被取消步骤的请求同样按时结束。
+    """
+
+    def __init__(self, flows: List[Flow], deadline: float = None):
+        """
+        :param flows: 按文件顺序排列的流程步骤
+        :type flows: List[Flow]
+        :param deadline: 流程总时限(秒)，为空时不限制
+        :type deadline: float
+        """
+        self.steps = self._build_graph(flows)
+        self.deadline = deadline
+
+    @staticmethod
+    def _build_graph(flows: List[Flow], strict: bool = True) -> List[Step]:
+        """
+        构建步骤依赖图，引用的变量依赖于此前最近一次产出该变量的步骤
+
+        :param flows: 按文件顺序排列的流程步骤
+        :type flows: List[Flow]
+        :param strict: 显式依赖的步骤不存在时是否抛出异常，按步骤分别执行时
+            上游步骤可能未被选中执行，此时忽略
+        :type strict: bool
+        """
+        steps: List[Step] = []
+        producers: Dict[str, int] = {}
+        names: Dict[str, int] = {}
+
+        for index, flow in enumerate(flows):
+            case = flow.case
+            step = Step(
+                index=index,
+                flow=flow,
+                produces=set((case.extract or {}).keys()),
+                consumes=set(case.request.template.names),
+            )
+
+            for name in step.consumes:
+                if name in producers:
+                    step.depends.add(producers[name])
+
+            # 显式声明的依赖，用于没有数据传递但存在业务先后关系的步骤
+            for upstream in case.depends or []:
+                if upstream in names:
+                    step.depends.add(names[upstream])
+                elif strict:
+                    raise ValueError(f"步骤 {case.name} 依赖的步骤 {upstream} 不存在")
+
+            for name in step.produces:
+                producers[name] = index
+            names[case.name] = index
+
+            steps.append(step)
+
+        return steps
+
+    @property
+    def graph(self) -> Dict[str, List[str]]:
+        """步骤名称与其上游步骤名称组成的依赖图"""
+        return {
+            step.name: [self.steps[i].name for i in sorted(step.depends)]
+            for step in self.steps
+        }
+
+    async def _run_step(
+        self,
+        step: Step,
+        executor: Any,
+        tasks: Dict[int, asyncio.Task],
+        expires: float = None,
+    ) -> Dict[str, Any]:
+        # 任一上游步骤完成即检查结果，失败时不必等待其他仍在执行的上游步骤
+        upstreams = {tasks[i]: i for i in step.depends}
+        pending = set(upstreams)
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in sorted(done, key=upstreams.get):
+                status = task.result()["status"]
+                if status == StepStatus.TIMEOUT:
+                    return self._timeout(step)
+                if status != StepStatus.PASSED:
+                    return self._skip(step, self.steps[upstreams[task]])
+
+        remaining = None
+        if expires is not None:
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                return self._timeout(step)
+
+        # 请求超时同样限制在剩余时限内，取消后线程池中的请求不会继续占用连接
+        try:
+            result = await asyncio.wait_for(
+                executor.execute_test_case_async(step.flow.case, expires), remaining
+            )
+        except asyncio.TimeoutError:
+            return self._timeout(step)
+
+        result["status"] = (
+            StepStatus.PASSED if result.get("passed") else StepStatus.FAILED
+        )
+        return result
+
+    def _skip(self, step: Step, upstream: Step) -> Dict[str, Any]:
+        """上游步骤未通过，步骤不再执行"""
+        message = f"上游步骤 {upstream.name} 未通过，跳过执行"
+        CustomAllure.attach(message, f"{step.name}: 跳过", "txt")
+        return {"name": step.name, "status": StepStatus.SKIPPED, "message": message}
+
+    def _timeout(self, step: Step) -> Dict[str, Any]:
+        """流程总时限用尽，步骤被取消或不再执行"""
+        message = f"超出流程总时限 {self.deadline}s，取消执行"
+        CustomAllure.attach(message, f"{step.name}: 超时", "txt")
+        return {"name": step.name, "status": StepStatus.TIMEOUT, "message": message}
+
+    async def run(self, executor: Any) -> List[Dict[str, Any]]:
+        """
+        按依赖图执行全部步骤
+
+        :param executor: 异步执行器 :class:`AsyncExecutor`
+        :type executor: AsyncExecutor
+        :return: 按步骤顺序排列的执行结果
+        :rtype: List[Dict[str, Any]]
+        """
+        expires = None
+        if self.deadline is not None:
+            expires = time.monotonic() + self.deadline
+
+        tasks: Dict[int, asyncio.Task] = {}
+        for step in self.steps:
+            tasks[step.index] = asyncio.create_task(
+                self._run_step(step, executor, tasks, expires)
+            )
+
+        return list(await asyncio.gather(*tasks.values()))
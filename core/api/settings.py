@@ -1,14 +1,45 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Any, Dict, List
 from utils.yaml_parse import read_yaml
 
 
+@dataclass
+class Pool:
+    """HTTP connection pool settings"""
+
+    # 缓存连接池的主机数
+    connections: int = 10
+    # 每个主机保留的最大连接数
+    maxsize: int = 10
+    # 连接用尽时等待空闲连接，而不是新建用完即关闭的临时连接
+    block: bool = False
+    # 空闲超过该时长(秒)的连接在复用前关闭，应小于服务端的 keep-alive 超时
+    idle_timeout: float = None
+    # 重试次数与退避系数，第n次重试前等待 backoff_factor * 2^(n-1) 秒
+    retries: int = 0
+    backoff_factor: float = 0
+    # 需要重试的响应状态码，如 [502, 503, 504]
+    retry_statuses: List[int] = None
+    # 允许重试的请求方法，默认只重试幂等方法
+    retry_methods: List[str] = None
+
+
 @dataclass
 class Server:
     """API server settings"""
 
     host: str
     port: int
+    # 请求体压缩方式 ['gzip','deflate']，为空时不压缩
+    compress: str = None
+    # 可接受的响应压缩方式，为空时使用 requests 默认值(gzip, deflate)，identity 表示不压缩
+    accept_encoding: str = None
+    # 请求超时(秒)，单个数值或 [连接超时, 读取超时]，为空时不限制
+    timeout: Any = None
+    pool: Pool = None
+
+    def __post_init__(self):
+        self.pool = Pool(**(self.pool or {}))
 
     @property
     def url(self):
@@ -24,15 +55,30 @@ class DataSource:
     username: str
     password: str
     database: str
+    pool_size: int = 5
+    idle_timeout: int = 300
+    max_lifetime: int = 3600
+
+
+@dataclass
+class Report:
+    """Allure report attachment settings"""
+
+    verbosity: str = "full"
+    max_body_size: int = 0
+    oversize: str = "truncate"
+    buffer_size: int = 200
 
 
 @dataclass
 class Configuration:
     server: Server
     data_source: Dict[str, DataSource]
+    report: Report = None
 
     def __post_init__(self):
         self.server = Server(**self.server)
+        self.report = Report(**(self.report or {}))
         # self.data_source = DataSource(**self.data_source)
 
         converted: Dict[str, DataSource] = {}
@@ -0,0 +1,207 @@
+import re
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Any, Callable, List, Mapping, Tuple
+
+# 占位符格式: ${func(args)} / ${var} / {{var}}
+PLACEHOLDER_PATTERN = re.compile(
+    r"\$\{(?P<func>\w+)\((?P<args>[^()]*)\)\}"
+    r"|\$\{(?P<var>[\w.\-]+)\}"
+    r"|\{\{(?P<ref>[\w.\-]+)\}\}"
+)
+
+
+@dataclass(frozen=True)
+class Placeholder:
+    """占位符片段"""
+
+    name: str
+    source: str
+    args: Tuple[str, ...] = None
+
+    @property
+    def is_call(self) -> bool:
+        return self.args is not None
+
+    def resolve(
+        self, variables: Mapping[str, Any], call: Callable[[str, List[str]], Any]
+    ) -> Any:
+        """
+        计算占位符的值，变量不存在时保留原始占位符文本
+
+        :param variables: 变量字典
+        :type variables: Mapping[str, Any]
+        :param call: 占位函数调用入口
+        :type call: Callable[[str, List[str]], Any]
+        """
+        if self.is_call:
+            return call(self.name, list(self.args))
+        if self.name in variables:
+            return variables[self.name]
+        return self.source
+
+
+class _Literal:
+    """不含占位符的常量节点"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def render(self, variables, call):
+        return self.value
+
+
+class _Single:
+    """整个字符串仅为一个占位符，渲染时保留变量的原始类型"""
+
+    __slots__ = ("placeholder",)
+
+    def __init__(self, placeholder: Placeholder):
+        self.placeholder = placeholder
+
+    def render(self, variables, call):
+        return self.placeholder.resolve(variables, call)
+
+
+class _Concat:
+    """字面量与占位符混合的字符串"""
+
+    __slots__ = ("segments",)
+
+    def __init__(self, segments: Tuple[Any, ...]):
+        self.segments = segments
+
+    def render(self, variables, call):
+        parts = []
+        for segment in self.segments:
+            if isinstance(segment, Placeholder):
+                parts.append(str(segment.resolve(variables, call)))
+            else:
+                parts.append(segment)
+        return "".join(parts)
+
+
+class _Dict:
+    __slots__ = ("items",)
+
+    def __init__(self, items: Tuple[Tuple[Any, Any], ...]):
+        self.items = items
+
+    def render(self, variables, call):
+        return {
+            key.render(variables, call): value.render(variables, call)
+            for key, value in self.items
+        }
+
+
+class _List:
+    __slots__ = ("items",)
+
+    def __init__(self, items: Tuple[Any, ...]):
+        self.items = items
+
+    def render(self, variables, call):
+        return [item.render(variables, call) for item in self.items]
+
+
+@lru_cache(maxsize=4096)
+def _compile_string(text: str):
+    """将字符串拆分为字面量与占位符片段，结果按字符串内容缓存"""
+
+    if "${" not in text and "{{" not in text:
+        return _Literal(text)
+
+    segments = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        if match.start() > position:
+            segments.append(text[position : match.start()])
+
+        if match.group("func"):
+            args = match.group("args")
+            params = tuple(p.strip() for p in args.split(",")) if args else ()
+            segments.append(Placeholder(match.group("func"), match.group(0), params))
+        else:
+            name = match.group("var") or match.group("ref")
+            segments.append(Placeholder(name, match.group(0)))
+
+        position = match.end()
+
+    if position < len(text):
+        segments.append(text[position:])
+
+    if not any(isinstance(s, Placeholder) for s in segments):
+        return _Literal(text)
+
+    if len(segments) == 1:
+        return _Single(segments[0])
+
+    return _Concat(tuple(segments))
+
+
+def _compile(data: Any, placeholders: List[Placeholder]):
+    if isinstance(data, dict):
+        items = tuple(
+            (_compile(k, placeholders), _compile(v, placeholders))
+            for k, v in data.items()
+        )
+        return _Dict(items)
+    if isinstance(data, (list, tuple)):
+        return _List(tuple(_compile(item, placeholders) for item in data))
+    if isinstance(data, str):
+        node = _compile_string(data)
+        if isinstance(node, _Single):
+            placeholders.append(node.placeholder)
+        elif isinstance(node, _Concat):
+            placeholders.extend(s for s in node.segments if isinstance(s, Placeholder))
+        return node
+    return _Literal(data)
+
+
+class Template:
+    """
+    请求模板，编译一次后可重复渲染。
+
+    编译阶段把数据结构拆分为字面量与占位符片段组成的执行计划，
+    渲染阶段按计划一次遍历完成替换，不经过 JSON 序列化与反序列化。
+    """
+
+    def __init__(self, source: Any):
+        self.source = source
+        placeholders: List[Placeholder] = []
+        self._plan = _compile(source, placeholders)
+        self.placeholders: Tuple[Placeholder, ...] = tuple(placeholders)
+
+    @property
+    def names(self) -> frozenset:
+        """模板引用的全部变量名与函数名"""
+        return frozenset(p.name for p in self.placeholders)
+
+    def render(
+        self,
+        variables: Mapping[str, Any],
+        call: Callable[[str, List[str]], Any] = None,
+    ) -> Any:
+        """
+        使用变量渲染模板，返回新的数据结构
+
+        :param variables: 变量字典
+        :type variables: Mapping[str, Any]
+        :param call: 占位函数调用入口，如 ${access_token()}
+        :type call: Callable[[str, List[str]], Any]
+        """
+        return self._plan.render(variables, call)
+
+
+def compile_template(data: Any) -> Template:
+    """
+    编译含占位符的任意数据
+
+    :param data: 含有占位符的任意类型数据
+    :type data: Any
+    :return: 编译后的模板
+    :rtype: Template
+    """
+    return data if isinstance(data, Template) else Template(data)
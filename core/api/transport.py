@@ -0,0 +1,182 @@
+import time
+from typing import Any, Dict, List
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from core.api.settings import Pool
+from utils.metrics import metrics
+
+# 建立连接耗时(DNS解析 + TCP连接，https 另含TLS握手)
+CONNECT_METRIC = "http_connect_seconds"
+# 连接池事件：created 新建、reused 复用、expired 空闲超时关闭、
+# discarded 连接池已满被丢弃、waited 等待空闲连接
+POOL_METRIC = "http_pool_connections_total"
+# 等待空闲连接的耗时
+POOL_WAIT_METRIC = "http_pool_wait_seconds"
+POOL_EVENTS = ("created", "reused", "expired", "discarded", "waited")
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with metrics.timer(CONNECT_METRIC, scheme="http", host=self.host):
+            super().connect()
+        metrics.inc(POOL_METRIC, host=self.host, event="created")
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with metrics.timer(CONNECT_METRIC, scheme="https", host=self.host):
+            super().connect()
+        metrics.inc(POOL_METRIC, host=self.host, event="created")
+
+
+class _PoolStats:
+    """统计连接的复用、等待与丢弃，并关闭空闲超时的连接"""
+
+    idle_timeout: float = None
+
+    def _get_conn(self, timeout: float = None):
+        # 阻塞模式下没有空闲连接时需要等待其他请求归还
+        waiting = self.block and self.pool is not None and self.pool.empty()
+        start = time.perf_counter()
+        conn = super()._get_conn(timeout)
+        if waiting:
+            metrics.inc(POOL_METRIC, host=self.host, event="waited")
+            metrics.observe(
+                POOL_WAIT_METRIC, time.perf_counter() - start, host=self.host
+            )
+
+        if conn.sock is not None:
+            idle = time.monotonic() - getattr(conn, "released_at", 0)
+            if self.idle_timeout is not None and idle > self.idle_timeout:
+                # 关闭后发送请求时重新建立连接
+                conn.close()
+                metrics.inc(POOL_METRIC, host=self.host, event="expired")
+            else:
+                metrics.inc(POOL_METRIC, host=self.host, event="reused")
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            conn.released_at = time.monotonic()
+            if self.pool is not None and self.pool.full():
+                metrics.inc(POOL_METRIC, host=self.host, event="discarded")
+        super()._put_conn(conn)
+
+
+class TimedHTTPConnectionPool(_PoolStats, HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(_PoolStats, HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedAdapter(HTTPAdapter):
+    """
+    记录新建连接耗时与连接池统计的传输适配器
+
+    ``requests`` 不单独暴露DNS与连接耗时，这里在 urllib3 建立连接时计时，
+    复用连接池中的连接不产生耗时记录，只计入复用次数。
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["idle_timeout"]
+
+    def __init__(self, idle_timeout: float = None, **kwargs):
+        """
+        :param idle_timeout: 空闲超过该时长(秒)的连接在复用前关闭
+        :type idle_timeout: float
+        :param kwargs: 传递给 :class:`HTTPAdapter` 的连接池与重试参数
+        """
+        self.idle_timeout = idle_timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        pool = super().get_connection_with_tls_context(*args, **kwargs)
+        pool.idle_timeout = self.idle_timeout
+        return pool
+
+
+def adapter_options(pool: Pool, min_size: int = 0) -> Dict[str, Any]:
+    """
+    由环境配置中的连接池设置生成 :class:`TimedAdapter` 参数
+
+    :param pool: 连接池设置
+    :type pool: Pool
+    :param min_size: 连接数下限，并发执行时不低于并发数
+    :type min_size: int
+    """
+    retries = 0
+    if pool.retries:
+        methods = pool.retry_methods
+        retries = Retry(
+            total=pool.retries,
+            backoff_factor=pool.backoff_factor,
+            status_forcelist=pool.retry_statuses,
+            allowed_methods=(
+                frozenset(m.upper() for m in methods)
+                if methods
+                else Retry.DEFAULT_ALLOWED_METHODS
+            ),
+            # 重试用尽后返回最后一次响应，交由断言判断
+            raise_on_status=False,
+        )
+    return {
+        "pool_connections": max(pool.connections, min_size),
+        "pool_maxsize": max(pool.maxsize, min_size),
+        "pool_block": pool.block,
+        "max_retries": retries,
+        "idle_timeout": pool.idle_timeout,
+    }
+
+
+def timed_session(**kwargs) -> Session:
+    """
+    创建挂载了 :class:`TimedAdapter` 的会话
+
+    :param kwargs: 传递给 :class:`TimedAdapter` 的参数
+    """
+    session = Session()
+    adapter = TimedAdapter(**kwargs)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """
+    按主机汇总连接池统计，复用率为复用次数占取用连接次数的比例
+
+    :return: 每个主机的各事件次数、等待耗时与复用率
+    :rtype: List[Dict[str, Any]]
+    """
+    snapshot = metrics.to_dict()
+    hosts: Dict[str, Dict[str, Any]] = {}
+    for item in snapshot.get(POOL_METRIC, []):
+        labels = item["labels"]
+        stats = hosts.setdefault(labels.get("host"), dict.fromkeys(POOL_EVENTS, 0))
+        stats[labels.get("event")] = int(item["value"])
+    for item in snapshot.get(POOL_WAIT_METRIC, []):
+        stats = hosts.setdefault(
+            item["labels"].get("host"), dict.fromkeys(POOL_EVENTS, 0)
+        )
+        stats["wait_seconds"] = item["sum"]
+
+    result = []
+    for host, stats in sorted(hosts.items(), key=lambda h: str(h[0])):
+        acquired = stats["created"] + stats["reused"]
+        stats.setdefault("wait_seconds", 0.0)
+        stats["reuse_ratio"] = (
+            round(stats["reused"] / acquired, 3) if acquired else None
+        )
+        result.append({"host": host, **stats})
+    return result
@@ -0,0 +1,100 @@
+import json
+import threading
+from collections import deque
+from types import SimpleNamespace
+from allure_commons.model2 import Attachment
+from core.api.core import Context
+from utils import allure_reports
+from utils.allure_reports import AttachLevel, AttachmentWriter, CustomAllure
+
+
+def _hook(monkeypatch, fail: int = 0):
+    """替换报告插件的附件写入钩子，前 fail 次写入抛出异常"""
+    files = {}
+    calls = {"count": 0}
+
+    def report_attached_data(body: bytes, file_name: str):
+        calls["count"] += 1
+        if calls["count"] <= fail:
+            raise OSError("disk full")
+        files[file_name] = body
+
+    hook = SimpleNamespace(report_attached_data=report_attached_data)
+    monkeypatch.setattr(allure_reports, "plugin_manager", SimpleNamespace(hook=hook))
+    return files
+
+
+class TestAttachmentWriter:
+
+    def test_deduplicates_identical_content(self, monkeypatch):
+        files = _hook(monkeypatch)
+        writer = AttachmentWriter()
+        first, second = Attachment(name="a"), Attachment(name="b")
+        writer.submit({"id": 1}, "json", first, "json")
+        writer.submit({"id": 1}, "json", second, "json")
+        writer.flush()
+        assert first.source == second.source
+        assert len(files) == 1
+        assert writer.stats["deduplicated"] == 1
+
+    def test_failed_write_falls_back_to_inline(self, monkeypatch, caplog):
+        files = _hook(monkeypatch, fail=1)
+        writer = AttachmentWriter()
+        attachment = Attachment(name="响应")
+        writer.submit({"id": 1}, "json", attachment, "json")
+        writer.flush()
+        assert writer.stats["failed"] == 1
+        assert "后台写入附件失败" in caplog.text
+        assert json.loads(files[attachment.source]) == {"id": 1}
+
+
+class TestCustomAllure:
+
+    def test_on_failure_enqueues_reference_once(self, monkeypatch):
+        submitted = []
+        item = SimpleNamespace(attachments=[])
+        monkeypatch.setattr(CustomAllure, "level", AttachLevel.ON_FAILURE)
+        monkeypatch.setattr(CustomAllure, "_buffer", deque())
+        monkeypatch.setattr(CustomAllure, "_current_item", classmethod(lambda c: item))
+        monkeypatch.setattr(
+            CustomAllure.writer, "submit", lambda body, *args: submitted.append(body)
+        )
+        body = {"data": {"id": 1}}
+        CustomAllure.attach(body, "请求结果", "json", detail=True, summary={"id": 1})
+        assert submitted == [{"id": 1}]
+        CustomAllure.release()
+        assert submitted[1] is body
+        assert len(item.attachments) == 2
+
+    def test_muted_only_in_current_thread(self, monkeypatch):
+        written = []
+        monkeypatch.setattr(
+            CustomAllure,
+            "_write",
+            classmethod(lambda c, body, *a: written.append(body)),
+        )
+        monkeypatch.setattr(CustomAllure, "_current_item", classmethod(lambda c: None))
+        other = threading.Thread(target=CustomAllure.attach, args=("b", "b", "txt"))
+        with CustomAllure.muted():
+            CustomAllure.attach("a", "a", "txt")
+            other.start()
+            other.join()
+        CustomAllure.attach("c", "c", "txt")
+        assert written == ["b", "c"]
+
+    def test_rendered_params_attached_as_copy(self, monkeypatch):
+        attached = {}
+        monkeypatch.setattr(
+            CustomAllure,
+            "attach",
+            classmethod(lambda c, body, name, *a, **k: attached.setdefault(name, body)),
+        )
+        params = Context().parse_and_replace({"path": "${path}"}, {"path": "a"})
+        params["timeout"] = 1
+        assert attached["替换变量值"] == {"path": "a"}
+
+    def test_list_serialized_as_json(self):
+        stats = [{"host": "127.0.0.1", "reuse_ratio": 0.5, "名称": "连接池"}]
+        content = CustomAllure.serialize(stats, "json")
+        assert json.loads(content) == stats
+        assert "连接池" in content
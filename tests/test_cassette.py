@@ -0,0 +1,63 @@
+import requests
+import pytest
+from utils.multipart import MultipartEncoder, multipart_headers
+from utils.stub_server import StubServer
+from core.api.cassette import (
+    Cassette,
+    CassetteMissError,
+    CassetteMode,
+    request_key,
+    use_cassette,
+)
+
+
+class TestCassette:
+
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "api.jsonl.gz")
+        routes = [
+            {"path": "user", "body": {"id": 1, "name": "中文"}, "latency": 50},
+            {"path": "login", "method": "POST", "headers": {"Set-Cookie": "sid=abc"}},
+        ]
+        with StubServer(routes) as server:
+            session = requests.Session()
+            cassette = Cassette(path)
+            use_cassette(session, cassette, CassetteMode.RECORD)
+            recorded = session.get(server.url + "user?b=2&a=1")
+            session.post(server.url + "login", json={"user": "a"})
+            cassette.save()
+            url = server.url
+
+        # 服务已关闭，回放不访问网络
+        session = requests.Session()
+        use_cassette(session, Cassette(path), CassetteMode.REPLAY)
+        replayed = session.get(url + "user?a=1&b=2")
+        assert replayed.status_code == 200
+        assert replayed.json() == {"id": 1, "name": "中文"}
+        # 回放保留录制时的耗时，而不是本地构造响应的耗时
+        assert replayed.elapsed.total_seconds() >= 0.05
+        assert abs(replayed.elapsed - recorded.elapsed).total_seconds() < 0.01
+
+        session.post(url + "login", json={"user": "a"})
+        assert session.cookies.get("sid") == "abc"
+        with pytest.raises(CassetteMissError):
+            session.post(url + "login", json={"user": "b"})
+
+    def test_multipart_keyed_by_files(self, tmp_path):
+        small, large = tmp_path / "small.txt", tmp_path / "large.txt"
+        small.write_bytes(b"a" * 10)
+        large.write_bytes(b"a" * 20)
+        keys = []
+        for path in (small, small, large):
+            encoder = MultipartEncoder({"file": str(path)}, fields={"kind": "avatar"})
+            request = requests.Request(
+                "POST",
+                "http://stub/upload",
+                data=encoder,
+                headers=multipart_headers(encoder),
+            ).prepare()
+            keys.append(request_key(request))
+            encoder.close()
+        # 分隔符随机生成，相同文件的键一致，不同大小的文件键不同
+        assert keys[0] == keys[1]
+        assert keys[0] != keys[2]
@@ -0,0 +1,80 @@
+import json
+import pytest
+from core.api.api_flow import Case
+from core.api.core import Request
+from core.api.executor import Executor
+from utils.data_table import open_table, read_table
+from utils.stub_server import StubServer
+
+
+class TestDataTable:
+
+    def test_csv_with_bom(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("id,name\n1,张三\n2,李四\n", encoding="utf-8-sig")
+        assert list(read_table(str(path))) == [
+            {"id": "1", "name": "张三"},
+            {"id": "2", "name": "李四"},
+        ]
+
+    def test_jsonl_skips_blank_lines_and_keeps_types(self, tmp_path):
+        path = tmp_path / "users.jsonl"
+        path.write_text('{"id": 1}\n\n{"id": 2, "tags": ["a"]}\n', encoding="utf-8")
+        assert list(read_table(str(path))) == [{"id": 1}, {"id": 2, "tags": ["a"]}]
+
+    def test_empty_jsonl(self, tmp_path):
+        path = tmp_path / "empty.jsonl"
+        path.write_bytes(b"")
+        assert list(read_table(str(path))) == []
+
+    def test_limit_and_explicit_format(self, tmp_path):
+        path = tmp_path / "users.txt"
+        path.write_text("\n".join(json.dumps({"id": i}) for i in range(10)))
+        rows = open_table({"file": str(path), "format": "jsonl", "limit": 3})
+        assert [row["id"] for row in rows] == [0, 1, 2]
+
+    def test_unsupported_and_missing_files(self, tmp_path):
+        path = tmp_path / "users.xlsx"
+        path.write_bytes(b"")
+        with pytest.raises(ValueError):
+            list(read_table(str(path)))
+        with pytest.raises(FileNotFoundError):
+            list(read_table(str(tmp_path / "missing.csv")))
+
+    def test_parquet(self, tmp_path):
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "users.parquet"
+        pq.write_table(pa.table({"id": [1, 2]}), str(path))
+        assert list(read_table(str(path))) == [{"id": 1}, {"id": 2}]
+
+
+class TestExecuteDataTable:
+
+    def test_rows_bound_to_request_and_validation(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("path\nok\nok\nmissing\n")
+        case = Case(
+            name="数据驱动",
+            dataset={"file": str(path), "report_rows": 1},
+            request={"method": "GET", "path": "{{path}}"},
+            validate=[{"eq": {"code": 0}}],
+        )
+        with StubServer([{"path": "ok", "body": {"code": 0}}]) as server:
+            executor = Executor(Request(base_url=server.url))
+            with pytest.raises(AssertionError, match="共 3 行，1 行未通过"):
+                executor.execute_test_case(case)
+
+    def test_function_placeholder_in_validation(self, tmp_path):
+        path = tmp_path / "users.csv"
+        path.write_text("path\nok\n")
+        case = Case(
+            name="数据驱动",
+            dataset={"file": str(path)},
+            request={"method": "GET", "path": "{{path}}"},
+            validate=[{"eq": {"code": "${access_token()}"}}],
+        )
+        with StubServer([{"path": "ok", "body": {"code": 0}}]) as server:
+            executor = Executor(Request(base_url=server.url))
+            executor.request.context.variables["access_token"] = 0
+            executor.execute_test_case(case)
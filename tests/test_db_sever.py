@@ -0,0 +1,186 @@
+import time
+import pytest
+import pymysql
+import threading
+from pymysql.constants import CLIENT
+from core.api.settings import DataSource
+from utils import db_sever
+from utils.assertions import Assertions
+from utils.db_sever import ConnectionPool, DBClient, close_pools, connection_pool
+
+
+class _Cursor:
+    """按语句返回预设结果的游标，语句以 error 开头时抛出SQL异常"""
+
+    def __init__(self, connection: "_Connection"):
+        self.connection = connection
+        self._rows = []
+
+    def execute(self, sql: str):
+        self.connection.executed.append(sql)
+        if sql.startswith("error"):
+            raise pymysql.err.ProgrammingError(1064, "syntax error")
+        self._rows = [{"sql": part} for part in sql.split(";\n")]
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def nextset(self):
+        self._rows = self._rows[1:]
+        return True if self._rows else None
+
+    def close(self):
+        pass
+
+
+class _Connection:
+    def __init__(self, client_flag: int = 0, **kwargs):
+        self.client_flag = client_flag
+        self.executed = []
+        self.closed = False
+
+    def cursor(self, cursor=None):
+        return _Cursor(self)
+
+    def ping(self, reconnect=False):
+        if self.closed:
+            raise pymysql.err.OperationalError(2006, "MySQL server has gone away")
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """替换 pymysql.connect，返回已建立的连接列表"""
+    created = []
+
+    def connect(**kwargs):
+        created.append(_Connection(**kwargs))
+        return created[-1]
+
+    monkeypatch.setattr(db_sever.pymysql, "connect", connect)
+    yield created
+    close_pools()
+
+
+def _source() -> DataSource:
+    return DataSource(host="db", port=3306, username="u", password="p", database="d")
+
+
+class TestDBClient:
+
+    def test_multi_statements_only_on_batch_connection(self, connections):
+        DBClient(dataSource={"mysql": _source()}).query("SELECT 1")
+        batch = DBClient(dataSource={"mysql": _source()}, multi_statements=True)
+        assert batch.query_batch(["SELECT 1;", "SELECT 2"]) == [
+            {"sql": "SELECT 1"},
+            {"sql": "SELECT 2"},
+        ]
+        assert [c.client_flag for c in connections] == [0, CLIENT.MULTI_STATEMENTS]
+        assert connections[1].executed == ["SELECT 1;\nSELECT 2"]
+
+    def test_single_sql_assertion_uses_plain_connection(self, connections):
+        source = {"mysql": _source()}
+        assert Assertions._assert_by_database_batch(["SELECT 1"], source) == 0
+        assert (
+            Assertions._assert_by_database_batch(["SELECT 1", "SELECT 2"], source) == 0
+        )
+        assert [c.client_flag for c in connections] == [0, CLIENT.MULTI_STATEMENTS]
+
+    def test_batch_without_multi_statements_runs_each(self, connections):
+        client = DBClient(dataSource={"mysql": _source()})
+        results = client.query_batch(["SELECT 1", "error", "SELECT 2"])
+        assert results[0] == {"sql": "SELECT 1"}
+        assert isinstance(results[1], pymysql.err.ProgrammingError)
+        assert results[2] == {"sql": "SELECT 2"}
+        assert connections[0].executed == ["SELECT 1", "error", "SELECT 2"]
+
+
+class TestConnectionPool:
+
+    def test_released_connection_is_reused(self, connections):
+        pool = ConnectionPool({})
+        first = pool.acquire()
+        pool.release(first)
+        assert pool.acquire() is first
+        assert len(connections) == 1
+
+    def test_full_pool_times_out(self, connections):
+        pool = ConnectionPool({}, max_size=1)
+        pool.acquire()
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+
+    def test_waiter_gets_released_connection(self, connections):
+        pool = ConnectionPool({}, max_size=1)
+        first = pool.acquire()
+        threading.Timer(0.05, pool.release, args=(first,)).start()
+        assert pool.acquire(timeout=1) is first
+
+    def test_idle_connection_expires(self, connections):
+        pool = ConnectionPool({}, idle_timeout=0.01)
+        first = pool.acquire()
+        pool.release(first)
+        time.sleep(0.02)
+        assert pool.acquire() is not first
+        assert first.closed
+
+    def test_connection_past_lifetime_is_closed_on_release(self, connections):
+        pool = ConnectionPool({}, max_lifetime=0)
+        first = pool.acquire()
+        pool.release(first)
+        assert first.closed
+        assert pool.acquire() is not first
+
+    def test_broken_connection_is_not_reused(self, connections):
+        pool = ConnectionPool({})
+        first = pool.acquire()
+        pool.release(first, broken=True)
+        assert first.closed
+        assert pool.acquire() is not first
+
+    def test_unhealthy_connection_is_replaced(self, connections, monkeypatch):
+        pool = ConnectionPool({})
+        monkeypatch.setattr(pool, "health_check_interval", 0)
+        first = pool.acquire()
+        pool.release(first)
+        first.closed = True
+        assert pool.acquire() is not first
+
+    def test_closed_pool_rejects_acquire(self, connections):
+        pool = ConnectionPool({})
+        pool.release(pool.acquire())
+        pool.close()
+        assert connections[0].closed
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+
+    def test_pool_shared_per_data_source(self, connections):
+        source = _source()
+        config = {"host": "db", "port": 3306}
+        assert connection_pool(config, source) is connection_pool(dict(config), source)
+        assert connection_pool(config, source) is not connection_pool(
+            config, source, multi_statements=True
+        )
+
+    def test_multi_statement_pool_shares_limit(self, connections):
+        source = _source()
+        source.pool_size = 1
+        config = {"host": "db", "port": 3306}
+        plain = connection_pool(config, source)
+        multi = connection_pool(config, source, multi_statements=True)
+        first = plain.acquire()
+        with pytest.raises(TimeoutError):
+            multi.acquire(timeout=0.05)
+        # 名额用尽时回收普通连接池中的空闲连接
+        plain.release(first)
+        multi.acquire(timeout=0.05)
+        assert connections[0].closed
+        assert len(connections) == 2
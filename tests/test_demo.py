@@ -31,3 +31,8 @@ class TestLogin:
     def test_logout(self, data, executor: Executor):
         data = Case(**data)
         executor.execute_test_case(data)
+
+    @pytest.mark.data("login_table")
+    def test_login_table(self, data, executor: Executor):
+        data = Case(**data)
+        executor.execute_test_case(data)
@@ -0,0 +1,143 @@
+import time
+import asyncio
+import pytest
+from core.api import core
+from core.api.api_flow import Case, Flow
+from core.api.core import REQUEST_PHASE_METRIC, AsyncRequest, Request
+from core.api.executor import AsyncExecutor, Executor
+from utils.metrics import MetricsRegistry
+from utils.stub_server import StubServer
+from utils.yaml_parse import YAMLParser
+
+ROUTES = [
+    {"path": "fast", "latency": 50},
+    {"path": "slow", "latency": 1000},
+]
+
+
+def _flow(
+    path: str, deadline: float = None, step: int = 0, steps: int = 3, flow="a.yaml"
+) -> Flow:
+    info = {"deadline": deadline, "flow": flow, "step": step, "steps": steps}
+    return Flow(info, {"name": path, "request": {"method": "GET", "path": path}})
+
+
+class TestExecutorFlowDeadline:
+
+    def test_flow_deadline_stops_later_steps(self):
+        with StubServer(ROUTES) as server:
+            executor = Executor(Request(base_url=server.url, timeout=[3, 30]))
+            executor.execute_test_flow(_flow("fast", 0.3, step=0))
+            # 进行中的请求超时不超过剩余时限
+            with pytest.raises(TimeoutError):
+                executor.execute_test_flow(_flow("slow", 0.3, step=1))
+            # 超出时限后的步骤不再发送请求
+            with pytest.raises(TimeoutError):
+                executor.execute_test_flow(_flow("fast", 0.3, step=2))
+            # 最后一个步骤结束后清除，再次执行该流程时重新计时
+            assert executor._flows == {}
+            executor.execute_test_flow(_flow("fast", 0.3, step=0))
+
+    def test_flows_timed_separately(self):
+        with StubServer(ROUTES) as server:
+            executor = Executor(Request(base_url=server.url))
+            executor.execute_test_flow(_flow("fast", 0.3, flow="a.yaml"))
+            with pytest.raises(TimeoutError):
+                executor.execute_test_flow(_flow("slow", 0.3, step=1, flow="a.yaml"))
+            # 默认项目与模块相同的其他流程不受影响
+            executor.execute_test_flow(_flow("fast", 0.3, step=1, flow="b.yaml"))
+
+    def test_flow_without_deadline(self):
+        with StubServer(ROUTES) as server:
+            executor = Executor(Request(base_url=server.url))
+            executor.execute_test_flow(_flow("fast"))
+
+
+class TestFlowSteps:
+
+    def test_failed_upstream_skips_dependents(self):
+        cases = [
+            {
+                "name": "登录",
+                "request": {"path": "login"},
+                "extract": {"token": "$.token"},
+                "validate": [{"eq": {"code": 0}}],
+            },
+            {"name": "用户信息", "request": {"path": "info/${token}"}},
+            {"name": "公告", "request": {"path": "notice"}},
+            {"name": "退出", "request": {"path": "notice"}, "depends": ["用户信息"]},
+        ]
+        data = YAMLParser().normalize([{"info": {}, "cases": cases}], "login.yaml")
+        routes = [{"path": "login", "body": {"code": 1}}, {"path": "notice"}]
+        with StubServer(routes) as server:
+            executor = Executor(Request(base_url=server.url))
+            with pytest.raises(AssertionError):
+                executor.execute_test_flow(Flow(*data[0]))
+            with pytest.raises(pytest.skip.Exception, match="登录"):
+                executor.execute_test_flow(Flow(*data[1]))
+            executor.execute_test_flow(Flow(*data[2]))
+            # 跳过的步骤同样视为未通过，其下游步骤继续跳过
+            with pytest.raises(pytest.skip.Exception, match="用户信息"):
+                executor.execute_test_flow(Flow(*data[3]))
+        assert executor._flows == {}
+
+    def test_steps_carry_flow_identity(self):
+        cases = [{"name": name, "request": {"path": name}} for name in "ab"]
+        data = YAMLParser().normalize(
+            [{"info": {"project": "p"}, "cases": cases}], "flows/login.yaml"
+        )
+        infos = [Flow(*item).info for item in data]
+        assert [(i.flow, i.step, i.steps) for i in infos] == [
+            ("flows/login.yaml", 0, 2),
+            ("flows/login.yaml", 1, 2),
+        ]
+
+
+class TestAsyncExecutor:
+
+    def test_data_table_does_not_block_other_cases(self, tmp_path):
+        path = tmp_path / "rows.csv"
+        path.write_text("id\n1\n2\n3\n")
+        table = Case(
+            name="数据驱动",
+            dataset={"file": str(path)},
+            request={"method": "GET", "path": "slow"},
+        )
+        fast = Case(name="快速接口", request={"method": "GET", "path": "fast"})
+
+        async def finished(coroutine) -> float:
+            result = await coroutine
+            assert result["passed"], result
+            return time.perf_counter()
+
+        async def run(executor: AsyncExecutor):
+            return await asyncio.gather(
+                finished(executor.execute_test_case_async(table)),
+                finished(executor.execute_test_case_async(fast)),
+            )
+
+        routes = [{"path": "slow", "latency": 200}, {"path": "fast"}]
+        with StubServer(routes) as server:
+            request = AsyncRequest(base_url=server.url)
+            start = time.perf_counter()
+            table_done, fast_done = asyncio.run(run(AsyncExecutor(request)))
+            request.close()
+        assert table_done - start >= 0.6
+        assert fast_done - start < 0.3
+
+
+class TestLatencySampling:
+
+    def test_measure_skips_request_metrics(self, monkeypatch):
+        registry = MetricsRegistry()
+        monkeypatch.setattr(core, "metrics", registry)
+        with StubServer([{"path": "api", "method": "POST"}]) as server:
+            request = Request(base_url=server.url)
+            request.request("POST", "api", json={"id": 1})
+            before = registry.to_dict()
+            for _ in range(3):
+                elapsed, status = request.measure("POST", "api", json={"id": 1})
+                assert status == 200 and elapsed > 0
+        assert registry.to_dict() == before
+        network = before[REQUEST_PHASE_METRIC]
+        assert [s["count"] for s in network if s["labels"]["phase"] == "network"] == [1]
@@ -3,7 +3,7 @@ import allure
 from core.api.api_flow import Flow
 from utils.generate import cid, mid
 from configs.configure import Environ
-from core.api.executor import Executor
+from core.api.executor import AsyncExecutor, Executor
 
 
 @pytest.mark.demo
@@ -17,3 +17,8 @@ class TestLoginFlow:
         data = Flow(*data)
         allure.dynamic.story(next(cid) + data.case.name)
         executor.execute_test_flow(data)
+
+    @pytest.mark.data("case", group=True)
+    def test_login_flow_graph(self, data, async_executor: AsyncExecutor):
+        flows = [Flow(*item) for item in data]
+        async_executor.execute_test_flows(flows)
@@ -0,0 +1,68 @@
+import sqlite3
+import pytest
+from utils.history import HistoryStore, mann_whitney_u, regressions
+
+
+def _run(store: HistoryStore, elapsed: float, duration: float = 1.0, env="test"):
+    run_id = store.start_run(env)
+    responses = [("登录", 200, 100, elapsed, 60)]
+    store.add_result(
+        run_id, env, "tests/test_a.py::test_login", "passed", duration, responses
+    )
+    return run_id
+
+
+class TestMannWhitneyU:
+
+    def test_separated_samples(self):
+        # U=9, mu=4.5, sigma^2=5.25，连续性修正后 z=1.7457
+        assert mann_whitney_u([4, 5, 6], [1, 2, 3]) == pytest.approx(0.040428, rel=1e-4)
+        assert mann_whitney_u([1, 2, 3], [4, 5, 6]) > 0.95
+
+    def test_tie_correction(self):
+        # 4个并列值的秩为3.5，同秩修正后 sigma^2=3.75，z=1.0328
+        assert mann_whitney_u([2, 2, 3], [1, 2, 2]) == pytest.approx(0.15085, rel=1e-3)
+
+    def test_degenerate_samples(self):
+        assert mann_whitney_u([], [1, 2]) == 1.0
+        assert mann_whitney_u([1, 1], [1, 1]) == 1.0
+
+
+class TestHistoryStore:
+
+    def test_results_and_durations(self, tmp_path):
+        store = HistoryStore(str(tmp_path / "history.db"))
+        for duration in (1.0, 3.0, 2.0):
+            _run(store, 0.1, duration)
+        assert store.durations("test") == {"tests/test_a.py::test_login": 2.0}
+        assert store.durations("prod") == {}
+        store.close()
+
+    def test_detects_latency_regression(self, tmp_path):
+        store = HistoryStore(str(tmp_path / "history.db"))
+        for elapsed in (0.10, 0.11, 0.09, 0.10, 0.12, 0.10, 0.11, 0.09, 0.10, 0.11):
+            _run(store, elapsed)
+        assert regressions(store, "test", recent=3, baseline=10) == []
+
+        for elapsed in (0.30, 0.31, 0.29):
+            _run(store, elapsed)
+        found = regressions(store, "test", recent=3, baseline=10, alpha=0.05)
+        assert [r["case"] for r in found] == ["tests/test_a.py::test_login"]
+        assert found[0]["ratio"] > 2
+        store.close()
+
+    def test_migrates_old_database(self, tmp_path):
+        path = str(tmp_path / "history.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE results (run_id TEXT NOT NULL, env TEXT NOT NULL, "
+            "case_id TEXT NOT NULL, name TEXT, outcome TEXT NOT NULL, "
+            "status_code INTEGER, size INTEGER, elapsed REAL, duration REAL, "
+            "requests INTEGER, created_at REAL NOT NULL)"
+        )
+        conn.close()
+        store = HistoryStore(path)
+        _run(store, 0.1)
+        columns = {row[1] for row in store.conn.execute("PRAGMA table_info(results)")}
+        assert "wire_size" in columns
+        store.close()
@@ -0,0 +1,68 @@
+import random
+import jsonpath
+import pytest
+from utils.json_path import build_key_index, compile_path
+
+EXPRS = [
+    "$.data.id",
+    "$.items[0].id",
+    "$.items[*].id",
+    "$['data']['name']",
+    "$.*",
+    "$..id",
+    "$..name",
+    "$..items[*]",
+    "$..data..id",
+    "$..a.id",
+]
+KEYS = ["id", "name", "items", "data", "a"]
+
+
+def _document(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth > 4 or roll < 0.3:
+        return rng.choice([1, 2, "x", None, True, 3.5])
+    if roll < 0.65:
+        keys = rng.sample(KEYS, rng.randint(0, 4))
+        return {key: _document(rng, depth + 1) for key in keys}
+    return [_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def _expected(data, expr: str):
+    return jsonpath.jsonpath(data, expr) or []
+
+
+class TestJsonPath:
+
+    @pytest.mark.parametrize("expr", EXPRS)
+    def test_compiled_paths_match_jsonpath(self, expr):
+        rng = random.Random(expr)
+        path = compile_path(expr)
+        assert path.compiled
+        for _ in range(300):
+            data = {"data": {"id": 1, "name": "n"}, "rest": _document(rng)}
+            assert path.find(data) == _expected(data, expr)
+
+    def test_key_index_matches_descendant_lookup(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            data = _document(rng)
+            index = build_key_index(data)
+            for key in KEYS:
+                path = compile_path(f"$..{key}")
+                assert path.descendant_key == key
+                assert index.get(key, []) == _expected(data, f"$..{key}")
+
+    def test_filter_falls_back_to_jsonpath(self):
+        data = {"items": [{"id": 1}, {"id": 2}]}
+        path = compile_path("$.items[?(@.id > 1)]")
+        assert not path.compiled
+        assert path.find(data) == [{"id": 2}]
+
+    def test_compiled_path_is_cached(self):
+        assert compile_path("$.data.id") is compile_path("$.data.id")
+        assert compile_path("$.data.id").descendant_key is None
+
+    def test_no_match_returns_empty_list(self):
+        assert compile_path("$.missing").find({"id": 1}) == []
+        assert compile_path("$..missing").find([1, 2]) == []
@@ -0,0 +1,106 @@
+import io
+import json
+import random
+import pytest
+from requests import Response
+from utils.assertions import Assertions
+from utils.json_stream import JsonEvents, scan
+from core.api.response import ResponseView, StreamedResponseView
+
+EXPRS = [
+    "$..id",
+    "$..name",
+    "$..items",
+    "$..items[*]",
+    "$..data..id",
+    "$..a.id",
+    "$.data.id",
+    "$.items[0].id",
+    "$.items[*].id",
+    "$.*",
+    "$[0]",
+]
+KEYS = ["id", "name", "items", "data", "a"]
+
+
+def _document(rng: random.Random, depth: int = 0):
+    roll = rng.random()
+    if depth > 4 or roll < 0.3:
+        return rng.choice([1, 2, "x", None, True, 3.5])
+    if roll < 0.65:
+        keys = rng.sample(KEYS, rng.randint(0, 4))
+        return {key: _document(rng, depth + 1) for key in keys}
+    return [_document(rng, depth + 1) for _ in range(rng.randint(0, 4))]
+
+
+def _response(body: bytes, stream: bool) -> Response:
+    response = Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    if stream:
+        response.raw = io.BytesIO(body)
+    else:
+        response._content = body
+    return response
+
+
+def _streamed(body: bytes, exprs, chunk_size: int = 7) -> StreamedResponseView:
+    view = StreamedResponseView(_response(body, stream=True), chunk_size=chunk_size)
+    view.expect(exprs)
+    return view
+
+
+class TestJsonStream:
+
+    def test_descendant_order_matches_normal_view(self):
+        body = b'{"data": {"id": 1}, "id": 2}'
+        normal = ResponseView(_response(body, stream=False))
+        streamed = _streamed(body, ["$..id"])
+        assert streamed.find("$..id") == normal.find("$..id") == [2, 1]
+
+    def test_equal_assertion_uses_top_level_key(self):
+        body = b'{"data": {"id": 1}, "id": 2}'
+        streamed = _streamed(body, ["$..id"])
+        assert Assertions.assert_result([{"eq": {"id": 2}}], streamed) == 0
+
+    def test_contain_sees_every_match(self):
+        body = b'{"a": {"name": "foo"}, "b": [{"name": "bar"}]}'
+        streamed = _streamed(body, ["$..name"])
+        assert streamed.find("$..name") == ["foo", "bar"]
+        assert Assertions.assert_result([{"contain": {"name": "bar"}}], streamed) == 0
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 65536])
+    def test_random_documents_match_normal_view(self, chunk_size):
+        rng = random.Random(chunk_size)
+        for index in range(300):
+            document = _document(rng)
+            if index % 3 == 0:
+                document = {"data": {"id": 1}, "id": 2, "rest": document}
+            body = json.dumps(document).encode("utf-8")
+            normal = ResponseView(_response(body, stream=False))
+            streamed = _streamed(body, EXPRS, chunk_size)
+            for expr in EXPRS:
+                assert streamed.find(expr) == normal.find(expr), (expr, document)
+
+    def test_child_path_stops_reading_early(self):
+        rows = [{"id": i, "name": f"user{i}"} for i in range(5000)]
+        body = json.dumps({"code": 0, "data": {"rows": rows}}).encode("utf-8")
+        result = scan(
+            [body[i : i + 1024] for i in range(0, len(body), 1024)], ["$.code"]
+        )
+        assert result.found == {"$.code": [0]}
+        assert not result.complete
+        assert result.bytes_read < len(body)
+
+    def test_events_across_chunk_boundaries(self):
+        body = '{"n": -12.5e3, "s": "中\\"文", "l": [true, null]}'.encode("utf-8")
+        chunks = [body[i : i + 1] for i in range(len(body))]
+        events = list(JsonEvents(chunks))
+        assert ("value", -12.5e3) in events
+        assert ("value", '中"文') in events
+        assert events[-1] == ("end_map", None)
+
+    def test_invalid_document_raises(self):
+        streamed = _streamed(b'{"id": 1,', ["$..id"])
+        with pytest.raises(ValueError):
+            streamed.find("$..id")
@@ -0,0 +1,100 @@
+from email.parser import BytesParser
+from email.policy import HTTP
+from core.api.core import Request
+from utils.multipart import MultipartEncoder, parse_files
+from utils.stub_server import StubServer
+
+
+def _parts(encoder: MultipartEncoder, body: bytes):
+    """按 multipart/form-data 解析请求体，返回 (字段名, 文件名, 类型, 内容) 列表"""
+    header = f"Content-Type: {encoder.content_type}\r\n\r\n".encode()
+    message = BytesParser(policy=HTTP).parsebytes(header + body)
+    return [
+        (
+            part.get_param("name", header="content-disposition"),
+            part.get_filename(),
+            part.get_content_type(),
+            part.get_payload(decode=True),
+        )
+        for part in message.iter_parts()
+    ]
+
+
+def _read_all(encoder: MultipartEncoder, size: int) -> bytes:
+    chunks = []
+    while True:
+        chunk = encoder.read(size)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
+
+
+class TestMultipartEncoder:
+
+    def test_body_parses_as_multipart(self, tmp_path):
+        text, image = tmp_path / "a.txt", tmp_path / "b.png"
+        text.write_bytes(b"hello")
+        image.write_bytes(bytes(range(256)) * 1000)
+        files = {
+            "file": str(text),
+            "images": [{"path": str(image), "filename": "头像.png"}],
+        }
+        with MultipartEncoder(files, {"kind": ["a", "b"]}, chunk_size=1000) as encoder:
+            body = _read_all(encoder, 777)
+        assert len(body) == len(encoder) == encoder.bytes_read
+        assert _parts(encoder, body) == [
+            ("kind", None, "text/plain", b"a"),
+            ("kind", None, "text/plain", b"b"),
+            ("file", "a.txt", "text/plain", b"hello"),
+            ("images", "头像.png", "image/png", image.read_bytes()),
+        ]
+
+    def test_files_closed_after_read_and_on_close(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"x" * 1000)
+        encoder = MultipartEncoder({"file": str(path)}, chunk_size=10)
+        encoder.read(500)
+        assert encoder._file is not None
+        encoder.close()
+        assert encoder._file is None
+
+        encoder = MultipartEncoder({"file": str(path)}, chunk_size=10)
+        _read_all(encoder, 10)
+        assert encoder._file is None
+        assert encoder.stats()["bytes"] == len(encoder)
+
+    def test_field_names_are_quoted(self, tmp_path):
+        path = tmp_path / 'a"b.txt'
+        path.write_bytes(b"")
+        encoder = MultipartEncoder({'f"1': str(path)})
+        body = _read_all(encoder, 1024)
+        assert b'name="f%221"; filename="a%22b.txt"' in body
+
+    def test_fingerprint_ignores_boundary(self, tmp_path):
+        path = tmp_path / "a.txt"
+        path.write_bytes(b"hello")
+        first = MultipartEncoder({"file": str(path)}, {"kind": "a"})
+        second = MultipartEncoder({"file": str(path)}, {"kind": "a"})
+        assert first.boundary != second.boundary
+        assert first.fingerprint() == second.fingerprint()
+        assert (
+            first.fingerprint() != MultipartEncoder({"file": str(path)}).fingerprint()
+        )
+
+    def test_parse_files_relative_to_root(self):
+        parts = parse_files({"file": ["tests/test_data/upload.yaml"]})
+        assert parts[0].filename == "upload.yaml"
+        assert parts[0].size > 0
+
+    def test_upload_with_content_length(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"x" * 300_000)
+        with StubServer([{"path": "upload", "method": "POST"}]) as server:
+            request = Request(base_url=server.url)
+            response = request.request(
+                "POST", "upload", files={"file": str(path)}, data={"kind": "a"}
+            )
+        assert response.status_code == 200
+        sent = response.response.request
+        assert int(sent.headers["Content-Length"]) > 300_000
+        assert sent.headers["Content-Type"].startswith("multipart/form-data; boundary=")
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Any, Dict
+from core.api.api_flow import Flow
+from core.api.core import AsyncRequest
+from core.api.executor import AsyncExecutor
+from core.api.scheduler import FlowScheduler, StepStatus
+from utils.stub_server import StubServer
+
+
+def _flow(name: str, path: str = "api", depends=None, extract=None) -> Flow:
+    case = {"name": name, "request": {"method": "GET", "path": path}}
+    if depends:
+        case["depends"] = depends
+    if extract:
+        case["extract"] = extract
+    return Flow({"project": "p"}, case)
+
+
+class _Executor:
+    """按用例名称等待指定时长，名称以 fail 开头的用例执行失败"""
+
+    def __init__(self, delays: Dict[str, float]):
+        self.delays = delays
+        self.started = []
+
+    async def execute_test_case_async(self, case, expires=None) -> Dict[str, Any]:
+        self.started.append(case.name)
+        await asyncio.sleep(self.delays.get(case.name, 0))
+        return {"name": case.name, "passed": not case.name.startswith("fail")}
+
+
+class TestFlowScheduler:
+
+    def test_graph_from_extract_and_depends(self):
+        flows = [
+            _flow("login", extract={"token": "$.token"}),
+            _flow("info", path="api/${token}"),
+            _flow("logout", depends=["info"]),
+        ]
+        scheduler = FlowScheduler(flows)
+        assert scheduler.graph == {"login": [], "info": ["login"], "logout": ["info"]}
+
+    def test_independent_steps_run_concurrently(self):
+        flows = [_flow("a"), _flow("b"), _flow("c")]
+        executor = _Executor({"a": 0.2, "b": 0.2, "c": 0.2})
+        start = time.perf_counter()
+        results = asyncio.run(FlowScheduler(flows).run(executor))
+        assert time.perf_counter() - start < 0.5
+        assert [r["status"] for r in results] == [StepStatus.PASSED] * 3
+
+    def test_failed_upstream_skips_without_waiting_for_others(self):
+        flows = [
+            _flow("slow"),
+            _flow("fail"),
+            _flow("after", depends=["slow", "fail"]),
+        ]
+        skipped_at = {}
+
+        class Scheduler(FlowScheduler):
+            def _skip(self, step, upstream):
+                skipped_at[step.name] = time.perf_counter()
+                return super()._skip(step, upstream)
+
+        start = time.perf_counter()
+        executor = _Executor({"slow": 0.5, "fail": 0.01})
+        results = asyncio.run(Scheduler(flows).run(executor))
+        assert [r["status"] for r in results] == [
+            StepStatus.PASSED,
+            StepStatus.FAILED,
+            StepStatus.SKIPPED,
+        ]
+        assert "fail" in results[2]["message"]
+        assert skipped_at["after"] - start < 0.3
+        assert "after" not in executor.started
+
+    def test_deadline_times_out_remaining_steps(self):
+        flows = [_flow("a"), _flow("b", depends=["a"])]
+        executor = _Executor({"a": 1})
+        results = asyncio.run(FlowScheduler(flows, deadline=0.1).run(executor))
+        assert [r["status"] for r in results] == [StepStatus.TIMEOUT] * 2
+
+    def test_deadline_caps_request_timeout(self):
+        flows = [_flow("slow", path="slow")]
+        with StubServer([{"path": "slow", "latency": 2000}]) as server:
+            request = AsyncRequest(base_url=server.url, timeout=30)
+            executor = AsyncExecutor(request)
+            # 不经过 wait_for 时，请求同样在剩余时限内结束
+            start = time.perf_counter()
+            result = asyncio.run(
+                executor.execute_test_case_async(flows[0].case, time.monotonic() + 0.2)
+            )
+            assert time.perf_counter() - start < 1
+            assert not result["passed"]
+
+            start = time.perf_counter()
+            results = asyncio.run(FlowScheduler(flows, deadline=0.2).run(executor))
+            assert results[0]["status"] == StepStatus.TIMEOUT
+            # 线程池中的请求随超时结束，不再占用并发名额
+            request.close()
+            request._pool.shutdown(wait=True)
+            assert time.perf_counter() - start < 1
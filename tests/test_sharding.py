@@ -0,0 +1,75 @@
+import random
+import pytest
+from utils import sharding
+
+
+class TestSharding:
+
+    def test_parse_shard(self):
+        assert sharding.parse_shard("2/4") == (2, 4)
+        for text in ("0/4", "5/4", "1/0", "a/b", "1"):
+            with pytest.raises(ValueError):
+                sharding.parse_shard(text)
+
+    def test_estimate_uses_median_for_unknown(self):
+        cost = sharding.estimate(["a", "b", "c", "d"], {"a": 1, "b": 3, "c": 8})
+        assert cost == {"a": 1, "b": 3, "c": 8, "d": 3}
+        assert sharding.estimate(["a"], {}) == {"a": sharding.DEFAULT_DURATION}
+
+    def test_lpt_assignment(self):
+        durations = {f"t{i}.py::test_a": d for i, d in enumerate([7, 5, 4, 3, 3, 2])}
+        nodeids = list(durations)
+        shards = [sharding.plan(nodeids, durations, (i, 2)) for i in (1, 2)]
+        loads = [sum(durations[n] for n in shard) for shard in shards]
+        # LPT: 7->1, 5->2, 4->2, 3->1, 3->2, 2->1
+        assert loads == [12, 12]
+        assert shards[0] == ["t0.py::test_a", "t3.py::test_a", "t5.py::test_a"]
+
+    def test_shards_partition_all_cases_keeping_group_order(self):
+        rng = random.Random(0)
+        nodeids = [f"tests/test_{i % 7}.py::test_{i}" for i in range(60)]
+        durations = {n: rng.uniform(0.1, 5) for n in nodeids[:50]}
+        shards = [sharding.plan(nodeids, durations, (i, 4)) for i in range(1, 5)]
+        assert sorted(n for shard in shards for n in shard) == sorted(nodeids)
+        order = list(dict.fromkeys(sharding.group_key(n) for n in nodeids))
+        for shard in shards:
+            # 同组用例连续，组之间与组内均保持收集顺序
+            assert shard == sorted(
+                shard,
+                key=lambda n: (order.index(sharding.group_key(n)), nodeids.index(n)),
+            )
+
+    def test_lpt_bound(self):
+        rng = random.Random(1)
+        nodeids = [f"tests/test_{i}.py::test_a" for i in range(40)]
+        durations = {n: rng.uniform(0.1, 10) for n in nodeids}
+        total = 3
+        loads = [
+            sum(durations[n] for n in sharding.plan(nodeids, durations, (i, total)))
+            for i in range(1, total + 1)
+        ]
+        # LPT 的最大负载不超过最优解的 4/3，最优解不低于平均负载与最大单项
+        lower = max(sum(durations.values()) / total, max(durations.values()))
+        assert max(loads) <= lower * 4 / 3
+
+    def test_class_members_stay_together_and_ordered(self):
+        nodeids = [
+            "tests/test_flow.py::TestLogin::test_login",
+            "tests/test_flow.py::TestLogin::test_info",
+            "tests/test_flow.py::TestLogin::test_logout",
+            "tests/test_demo.py::test_a",
+        ]
+        durations = dict.fromkeys(nodeids, 1.0)
+        shards = [sharding.plan(nodeids, durations, (i, 2)) for i in (1, 2)]
+        login = [s for s in shards if "tests/test_flow.py::TestLogin::test_login" in s]
+        assert login[0] == nodeids[:3]
+
+    def test_slowest_first(self):
+        nodeids = ["a.py::test_fast", "b.py::test_slow", "c.py::test_mid"]
+        durations = {nodeids[0]: 1, nodeids[1]: 9, nodeids[2]: 5}
+        assert sharding.plan(nodeids, durations) == nodeids
+        assert sharding.plan(nodeids, durations, slowest_first=True) == [
+            "b.py::test_slow",
+            "c.py::test_mid",
+            "a.py::test_fast",
+        ]
@@ -0,0 +1,60 @@
+import os
+import time
+import pytest
+from core.api.api_flow import Case
+from core.api.executor import Executor
+from utils.shared_cache import FileLock, SharedCache
+
+
+def _login(username: str) -> Case:
+    return Case(
+        name="登录",
+        cache_ttl=60,
+        extract={"access_token": "$.token"},
+        request={"method": "post", "path": "login", "json": {"username": username}},
+    )
+
+
+class TestFileLock:
+
+    def test_held_lock_is_not_stale(self, tmp_path):
+        path = tmp_path / "cache.lock"
+        with FileLock(path, stale=0.2):
+            time.sleep(0.5)
+            # 持有期间锁文件持续更新，其他进程不会清理
+            with pytest.raises(TimeoutError):
+                FileLock(path, timeout=0.1, stale=0.2).acquire()
+        assert not path.exists()
+
+    def test_abandoned_lock_is_removed(self, tmp_path):
+        path = tmp_path / "cache.lock"
+        path.write_text("0")
+        os.utime(path, (time.time() - 10, time.time() - 10))
+        with FileLock(path, timeout=1, stale=5):
+            assert path.read_text() == str(os.getpid())
+
+
+class TestSharedCache:
+
+    def test_get_or_create(self, tmp_path):
+        cache = SharedCache(tmp_path / "cache.json")
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return {"token": "x"}
+
+        assert cache.get_or_create("k", factory, ttl=60) == ({"token": "x"}, False)
+        assert cache.get_or_create("k", factory, ttl=60) == ({"token": "x"}, True)
+        assert len(calls) == 1
+
+    def test_expired_entry(self, tmp_path):
+        cache = SharedCache(tmp_path / "cache.json")
+        cache.set("k", 1, ttl=0.01)
+        time.sleep(0.05)
+        assert cache.get("k", "missing") == "missing"
+
+    def test_cache_key_includes_request(self):
+        executor = Executor()
+        assert executor._cache_key(_login("a")) == executor._cache_key(_login("a"))
+        assert executor._cache_key(_login("a")) != executor._cache_key(_login("b"))
@@ -0,0 +1,59 @@
+from core.api.core import Context
+from core.api.template import Template, compile_template
+
+
+class TestTemplate:
+
+    def test_single_placeholder_keeps_type(self):
+        template = Template({"id": "${id}", "ids": "{{ids}}", "ok": "${ok}"})
+        variables = {"id": 1, "ids": [1, 2], "ok": False}
+        assert template.render(variables) == {"id": 1, "ids": [1, 2], "ok": False}
+
+    def test_concat_renders_string(self):
+        template = Template("Bearer ${token}, user {{id}}")
+        assert template.render({"token": "abc", "id": 7}) == "Bearer abc, user 7"
+
+    def test_missing_variable_keeps_placeholder(self):
+        template = Template({"a": "${missing}", "b": "x-${missing}"})
+        assert template.render({}) == {"a": "${missing}", "b": "x-${missing}"}
+
+    def test_function_placeholder(self):
+        calls = []
+
+        def call(function, params):
+            calls.append((function, params))
+            return "token"
+
+        template = Template({"h": "${access_token()}", "s": "${sign(a, b)}"})
+        assert template.render({}, call) == {"h": "token", "s": "token"}
+        assert calls == [("access_token", []), ("sign", ["a", "b"])]
+
+    def test_keys_nested_lists_and_literals(self):
+        template = Template({"${key}": [{"n": "${n}"}, 3, None, "plain"]})
+        assert template.render({"key": "k", "n": 1.5}) == {
+            "k": [{"n": 1.5}, 3, None, "plain"]
+        }
+        assert template.names == frozenset({"key", "n"})
+
+    def test_render_returns_new_structure(self):
+        source = {"body": {"id": "${id}"}}
+        template = Template(source)
+        result = template.render({"id": 1})
+        result["body"]["id"] = 2
+        assert template.render({"id": 1}) == {"body": {"id": 1}}
+        assert source == {"body": {"id": "${id}"}}
+
+    def test_compile_template_reuses_compiled(self):
+        template = Template({"a": 1})
+        assert compile_template(template) is template
+        assert not template.placeholders
+
+    def test_context_parse_and_replace(self):
+        context = Context(variables={"access_token": "Bearer x", "id": 3})
+        data = {"headers": {"Authorization": "${access_token()}"}, "id": "${id}"}
+        assert context.parse_and_replace(data) == {
+            "headers": {"Authorization": "Bearer x"},
+            "id": 3,
+        }
+        row = {"id": 4}
+        assert context.parse_and_replace(data, row)["id"] == 4
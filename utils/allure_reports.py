@@ -1,44 +1,334 @@
-from dataclasses import asdict
 import json
+import uuid
 import yaml
+import queue
+import logging
 import allure
-from typing import Any
+import hashlib
+import threading
+import contextvars
+from typing import Any, Deque
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict
 from allure import attachment_type
+from allure_commons import plugin_manager
+from allure_commons.reporter import AllureReporter
+from allure_commons.model2 import ATTACHMENT_PATTERN, Attachment, ExecutableItem
 
 from core.api.settings import DataSource
 
+_log = logging.getLogger(__name__)
+
+
+class AttachmentWriter:
+    """
+    后台附件写入器
+
+    测试线程只负责在报告中登记附件并把原始数据放入有界队列，
+    序列化与写盘由后台线程完成；队列已满时测试线程阻塞等待，内存占用有上限。
+
+    附件按内容摘要命名，相同内容只写盘一次，其余附件引用同一文件。
+    后台写入失败的附件记录日志，在 :meth:`flush` 时由调用线程同步写入。
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+        self._written = set()
+        self._failed: Deque = deque()
+        self.stats = {"written": 0, "deduplicated": 0, "failed": 0}
+
+    def _ensure_started(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(
+                    target=self._run, name="allure-attachment-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, body: Any, _type: str, attachment: Attachment, extension: str):
+        """
+        提交附件写入任务
+
+        :param body: 展示信息，以引用方式入队，由后台线程序列化，调用方随后不应再修改
+        :type body: Any
+        :param _type: 报告展示类型 ['txt','json','yaml']
+        :type _type: str
+        :param attachment: 报告中已登记的附件，写入后补全文件名
+        :type attachment: Attachment
+        :param extension: 附件文件扩展名
+        :type extension: str
+        """
+        self._ensure_started()
+        self._queue.put((body, _type, attachment, extension))
+
+    def flush(self):
+        """阻塞直到队列中的附件全部写入完成，后台写入失败的附件在调用线程中重新写入"""
+        if self._thread and self._thread.is_alive():
+            self._queue.join()
+        while self._failed:
+            self._write_inline(*self._failed.popleft())
+
+    def _run(self):
+        while True:
+            task = self._queue.get()
+            try:
+                self._write(*task)
+            except Exception:
+                _log.exception("后台写入附件失败，改为同步写入: %s", task[2].name)
+                self.stats["failed"] += 1
+                self._failed.append(task)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, body: Any, _type: str, attachment: Attachment, extension: str):
+        """按内容摘要命名写入附件，相同内容只写入一次"""
+        data = CustomAllure._safe_serialize(body, _type).encode("utf-8")
+        digest = hashlib.sha1(data).hexdigest()
+        file_name = ATTACHMENT_PATTERN.format(prefix=digest, ext=extension)
+
+        if file_name in self._written:
+            attachment.source = file_name
+            self.stats["deduplicated"] += 1
+            return
+
+        plugin_manager.hook.report_attached_data(body=data, file_name=file_name)
+        attachment.source = file_name
+        self._written.add(file_name)
+        self.stats["written"] += 1
+
+    def _write_inline(
+        self, body: Any, _type: str, attachment: Attachment, extension: str
+    ):
+        """同步写入后台写入失败的附件，使用独立的文件名，再次失败时只记录日志"""
+        try:
+            data = CustomAllure._safe_serialize(body, _type).encode("utf-8")
+            file_name = ATTACHMENT_PATTERN.format(prefix=uuid.uuid4(), ext=extension)
+            plugin_manager.hook.report_attached_data(body=data, file_name=file_name)
+            attachment.source = file_name
+            self.stats["written"] += 1
+        except Exception:
+            _log.exception("同步写入附件失败: %s", attachment.name)
+
+
+class AttachLevel:
+    """附件详细程度"""
+
+    OFF = "off"  # 不记录任何附件
+    SUMMARY = "summary"  # 只记录概要信息
+    ON_FAILURE = "on-failure"  # 记录概要信息，详细信息仅在测试失败时写入
+    FULL = "full"  # 记录全部信息
+
+
+class Oversize:
+    """超出大小上限的附件处理方式"""
+
+    TRUNCATE = "truncate"  # 截断并附带摘要
+    HASH = "hash"  # 只保留大小与摘要
+
 
 class CustomAllure:
+
+    # 后台写入附件，关闭时退回同步写入
+    background = True
+    writer = AttachmentWriter()
+
+    level = AttachLevel.FULL
+    # 单个附件的最大字节数，0 表示不限制
+    max_body_size = 0
+    oversize = Oversize.TRUNCATE
+    # on-failure 模式下每个测试暂存的详细附件，超出时丢弃最早的记录
+    _buffer: Deque = deque(maxlen=200)
+    # 静默执行只对当前线程或协程生效，不影响并发执行的其他用例
+    _muted = contextvars.ContextVar("allure_muted", default=False)
+
     @classmethod
-    def attach(cls, body: Any, name: str, _type: str):
+    def configure(
+        cls,
+        level: str = None,
+        max_body_size: int = None,
+        oversize: str = None,
+        buffer_size: int = None,
+    ):
+        """
+        设置附件详细程度与大小上限
+
+        :param level: 详细程度 ['off','summary','on-failure','full']
+        :type level: str
+        :param max_body_size: 单个附件的最大字节数，0 表示不限制
+        :type max_body_size: int
+        :param oversize: 超出上限时的处理方式 ['truncate','hash']
+        :type oversize: str
+        :param buffer_size: on-failure 模式下每个测试暂存的附件数量
+        :type buffer_size: int
+        """
+        if level is not None:
+            cls.level = level
+        if max_body_size is not None:
+            cls.max_body_size = max_body_size
+        if oversize is not None:
+            cls.oversize = oversize
+        if buffer_size is not None:
+            cls._buffer = deque(maxlen=buffer_size)
+
+    @classmethod
+    def attach(
+        cls,
+        body: Any,
+        name: str,
+        _type: str,
+        detail: bool = False,
+        summary: Any = None,
+    ):
         """
         attach 的 Docstring
 
-        :param body: 展示信息
+        :param body: 展示信息，后台写入时以引用方式入队，调用方随后不应再修改；
+            需要继续修改的数据由调用方传入副本
         :type body: Any
         :param name: 名称
         :type name: str
         :param _type: 报告展示类型 ['txt','json','yaml']
         :type _type: str
+        :param detail: 是否为详细信息(请求、响应报文等)，概要模式下不记录
+        :type detail: bool
+        :param summary: 详细信息的概要，非 full 模式下代替 body 记录
+        :type summary: Any
+        """
+
+        if cls.level == AttachLevel.OFF or cls._muted.get():
+            return
+
+        item = cls._current_item()
+
+        if detail and cls.level != AttachLevel.FULL:
+            if cls.level == AttachLevel.ON_FAILURE:
+                cls._buffer.append((item, body, name, _type))
+            if summary is None:
+                return
+            body = summary
+
+        cls._write(body, name, _type, item)
+
+    @classmethod
+    @contextmanager
+    def muted(cls):
+        """临时关闭当前线程或协程的附件记录，用于静默执行大量重复步骤"""
+        token = cls._muted.set(True)
+        try:
+            yield
+        finally:
+            cls._muted.reset(token)
+
+    @classmethod
+    def enter_thread(cls):
+        """
+        在新线程中首次访问报告，继承测试线程当前所在的报告位置，
+        之后该线程中的报告步骤与附件挂在此位置下
         """
+        reporter = cls._reporter()
+        if reporter:
+            reporter.get_last_item()
+
+    @classmethod
+    def release(cls):
+        """测试失败时写入暂存的详细附件"""
+        while cls._buffer:
+            item, body, name, _type = cls._buffer.popleft()
+            cls._write(body, name, _type, item)
+        cls.flush()
+
+    @classmethod
+    def discard(cls):
+        """测试结束时丢弃暂存的详细附件"""
+        cls._buffer.clear()
+
+    @classmethod
+    def _current_item(cls) -> ExecutableItem:
+        reporter = cls._reporter() if cls.background else None
+        return reporter.get_last_item(ExecutableItem) if reporter else None
+
+    @classmethod
+    def _write(cls, body: Any, name: str, _type: str, item: ExecutableItem = None):
+        attach_type = cls._attachment_type(_type)
+
+        if item is None:
+            allure.attach(
+                body=cls.serialize(body, _type), name=name, attachment_type=attach_type
+            )
+            return
 
-        body = cls._trans_to_yaml(body) if _type == "yaml" else cls._trans_to_str(body)
+        # 只在报告中登记附件，文件名由后台线程按内容摘要补全
+        attachment = Attachment(name=name, type=attach_type.mime_type)
+        item.attachments.append(attachment)
 
+        cls.writer.submit(body, _type, attachment, attach_type.extension)
+
+    @classmethod
+    def flush(cls):
+        """等待全部附件写入完成，在测试结束时调用以保证报告完整"""
+        cls.writer.flush()
+
+    @classmethod
+    def serialize(cls, body: Any, _type: str) -> str:
+        content = (
+            cls._trans_to_yaml(body) if _type == "yaml" else cls._trans_to_str(body)
+        )
+        return cls._limit(content)
+
+    @classmethod
+    def _safe_serialize(cls, body: Any, _type: str) -> str:
+        """序列化失败时返回失败原因与对象的 repr"""
+        try:
+            return cls.serialize(body, _type)
+        except Exception as e:
+            return f"附件序列化失败: {e}\n{body!r}"
+
+    @classmethod
+    def _limit(cls, content: str) -> str:
+        """按大小上限截断或摘要化附件内容"""
+        if not cls.max_body_size:
+            return content
+
+        data = content.encode("utf-8")
+        if len(data) <= cls.max_body_size:
+            return content
+
+        digest = hashlib.sha256(data).hexdigest()
+        note = f"[内容过大: {len(data)} 字节, sha256={digest}]"
+        if cls.oversize == Oversize.HASH:
+            return note
+
+        head = data[: cls.max_body_size].decode("utf-8", errors="ignore")
+        return f"{head}\n...\n{note}"
+
+    @classmethod
+    def _attachment_type(cls, _type: str):
         match _type:
             case "txt":
-                _type = attachment_type.TEXT
+                return attachment_type.TEXT
             case "json":
-                _type = attachment_type.JSON
+                return attachment_type.JSON
             case "yaml":
-                _type = attachment_type.YAML
+                return attachment_type.YAML
             case _:
-                _type = attachment_type.TEXT
+                return attachment_type.TEXT
 
-        allure.attach(body=body, name=name, attachment_type=_type)
+    @classmethod
+    def _reporter(cls) -> AllureReporter:
+        for plugin in plugin_manager.get_plugins():
+            reporter = getattr(plugin, "allure_logger", None)
+            if isinstance(reporter, AllureReporter):
+                return reporter
+        return None
 
     @classmethod
     def _trans_to_str(cls, data: Any) -> str:
-        if isinstance(data, dict):
+        if isinstance(data, (dict, list)):
             data = cls._trans_to_dict(data)
             return json.dumps(data, indent=2, ensure_ascii=False)
         elif isinstance(data, str):
@@ -48,20 +338,17 @@ class CustomAllure:
 
     @classmethod
     def _trans_to_dict(cls, data: Any):
-        if isinstance(data, (dict, DataSource)):
-
-            if isinstance(data, DataSource):
-                return asdict(data)
+        if isinstance(data, DataSource):
+            return asdict(data)
 
-            for k, v in data.items():
-                if isinstance(v, DataSource):
-                    v = asdict(v)
-                elif isinstance(v, dict):
-                    v = cls._trans_to_dict(v)
-                else:
-                    pass
-
-                data[k] = v
+        # 返回新的字典，不修改调用方的数据
+        if isinstance(data, dict):
+            return {
+                k: cls._trans_to_dict(v) if isinstance(v, (dict, DataSource)) else v
+                for k, v in data.items()
+            }
+        if isinstance(data, list):
+            return [cls._trans_to_dict(v) for v in data]
 
         return data
 
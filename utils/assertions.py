@@ -1,8 +1,9 @@
+import math
 import operator
-import jsonpath
-from requests import Response
-from typing import Any, Dict, List, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Callable, Tuple
 from core.api.settings import DataSource
+from core.api.response import ResponseView
 from utils.exceptions import AssertTypeError
 from utils.db_sever import db_client
 from utils.allure_reports import CustomAllure
@@ -21,6 +22,36 @@ class AssertType:
     NOT_EQUAL = "不相等"
     NOT_EXISTS = "不存在"
     NOT_CONTAIN = "不包含"
+    WITHIN_SLA = "达标"
+    EXCEED_SLA = "超标"
+
+
+# 耗时断言支持的统计指标
+LATENCY_STATS = ("p50", "p90", "p95", "p99", "mean", "max")
+
+
+def _parse_duration(value: Any) -> float:
+    """
+    解析耗时阈值，返回秒；数字按毫秒处理，字符串支持 ms 与 s 后缀，如 200ms、1.5s
+
+    :param value: 耗时阈值
+    :type value: Any
+    """
+    if isinstance(value, (int, float)):
+        return value / 1000
+    text = str(value).strip().lower()
+    if text.endswith("ms"):
+        return float(text[:-2]) / 1000
+    if text.endswith("s"):
+        return float(text[:-1])
+    return float(text) / 1000
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    """最近秩法计算百分位"""
+    values = sorted(values)
+    rank = max(math.ceil(len(values) * percent / 100), 1)
+    return values[rank - 1]
 
 
 class Assertions:
@@ -61,14 +92,16 @@ class Assertions:
             return success_flag
 
     @classmethod
-    def _assert_by_contain_context(cls, expected: Dict[str, Any], res: Response) -> int:
+    def _assert_by_contain_context(
+        cls, expected: Dict[str, Any], res: ResponseView
+    ) -> int:
         """
         字符串包含模式，断言预期结果字符串是否包含在接口实际响应返回信息中
 
         :param expected: 期望结果
         :type expected: Dict[str, Any]
-        :param res: 接口响应信息 :class:`Response`
-        :type res: Response
+        :param res: 接口响应信息 :class:`ResponseView`
+        :type res: ResponseView
         :return: 断言状态:
             >>> 0: 通过
             >>> 1: 未通过
@@ -78,9 +111,19 @@ class Assertions:
         try:
             for assert_key, assert_value in expected.items():
 
-                actual: List[str] = jsonpath.jsonpath(res.json(), f"$..{assert_key}")
+                # $..key 查询由响应的键值索引回答，整个响应只遍历一次
+                actual: List[str] = res.find(f"$..{assert_key}")
+
+                if not actual:
+
+                    success_flag += 1
+                    assert_status = AssertType.NOT_EXISTS
+                    msg = f"断言失败！实际结果中不存在字段: {assert_key}"
+                    info = {"expected": assert_value, "actual": actual, "message": msg}
+
+                    CustomAllure.attach(info, f"包含断言: {assert_status}", "json")
 
-                if len(actual) > 0:
+                else:
 
                     actual_str = "".join(actual)
 
@@ -108,14 +151,14 @@ class Assertions:
             return success_flag
 
     @classmethod
-    def _assert_by_equal(cls, expected: Dict[str, Any], res: Response) -> int:
+    def _assert_by_equal(cls, expected: Dict[str, Any], res: ResponseView) -> int:
         """
         相等断言，根据预期结果与接口响应实际结果进行对比
 
         :param expected: 期望结果
         :type expected: Dict[str, Any]
         :param res: 接口响应信息
-        :type res: Response
+        :type res: ResponseView
         :return: 断言状态:
             >>> 0: 通过
             >>> 1: 未通过
@@ -123,13 +166,14 @@ class Assertions:
         """
         success_flag = 0
         try:
-            if isinstance(expected, dict) and isinstance(res, Response):
+            if isinstance(expected, dict) and isinstance(res, ResponseView):
+                data = res.json()
                 # 获取期望结果与实际结果相同的key
-                common_key = list(expected.keys() & res.json().keys())
+                common_key = list(expected.keys() & data.keys())
                 if common_key:
                     common_key = common_key[0]
                     # 根据相同key去接口响应信息获取实际结果,生成实际结果字典
-                    actual = {common_key: res.json().get(common_key)}
+                    actual = {common_key: data.get(common_key)}
 
                     result = operator.eq(expected, actual)
 
@@ -149,11 +193,7 @@ class Assertions:
 
                 else:
                     for assert_key, _ in expected.items():
-                        actual = {
-                            assert_key: jsonpath.jsonpath(
-                                res.json(), f"$..{assert_key}"
-                            )[0]
-                        }
+                        actual = {assert_key: res.find(f"$..{assert_key}")[0]}
                         if operator.eq(expected, actual):
                             assert_status = AssertType.EQUAL
                             msg = f"断言通过！期望结果:{expected} == 实际结果:{actual}"
@@ -175,14 +215,14 @@ class Assertions:
             return success_flag
 
     @classmethod
-    def _assert_by_not_equal(cls, expected: Dict[str, Any], res: Response) -> int:
+    def _assert_by_not_equal(cls, expected: Dict[str, Any], res: ResponseView) -> int:
         """
         不相等断言，根据预期结果与接口响应实际结果进行对比
 
         :param expected: 期望结果
         :type expected: Dict[str, Any]
         :param res: 接口响应信息
-        :type res: Response
+        :type res: ResponseView
         :return: 断言状态:
             >>> 0: 通过
             >>> 1: 未通过
@@ -190,13 +230,14 @@ class Assertions:
         """
         success_flag = 0
         try:
-            if isinstance(expected, dict) and isinstance(res, Response):
+            if isinstance(expected, dict) and isinstance(res, ResponseView):
+                data = res.json()
                 # 获取期望结果与实际结果相同的key
-                common_key = list(expected.keys() & res.json().keys())
+                common_key = list(expected.keys() & data.keys())
                 if common_key:
                     common_key = common_key[0]
                     # 根据相同key去接口响应信息获取实际结果,生成实际结果字典
-                    actual = {common_key: res.json().get(common_key)}
+                    actual = {common_key: data.get(common_key)}
                     result = operator.ne(expected, actual)
                     if result:
                         assert_status = AssertType.NOT_EQUAL
@@ -213,11 +254,7 @@ class Assertions:
                 else:
                     for assert_key, _ in expected.items():
 
-                        actual = {
-                            assert_key: jsonpath.jsonpath(
-                                res.json(), f"$..{assert_key}"
-                            )[0]
-                        }
+                        actual = {assert_key: res.find(f"$..{assert_key}")[0]}
 
                         if operator.ne(expected, actual):
                             assert_status = AssertType.NOT_EQUAL
@@ -257,11 +294,38 @@ class Assertions:
             >>> 1: 未通过
         :rtype: int
         """
+        return cls._assert_by_database_batch([sql], dataSource)
+
+    @classmethod
+    def _assert_by_database_batch(cls, sqls: List[str], dataSource: DataSource) -> int:
+        """
+        批量数据库断言，同一用例的全部sql在一个连接、一个事务中一次往返执行，
+        执行结果按顺序对应到每条断言并分别记录到报告；只有一条sql时使用普通连接
+
+        :param sqls: sql语句列表
+        :type sqls: List[str]
+        :param dataSource: 数据源对象
+        :type dataSource: DataSource
+        :return: 未通过的断言数量
+        :rtype: int
+        """
         success_flag = 0
         assert_status = None
         try:
-            client = db_client(dataSource)
-            res = client.query(sql)
+            client = db_client(dataSource, multi_statements=len(sqls) > 1)
+            results = client.query_batch(sqls)
+        except Exception as e:
+            assert_status = AssertType.EXCEPTION
+            CustomAllure.attach(str(e), f"数据库断言: {assert_status}", "json")
+            return len(sqls)
+
+        for sql, res in zip(sqls, results):
+            if isinstance(res, Exception):
+                success_flag += 1
+                assert_status = AssertType.EXCEPTION
+                CustomAllure.attach(str(res), f"数据库断言: {assert_status}", "json")
+                continue
+
             if res:
                 assert_status = AssertType.EXISTS
                 msg = "断言通过！数据库存在该记录！"
@@ -270,14 +334,92 @@ class Assertions:
                 assert_status = AssertType.NOT_EXISTS
                 msg = "断言失败！数据库不存在该记录，请检查sql语句是否正确！"
 
-            # print("断言通过！")
             info = {"sql": sql, "result": res, "message": msg}
             CustomAllure.attach(info, f"数据库断言: {assert_status}", "json")
 
+        return success_flag
+
+    @classmethod
+    def _assert_by_latency(
+        cls, expected: Dict[str, Any], resend: Callable[[], Tuple[float, int]]
+    ) -> int:
+        """
+        耗时断言，重复发送请求采样耗时，统计百分位后与阈值比较
+
+        >>> - latency: {p95: 200ms, samples: 20, warmup: 3, concurrency: 1}
+
+        :param expected: 阈值(p50/p90/p95/p99/mean/max)与采样参数(samples/warmup/concurrency)
+        :type expected: Dict[str, Any]
+        :param resend: 重新发送当前请求的函数，返回 (耗时(秒), 状态码)
+        :type resend: Callable[[], Tuple[float, int]]
+        :return: 断言状态:
+            >>> 0: 通过
+            >>> 1: 未通过
+        :rtype: int
+        """
+        success_flag = 0
+        try:
+            if resend is None:
+                raise AssertTypeError("耗时断言需要重新发送请求，当前执行方式不支持")
+
+            thresholds = {
+                k: _parse_duration(v) for k, v in expected.items() if k in LATENCY_STATS
+            }
+            samples = int(expected.get("samples", 10))
+            warmup = int(expected.get("warmup", 1))
+            concurrency = max(int(expected.get("concurrency", 1)), 1)
+
+            for _ in range(warmup):
+                resend()
+
+            def sample(_: int):
+                try:
+                    return resend()
+                except Exception as e:
+                    return None, str(e)
+
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    results = list(pool.map(sample, range(samples)))
+            else:
+                results = [sample(i) for i in range(samples)]
+
+            latencies = [r[0] for r in results if r[0] is not None]
+            errors = [r[1] for r in results if r[0] is None]
+
+            stats = {}
+            if latencies:
+                stats = {f"p{p}": _percentile(latencies, p) for p in (50, 90, 95, 99)}
+                stats.update(mean=sum(latencies) / len(latencies), max=max(latencies))
+
+            exceeded = {
+                k: {"threshold_ms": v * 1000, "actual_ms": round(stats[k] * 1000, 3)}
+                for k, v in thresholds.items()
+                if not stats or stats[k] > v
+            }
+
+            if errors or exceeded:
+                success_flag += 1
+                assert_status = AssertType.EXCEED_SLA
+                msg = f"断言失败！{len(errors)} 次请求异常，超出阈值: {list(exceeded)}"
+            else:
+                assert_status = AssertType.WITHIN_SLA
+                msg = "断言通过！耗时统计均在阈值内！"
+
+            info = {
+                "expected": expected,
+                "stats_ms": {k: round(v * 1000, 3) for k, v in stats.items()},
+                "exceeded": exceeded,
+                "samples_ms": [round(v * 1000, 3) for v in latencies],
+                "status_codes": sorted({r[1] for r in results if r[0] is not None}),
+                "errors": errors,
+                "message": msg,
+            }
+            CustomAllure.attach(info, f"耗时断言: {assert_status}", "json")
         except Exception as e:
             success_flag += 1
             assert_status = AssertType.EXCEPTION
-            CustomAllure.attach(str(e), f"数据库断言: {assert_status}", "json")
+            CustomAllure.attach(str(e), f"耗时断言: {assert_status}", "json")
         finally:
             return success_flag
 
@@ -285,8 +427,9 @@ class Assertions:
     def assert_result(
         cls,
         expected: List[Dict[str, Any]],
-        res: Response,
+        res: ResponseView,
         dataSource: DataSource = None,
+        resend: Callable[[], Tuple[float, int]] = None,
     ) -> int:
         """
         断言主函数
@@ -294,7 +437,9 @@ class Assertions:
         :param expected: 期望结果
         :type expected: List[Dict[str,Any]]
         :param res: 接口响应信息
-        :type res: Response
+        :type res: ResponseView
+        :param resend: 重新发送当前请求的函数，用于耗时断言
+        :type resend: Callable[[], Tuple[float, int]]
         """
         method_mapping = {
             "status_code": cls._assert_by_status_code,
@@ -302,8 +447,10 @@ class Assertions:
             "eq": cls._assert_by_equal,
             "ne": cls._assert_by_not_equal,
             "sql": cls._assert_by_database,
+            "latency": cls._assert_by_latency,
         }
         all_flag = 0
+        sqls: List[str] = []
         try:
             for expect in expected:
                 for assert_mode, assert_value in expect.items():
@@ -322,13 +469,19 @@ class Assertions:
                             case "ne":
                                 flag = func(assert_value, res)
                             case "sql":
-                                flag = func(assert_value, dataSource)
+                                # 数据库断言统一收集后批量执行
+                                sqls.append(assert_value)
+                            case "latency":
+                                flag = func(assert_value, resend)
                             case _:  # _表示匹配到其他任何情况
                                 raise AssertTypeError(
                                     f"未知定义的断言模式:{assert_mode}"
                                 )
                         all_flag += flag
 
+            if sqls:
+                all_flag += cls._assert_by_database_batch(sqls, dataSource)
+
         except Exception as e:
             raise e
         finally:
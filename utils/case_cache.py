@@ -0,0 +1,127 @@
+import os
+import yaml
+import pickle
+import hashlib
+from pathlib import Path
+from root import ROOT_PATH
+from typing import Any, List
+from core.api.api_flow import Case, Flow
+from utils.yaml_parse import SafeLoader, load_yaml
+
+# 缓存结构变化时递增，旧缓存自动失效
+CACHE_VERSION = 2
+
+
+class CaseCache:
+    """
+    编译用例缓存
+
+    以文件路径为键保存已解析、已校验的用例数据(pickle 二进制格式)。
+    文件的修改时间与大小未变化时直接读取缓存；修改时间变化但内容摘要一致时只刷新元信息。
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, file_path: str) -> Path:
+        key = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.pickle"
+
+    def _read_entry(self, entry_path: Path) -> dict:
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+            return entry if entry.get("version") == CACHE_VERSION else None
+        except Exception:
+            return None
+
+    def _write_entry(self, entry_path: Path, entry: dict):
+        # 先写临时文件再替换，避免并发收集时读到不完整的缓存
+        tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry_path)
+
+    def load(self, file_path: str) -> Any:
+        """
+        读取用例文件，优先使用缓存
+
+        :param file_path: 用例文件路径
+        :type file_path: str
+        :return: 与 :func:`read_yaml` 结构一致的用例数据
+        :rtype: Any
+        """
+        file_path = os.path.join(ROOT_PATH, file_path)
+        stat = os.stat(file_path)
+        entry_path = self._entry_path(file_path)
+        entry = self._read_entry(entry_path)
+
+        if (
+            entry
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            return entry["data"]
+
+        with open(file_path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+
+        if entry and entry["digest"] == digest:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            self._write_entry(entry_path, entry)
+            return entry["data"]
+
+        data = load_yaml(file_path).normalize(
+            yaml.load(content.decode("utf-8"), Loader=SafeLoader), file_path
+        )
+
+        # 校验失败的文件不缓存，错误留到执行用例时暴露
+        if validate_cases(data):
+            self._write_entry(
+                entry_path,
+                {
+                    "version": CACHE_VERSION,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "digest": digest,
+                    "data": data,
+                },
+            )
+
+        return data
+
+
+def validate_cases(data: Any) -> bool:
+    """
+    校验用例数据能否构造为 :class:`Case` 或 :class:`Flow`
+
+    :param data: 用例数据
+    :type data: Any
+    """
+    if not isinstance(data, list):
+        return False
+    try:
+        for item in data:
+            if isinstance(item, list):
+                Flow(*item)
+            else:
+                Case(**item)
+        return True
+    except Exception:
+        return False
+
+
+def read_cases(file_path: str, cache_dir: str = None) -> List[Any]:
+    """
+    读取用例文件，指定缓存目录时使用编译用例缓存
+
+    :param file_path: 用例文件路径
+    :type file_path: str
+    :param cache_dir: 缓存目录
+    :type cache_dir: str
+    """
+    if not cache_dir:
+        return load_yaml(file_path).read()
+    return CaseCache(cache_dir).load(file_path)
@@ -0,0 +1,87 @@
+import gzip
+import json
+import zlib
+from urllib.parse import urlencode
+from typing import Any, Dict, Tuple
+
+# 支持的请求体压缩方式，identity 表示不压缩
+ENCODINGS = ("gzip", "deflate")
+IDENTITY = "identity"
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    按 Content-Encoding 压缩请求体
+
+    gzip 固定文件头中的时间戳，相同请求体的压缩结果一致，录制回放可按请求体匹配。
+
+    :param body: 原始请求体
+    :type body: bytes
+    :param encoding: 压缩方式 ['gzip','deflate']
+    :type encoding: str
+    """
+    if encoding == "gzip":
+        return gzip.compress(body, mtime=0)
+    if encoding == "deflate":
+        # HTTP 中的 deflate 为 zlib 格式(RFC 1950)
+        return zlib.compress(body)
+    raise ValueError(f"不支持的压缩方式: {encoding}，可选: {', '.join(ENCODINGS)}")
+
+
+def _serialize(data: Any, json_data: Any) -> Tuple[bytes, str]:
+    """与 requests 相同的请求体序列化，返回 (请求体, Content-Type)"""
+    if data:
+        if isinstance(data, bytes):
+            return data, None
+        if isinstance(data, str):
+            return data.encode("utf-8"), None
+        if isinstance(data, (dict, list, tuple)):
+            items = data.items() if isinstance(data, dict) else data
+            pairs = [
+                (key, value)
+                for key, values in items
+                for value in (values if isinstance(values, list) else [values])
+                if value is not None
+            ]
+            body = urlencode(pairs).encode("utf-8")
+            return body, "application/x-www-form-urlencoded"
+        # 文件等流式请求体不压缩
+        return None, None
+    if json_data is not None:
+        body = json.dumps(json_data, allow_nan=False).encode("utf-8")
+        return body, "application/json"
+    return None, None
+
+
+def compress_request(
+    kwargs: Dict[str, Any], encoding: str
+) -> Tuple[Dict[str, Any], int, int]:
+    """
+    序列化并压缩 json 或 data 请求体，设置 Content-Encoding 请求头
+
+    :param kwargs: 请求参数
+    :type kwargs: Dict[str, Any]
+    :param encoding: 压缩方式，为空或 identity 时不压缩
+    :type encoding: str
+    :return: (新的请求参数, 原始字节数, 压缩后字节数)，没有可压缩的请求体时原样返回请求参数
+    :rtype: Tuple[Dict[str, Any], int, int]
+    """
+    if not encoding or encoding == IDENTITY:
+        return kwargs, 0, 0
+
+    body, content_type = _serialize(kwargs.get("data"), kwargs.get("json"))
+    if body is None:
+        return kwargs, 0, 0
+    compressed = compress(body, encoding)
+
+    headers = {
+        k: v
+        for k, v in (kwargs.get("headers") or {}).items()
+        if k.lower() != "content-encoding"
+    }
+    if content_type and not any(k.lower() == "content-type" for k in headers):
+        headers["Content-Type"] = content_type
+    headers["Content-Encoding"] = encoding
+
+    kwargs = dict(kwargs, headers=headers, data=compressed, json=None)
+    return kwargs, len(body), len(compressed)
@@ -0,0 +1,86 @@
+import os
+import csv
+import json
+import mmap
+from root import ROOT_PATH
+from typing import Any, Dict, Iterator, Union
+
+# 按扩展名识别数据表格式
+FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".parquet": "parquet"}
+
+
+def _read_csv(file_path: str) -> Iterator[Dict[str, Any]]:
+    with open(file_path, mode="r", encoding="utf-8-sig", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def _read_jsonl(file_path: str) -> Iterator[Dict[str, Any]]:
+    if os.path.getsize(file_path) == 0:
+        return
+    with open(file_path, mode="rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b""):
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def _read_parquet(file_path: str, batch_size: int = 1024) -> Iterator[Dict[str, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("读取 Parquet 数据表需要安装 pyarrow") from e
+
+    for batch in pq.ParquetFile(file_path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def read_table(
+    file_path: str, format: str = None, limit: int = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    流式读取数据表，逐行返回 列名 -> 值 组成的字典，不会一次性加载整个文件
+
+    :param file_path: 数据表路径，相对路径基于项目根目录
+    :type file_path: str
+    :param format: 数据表格式 ['csv','jsonl','parquet']，默认按扩展名识别
+    :type format: str
+    :param limit: 最多读取的行数
+    :type limit: int
+    """
+    file_path = os.path.join(ROOT_PATH, file_path)
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"{file_path} 不存在！")
+
+    format = format or FORMATS.get(os.path.splitext(file_path)[1].lower())
+    match format:
+        case "csv":
+            rows = _read_csv(file_path)
+        case "jsonl":
+            rows = _read_jsonl(file_path)
+        case "parquet":
+            rows = _read_parquet(file_path)
+        case _:
+            raise ValueError(f"不支持的数据表格式: {format}")
+
+    for index, row in enumerate(rows):
+        if limit is not None and index >= limit:
+            break
+        yield row
+
+
+def open_table(dataset: Union[str, Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """
+    根据用例中的 dataset 配置打开数据表
+
+    >>> dataset: tests/test_data/tables/users.csv
+    >>> dataset: {file: tests/test_data/tables/users.jsonl, limit: 1000}
+
+    :param dataset: 数据表路径或包含 file/format/limit 的字典
+    :type dataset: Union[str, Dict[str, Any]]
+    """
+    if isinstance(dataset, str):
+        return read_table(dataset)
+    return read_table(
+        dataset.get("file"), format=dataset.get("format"), limit=dataset.get("limit")
+    )
@@ -1,7 +1,10 @@
+import time
 import pymysql
-from typing import Dict
+import threading
+from typing import Any, Dict, List, Tuple
 from utils.yaml_parse import load_yaml
 from core.api.settings import DataSource
+from pymysql.constants import CLIENT
 from pymysql import converters, FIELD_TYPE
 
 conv = converters.conversions
@@ -12,27 +15,274 @@ conv[FIELD_TYPE.DATETIME] = str  # convert dates to strings
 conv[FIELD_TYPE.TIME] = str  # convert dates to strings
 
 
+def _is_connection_error(error: Exception) -> bool:
+    """判断是否为连接层面的异常(客户端错误码 >= 2000，如 2006/2013 连接断开)"""
+    if isinstance(error, pymysql.err.InterfaceError):
+        return True
+    if isinstance(error, pymysql.err.OperationalError):
+        return (
+            bool(error.args)
+            and isinstance(error.args[0], int)
+            and error.args[0] >= 2000
+        )
+    return False
+
+
+class PooledConnection:
+    """连接池中的连接及其使用时间信息"""
+
+    def __init__(self, connection: pymysql.connections.Connection):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    def age(self, now: float) -> float:
+        return now - self.created_at
+
+    def idle(self, now: float) -> float:
+        return now - self.last_used
+
+    def close(self):
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """
+    线程安全的有界数据库连接池
+
+    借出前对空闲较久的连接做健康检查，超过空闲时间的连接被回收，
+    超过最大生命周期的连接在归还或借出时重建。
+    ``client_flag`` 作用于池中全部连接，多语句等能力只在专用连接池中开启；
+    通过 ``share`` 创建的连接池与原连接池共用锁与 ``max_size`` 上限，
+    名额用尽时回收对方的空闲连接。
+    """
+
+    # 空闲超过该秒数的连接借出前先 ping 检查
+    health_check_interval = 30
+
+    def __init__(
+        self,
+        config: Dict[str, str],
+        max_size: int = 5,
+        idle_timeout: int = 300,
+        max_lifetime: int = 3600,
+        client_flag: int = 0,
+        share: "ConnectionPool" = None,
+    ):
+        self._config = config
+        self.client_flag = client_flag
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self._idle: List[PooledConnection] = []
+        self._in_use: Dict[int, PooledConnection] = {}
+        self._pending = 0
+        self._condition = share._condition if share else threading.Condition()
+        self._group: List[ConnectionPool] = share._group if share else []
+        self._group.append(self)
+        self._closed = False
+
+    def _create(self) -> PooledConnection:
+        return PooledConnection(
+            pymysql.connect(**self._config, conv=conv, client_flag=self.client_flag)
+        )
+
+    def _expired(self, pooled: PooledConnection, now: float) -> bool:
+        return (
+            pooled.age(now) > self.max_lifetime or pooled.idle(now) > self.idle_timeout
+        )
+
+    def _healthy(self, pooled: PooledConnection, now: float) -> bool:
+        if pooled.idle(now) < self.health_check_interval:
+            return True
+        try:
+            pooled.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _evict(self, now: float) -> List[PooledConnection]:
+        """移除过期的空闲连接，返回待关闭的连接"""
+        expired = [p for p in self._idle if self._expired(p, now)]
+        if expired:
+            self._idle = [p for p in self._idle if p not in expired]
+        return expired
+
+    def acquire(self, timeout: float = 30) -> pymysql.connections.Connection:
+        """
+        借出一个连接，连接池已满时最多等待 timeout 秒
+
+        :param timeout: 等待超时时间(秒)
+        :type timeout: float
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise RuntimeError("连接池已关闭")
+
+                stale = self._evict(time.monotonic())
+                if self._idle:
+                    pooled = self._idle.pop()
+                    self._in_use[id(pooled.connection)] = pooled
+                elif self._total() < self.max_size:
+                    # 预占名额，连接在锁外建立
+                    pooled = None
+                    self._pending += 1
+                elif self._reclaim(stale):
+                    pooled = None
+                    self._pending += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"等待数据库连接超时: {timeout}s")
+                    self._condition.wait(remaining)
+                    continue
+
+            for item in stale:
+                item.close()
+
+            if pooled is None:
+                try:
+                    pooled = self._create()
+                finally:
+                    with self._condition:
+                        self._pending -= 1
+                        if pooled is not None:
+                            self._in_use[id(pooled.connection)] = pooled
+                        self._condition.notify_all()
+                return pooled.connection
+
+            if self._healthy(pooled, time.monotonic()):
+                return pooled.connection
+
+            self.release(pooled.connection, broken=True)
+
+    def release(self, connection: pymysql.connections.Connection, broken=False):
+        """
+        归还连接，损坏或超过最大生命周期的连接直接关闭
+
+        :param connection: 借出的连接
+        :param broken: 连接是否已损坏
+        :type broken: bool
+        """
+        with self._condition:
+            pooled = self._in_use.pop(id(connection), None)
+            if pooled is None:
+                return
+            now = time.monotonic()
+            pooled.last_used = now
+            reuse = not (broken or self._closed or pooled.age(now) > self.max_lifetime)
+            if reuse:
+                self._idle.append(pooled)
+            # 共用锁的连接池中等待者可能属于任一连接池
+            self._condition.notify_all()
+
+        if not reuse:
+            pooled.close()
+
+    def _size(self) -> int:
+        return len(self._idle) + len(self._in_use) + self._pending
+
+    def _total(self) -> int:
+        """共用上限的全部连接池的连接数"""
+        return sum(pool._size() for pool in self._group)
+
+    def _reclaim(self, stale: List[PooledConnection]) -> bool:
+        """从共用上限的其他连接池取出一个空闲连接待关闭，为本池腾出名额"""
+        for pool in self._group:
+            if pool is not self and pool._idle:
+                stale.append(pool._idle.pop(0))
+                return True
+        return False
+
+    def close(self):
+        """关闭全部空闲连接，借出中的连接在归还时关闭"""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._condition.notify_all()
+        for pooled in idle:
+            pooled.close()
+
+
+_pools: Dict[Tuple, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def connection_pool(
+    config: Dict[str, str], dataSource: DataSource, multi_statements: bool = False
+) -> ConnectionPool:
+    """
+    获取数据源对应的连接池，同一数据源在进程内共用一个连接池
+
+    :param config: 数据库连接信息
+    :type config: Dict[str, str]
+    :param dataSource: 数据源对象，提供连接池参数
+    :type dataSource: DataSource
+    :param multi_statements: 是否使用开启多语句的专用连接池，仅用于批量执行；
+        与普通连接池共用 ``pool_size`` 上限
+    :type multi_statements: bool
+    """
+    key = tuple(sorted(config.items()))
+    with _pools_lock:
+        pool = _pools.get((key, multi_statements))
+        if pool is None:
+            # 同一数据源的普通连接池与多语句连接池共用连接数上限
+            pool = ConnectionPool(
+                config,
+                max_size=dataSource.pool_size,
+                idle_timeout=dataSource.idle_timeout,
+                max_lifetime=dataSource.max_lifetime,
+                client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0,
+                share=_pools.get((key, not multi_statements)),
+            )
+            _pools[(key, multi_statements)] = pool
+        return pool
+
+
+def close_pools():
+    """关闭全部连接池"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
 class DBClient:
     """初始一个数据库客户端"""
 
-    def __init__(self, file_path: str = None, dataSource: DataSource = None) -> None:
+    def __init__(
+        self,
+        file_path: str = None,
+        dataSource: DataSource = None,
+        multi_statements: bool = False,
+    ) -> None:
         self._config = (
             self.config(dataSource=dataSource)
             if dataSource
             else self.config(file_path=file_path)
         )
+        # 多语句连接来自专用连接池，普通查询的连接不开启多语句
+        self.multi_statements = multi_statements
+        self._pool = connection_pool(self._config, self._source, multi_statements)
+        self._broken = False
         self.connect = self._connect()
         self.cursor = self._cursor()
 
     def _connect(self):
         """
-        数据库连接
+        从连接池借出数据库连接
 
         :param self: 说明
         """
         try:
             # print("连接数据库")
-            return pymysql.connect(**self._config, conv=conv)
+            return self._pool.acquire()
         except Exception as e:
             raise e
 
@@ -44,16 +294,33 @@ class DBClient:
 
     def close(self):
         """
-        关闭数据库连接
+        归还数据库连接到连接池
 
         :param self: 说明
         """
         # print("关闭数据库连接")
         if self.connect and self.cursor:
             self.cursor.close()
-            self.connect.close()
+            self._pool.release(self.connect, broken=self._broken)
+            self.connect = None
+            self.cursor = None
         return True
 
+    def _rollback(self, error: Exception):
+        """
+        执行失败时回滚事务，连接层面的异常则标记连接已损坏，归还时不再复用
+
+        :param error: 执行异常
+        :type error: Exception
+        """
+        if _is_connection_error(error):
+            self._broken = True
+            return
+        try:
+            self.connect.rollback()
+        except Exception:
+            self._broken = True
+
     def config(
         self,
         file_path: str = None,
@@ -78,6 +345,8 @@ class DBClient:
         else:
             dataSource = dataSource.get(section)
 
+        self._source = dataSource
+
         data = {
             "host": dataSource.host,
             "port": dataSource.port,
@@ -92,6 +361,7 @@ class DBClient:
             self.cursor.execute(sql)
             self.connect.commit()
         except Exception as e:
+            self._rollback(e)
             raise e
         finally:
             self.close()
@@ -101,6 +371,7 @@ class DBClient:
             self.cursor.execute(sql)
             self.connect.commit()
         except Exception as e:
+            self._rollback(e)
             raise e
         finally:
             self.close()
@@ -110,6 +381,7 @@ class DBClient:
             self.cursor.execute(sql)
             self.connect.commit()
         except Exception as e:
+            self._rollback(e)
             raise e
         finally:
             self.close()
@@ -128,19 +400,77 @@ class DBClient:
             self.connect.commit()
             return self.cursor.fetchall() if fetchall else self.cursor.fetchone()
         except Exception as e:
+            self._rollback(e)
             raise e
         finally:
             self.close()
 
+    def query_batch(self, sqls: List[str]) -> List[Any]:
+        """
+        批量查询，全部语句在同一事务中执行；以 ``multi_statements=True`` 创建的客户端
+        以一次多语句请求执行，否则逐条执行
+
+        批量执行失败时在同一连接上逐条执行，以便把异常对应到具体语句。
+
+        :param sqls: sql语句列表
+        :type sqls: List[str]
+        :return: 与sql顺序一致的首行查询结果，执行失败的语句对应其异常
+        :rtype: List[Any]
+        """
+        statements = [sql.strip().rstrip(";") for sql in sqls]
+        try:
+            if self.multi_statements:
+                try:
+                    results = self._execute_multi(statements)
+                except pymysql.err.MySQLError as e:
+                    self._rollback(e)
+                    if self._broken:
+                        raise e
+                    results = self._execute_each(statements)
+            else:
+                results = self._execute_each(statements)
+            self.connect.commit()
+            return results
+        except Exception as e:
+            self._rollback(e)
+            raise e
+        finally:
+            self.close()
+
+    def _execute_multi(self, statements: List[str]) -> List[Any]:
+        self.cursor.execute(";\n".join(statements))
+        results = [self.cursor.fetchone()]
+        while self.cursor.nextset():
+            results.append(self.cursor.fetchone())
+
+        # 语句中包含分号等导致结果集数量不一致时，退回逐条执行
+        if len(results) != len(statements):
+            return self._execute_each(statements)
+        return results
+
+    def _execute_each(self, statements: List[str]) -> List[Any]:
+        results = []
+        for sql in statements:
+            try:
+                self.cursor.execute(sql)
+                results.append(self.cursor.fetchone())
+            except pymysql.err.MySQLError as e:
+                if _is_connection_error(e):
+                    raise
+                results.append(e)
+        return results
+
 
-def db_client(dataSource: DataSource = None):
+def db_client(dataSource: DataSource = None, multi_statements: bool = False):
     """
     创建并初始化一个数据库客户端
 
     :param config: 数据库连接配置信息
     :type config: Dict[str, str]
+    :param multi_statements: 是否使用开启多语句的专用连接，仅用于批量查询
+    :type multi_statements: bool
     """
-    return DBClient(dataSource=dataSource)
+    return DBClient(dataSource=dataSource, multi_statements=multi_statements)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,344 @@
+import os
+import sys
+import math
+import time
+import uuid
+import sqlite3
+import argparse
+import threading
+import statistics
+from root import ROOT_PATH
+from typing import Any, Dict, List, Tuple
+
+# 默认的历史记录数据库
+HISTORY_PATH = os.path.join(ROOT_PATH, ".history", "history.db")
+# 多进程运行时共享的运行编号
+RUN_ID_ENV = "PYTEST_RUN_ID"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    env TEXT NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    env TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    name TEXT,
+    outcome TEXT NOT NULL,
+    status_code INTEGER,
+    size INTEGER,
+    wire_size INTEGER,
+    elapsed REAL,
+    duration REAL,
+    requests INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_case ON results (env, case_id, created_at);
+"""
+# 旧版本数据库中缺少的列
+_MIGRATIONS = {"results": {"wire_size": "INTEGER"}}
+
+
+class ResponseLog:
+    """
+    收集当前测试中每次请求的状态码、响应大小、服务端耗时与实际传输的响应大小
+
+    只在启用后收集，测试结束时由 :meth:`drain` 取出并清空。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._entries: List[Tuple[str, int, int, float, int]] = []
+
+    def add(self, name: str, response: Any):
+        if not self.enabled:
+            return
+        entry = (
+            name,
+            response.status_code,
+            response.size,
+            response.elapsed,
+            response.wire_size,
+        )
+        with self._lock:
+            self._entries.append(entry)
+
+    def drain(self) -> List[Tuple[str, int, int, float, int]]:
+        with self._lock:
+            entries, self._entries = self._entries, []
+        return entries
+
+
+# 全局响应记录
+response_log = ResponseLog()
+
+
+class HistoryStore:
+    """
+    基于SQLite的运行历史，按用例与环境保存每次运行的结果与耗时
+
+    多进程运行时各进程写入同一数据库，使用WAL模式与忙等待避免写冲突。
+    """
+
+    def __init__(self, path: str = HISTORY_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._migrate()
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """为旧版本数据库补充新增的列"""
+        for table, columns in _MIGRATIONS.items():
+            existing = {
+                row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")
+            }
+            for name, kind in columns.items():
+                if name not in existing:
+                    with self.conn:
+                        self.conn.execute(
+                            f"ALTER TABLE {table} ADD COLUMN {name} {kind}"
+                        )
+
+    def start_run(self, env: str, run_id: str = None) -> str:
+        """
+        登记一次运行
+
+        :param env: 环境名称
+        :type env: str
+        :param run_id: 运行编号，多进程运行时由运行器统一分配
+        :type run_id: str
+        :return: 运行编号
+        :rtype: str
+        """
+        run_id = run_id or os.environ.get(RUN_ID_ENV) or uuid.uuid4().hex
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO runs (id, env, started_at) VALUES (?, ?, ?)",
+                (run_id, env, time.time()),
+            )
+        return run_id
+
+    def add_result(
+        self,
+        run_id: str,
+        env: str,
+        case_id: str,
+        outcome: str,
+        duration: float,
+        responses: List[Tuple[str, int, int, float, int]],
+    ):
+        """
+        写入一个测试的结果，测试中有多次请求时响应大小与服务端耗时取总和
+
+        :param case_id: 测试节点ID
+        :type case_id: str
+        :param outcome: 测试结果 ['passed','failed','skipped']
+        :type outcome: str
+        :param duration: 测试耗时(秒)
+        :type duration: float
+        :param responses: 测试中各请求的 (用例名, 状态码, 响应大小, 服务端耗时, 实际传输的响应大小)
+        :type responses: List[Tuple[str, int, int, float, int]]
+        """
+        name = status_code = size = elapsed = wire_size = None
+        if responses:
+            name, status_code = responses[-1][0], responses[-1][1]
+            # 未读取的流式响应没有大小
+            size = sum(r[2] or 0 for r in responses)
+            elapsed = sum(r[3] for r in responses)
+            wire_size = sum(r[4] or 0 for r in responses)
+
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO results (run_id, env, case_id, name, outcome, "
+                "status_code, size, wire_size, elapsed, duration, requests, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    env,
+                    case_id,
+                    name,
+                    outcome,
+                    status_code,
+                    size,
+                    wire_size,
+                    elapsed,
+                    duration,
+                    len(responses),
+                    time.time(),
+                ),
+            )
+
+    def durations(self, env: str, runs: int = 5) -> Dict[str, float]:
+        """
+        最近若干次运行中各测试的耗时中位数
+
+        :param env: 环境名称
+        :type env: str
+        :param runs: 统计的运行次数
+        :type runs: int
+        """
+        rows = self.conn.execute(
+            "SELECT case_id, duration FROM results WHERE env = ? AND run_id IN "
+            "(SELECT id FROM runs WHERE env = ? ORDER BY started_at DESC LIMIT ?)",
+            (env, env, runs),
+        ).fetchall()
+        samples: Dict[str, List[float]] = {}
+        for case_id, duration in rows:
+            if duration is not None:
+                samples.setdefault(case_id, []).append(duration)
+        return {k: statistics.median(v) for k, v in samples.items()}
+
+    def samples(
+        self, env: str, recent: int, baseline: int
+    ) -> Dict[str, Tuple[List[float], List[float]]]:
+        """
+        按运行先后将已通过测试的服务端耗时分为 最近运行 与 基线运行 两组
+
+        :return: 测试节点ID -> (最近运行耗时, 基线运行耗时)
+        """
+        run_ids = [
+            row[0]
+            for row in self.conn.execute(
+                "SELECT id FROM runs WHERE env = ? ORDER BY started_at DESC LIMIT ?",
+                (env, recent + baseline),
+            )
+        ]
+        recent_ids = set(run_ids[:recent])
+
+        groups: Dict[str, Tuple[List[float], List[float]]] = {}
+        placeholders = ",".join("?" * len(run_ids))
+        rows = self.conn.execute(
+            f"SELECT run_id, case_id, elapsed FROM results WHERE env = ? "
+            f"AND outcome = 'passed' AND elapsed IS NOT NULL "
+            f"AND run_id IN ({placeholders})",
+            (env, *run_ids),
+        )
+        for run_id, case_id, elapsed in rows:
+            current, previous = groups.setdefault(case_id, ([], []))
+            (current if run_id in recent_ids else previous).append(elapsed)
+        return groups
+
+    def close(self):
+        self.conn.close()
+
+
+def mann_whitney_u(x: List[float], y: List[float]) -> float:
+    """
+    Mann–Whitney U 检验(正态近似，含同秩修正)，返回 x 整体大于 y 的单侧p值
+
+    :param x: 最近运行的样本
+    :type x: List[float]
+    :param y: 基线运行的样本
+    :type y: List[float]
+    """
+    n1, n2 = len(x), len(y)
+    if not n1 or not n2:
+        return 1.0
+
+    values = sorted([(v, 0) for v in x] + [(v, 1) for v in y])
+    ranks = [0.0] * len(values)
+    ties = 0.0
+    i = 0
+    while i < len(values):
+        j = i
+        while j + 1 < len(values) and values[j + 1][0] == values[i][0]:
+            j += 1
+        rank = (i + j) / 2 + 1
+        for k in range(i, j + 1):
+            ranks[k] = rank
+        count = j - i + 1
+        ties += count**3 - count
+        i = j + 1
+
+    r1 = sum(rank for rank, (_, group) in zip(ranks, values) if group == 0)
+    u1 = r1 - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    # 连续性修正
+    z = (u1 - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def regressions(
+    store: HistoryStore,
+    env: str,
+    recent: int = 3,
+    baseline: int = 10,
+    alpha: float = 0.01,
+    min_ratio: float = 1.1,
+) -> List[Dict[str, Any]]:
+    """
+    检测接口耗时的显著回归：最近运行的耗时显著高于基线运行且中位数增长超过阈值
+
+    :param recent: 最近运行次数
+    :type recent: int
+    :param baseline: 基线运行次数
+    :type baseline: int
+    :param alpha: 显著性水平
+    :type alpha: float
+    :param min_ratio: 中位数增长倍数下限，过滤统计显著但幅度很小的变化
+    :type min_ratio: float
+    """
+    found = []
+    for case_id, (current, previous) in store.samples(env, recent, baseline).items():
+        if len(current) < 2 or len(previous) < 2:
+            continue
+        p_value = mann_whitney_u(current, previous)
+        before, after = statistics.median(previous), statistics.median(current)
+        ratio = after / before if before else math.inf
+        if p_value < alpha and ratio >= min_ratio:
+            found.append(
+                {
+                    "case": case_id,
+                    "baseline_ms": round(before * 1000, 2),
+                    "recent_ms": round(after * 1000, 2),
+                    "ratio": round(ratio, 2),
+                    "p_value": round(p_value, 5),
+                    "samples": [len(current), len(previous)],
+                }
+            )
+    return sorted(found, key=lambda r: r["ratio"], reverse=True)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="接口耗时回归报告")
+    parser.add_argument("-E", dest="env", default="local", help="环境名称")
+    parser.add_argument("--db", default=HISTORY_PATH, help="历史记录数据库")
+    parser.add_argument("--recent", type=int, default=3, help="最近运行次数")
+    parser.add_argument("--baseline", type=int, default=10, help="基线运行次数")
+    parser.add_argument("--alpha", type=float, default=0.01, help="显著性水平")
+    parser.add_argument("--min-ratio", type=float, default=1.1, help="最小增长倍数")
+    parser.add_argument("--fail", action="store_true", help="存在回归时退出码为1")
+    args = parser.parse_args(argv)
+
+    store = HistoryStore(args.db)
+    try:
+        found = regressions(
+            store, args.env, args.recent, args.baseline, args.alpha, args.min_ratio
+        )
+    finally:
+        store.close()
+
+    if not found:
+        print("未发现显著的耗时回归")
+        return 0
+
+    print(f"{'基线(ms)':>10}{'最近(ms)':>10}{'倍数':>8}{'p值':>10}  用例")
+    for r in found:
+        print(
+            f"{r['baseline_ms']:>10}{r['recent_ms']:>10}{r['ratio']:>8}"
+            f"{r['p_value']:>10}  {r['case']}"
+        )
+    return 1 if args.fail else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
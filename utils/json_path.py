@@ -0,0 +1,175 @@
+import re
+import jsonpath
+from functools import lru_cache
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# 编译后的路径步骤类型
+CHILD = "child"
+WILDCARD = "wildcard"
+DESCENDANT = "descendant"
+
+_NAME = re.compile(r"[^.\[\]'\"*()?@,:\s]+")
+_BRACKET = re.compile(r"\[\s*(?:(\d+)|'([^']*)'|\"([^\"]*)\"|(\*))\s*\]")
+
+
+class JsonPath:
+    """
+    编译后的JSONPath表达式
+
+    支持 ``$.a.b`` 、 ``$['a'][0]`` 、 ``$.a[*]`` 与 ``$..key`` 等常用语法，
+    过滤、切片等复杂表达式交由 :mod:`jsonpath` 处理，结果顺序与其保持一致。
+    """
+
+    def __init__(self, expr: str, steps: Optional[Tuple[Tuple[str, Any], ...]]):
+        self.expr = expr
+        self.steps = steps
+
+    @property
+    def compiled(self) -> bool:
+        return self.steps is not None
+
+    @property
+    def descendant_key(self) -> Optional[str]:
+        """表达式形如 ``$..key`` 时返回 key，可直接由键值索引回答"""
+        if self.steps and len(self.steps) == 1 and self.steps[0][0] == DESCENDANT:
+            return self.steps[0][1]
+        return None
+
+    def find(self, data: Any) -> List[Any]:
+        """
+        在数据中查找匹配的值
+
+        :param data: 已解析的JSON数据
+        :type data: Any
+        :return: 匹配值列表，未匹配时返回空列表
+        :rtype: List[Any]
+        """
+        if not self.compiled:
+            return jsonpath.jsonpath(data, self.expr) or []
+
+        if not data:
+            return []
+
+        matches = [data]
+        for kind, arg in self.steps:
+            found = []
+            for node in matches:
+                if kind == CHILD:
+                    if isinstance(node, dict):
+                        if arg in node:
+                            found.append(node[arg])
+                    elif isinstance(node, list) and arg.isdigit():
+                        if int(arg) < len(node):
+                            found.append(node[int(arg)])
+                elif kind == WILDCARD:
+                    if isinstance(node, dict):
+                        found.extend(node.values())
+                    elif isinstance(node, list):
+                        found.extend(node)
+                else:
+                    _descend(node, arg, found)
+            matches = found
+            if not matches:
+                break
+
+        return matches
+
+
+def _descend(node: Any, key: str, found: List[Any]):
+    """按 :mod:`jsonpath` 的递归下降顺序收集 key 对应的值"""
+    if isinstance(node, dict):
+        if key in node:
+            found.append(node[key])
+        for value in node.values():
+            if isinstance(value, (dict, list)):
+                _descend(value, key, found)
+    elif isinstance(node, list):
+        for value in node:
+            if isinstance(value, (dict, list)):
+                _descend(value, key, found)
+
+
+def _parse(expr: str) -> Optional[Tuple[Tuple[str, Any], ...]]:
+    """解析表达式，不支持的语法返回None"""
+    expr = expr.strip()
+    if not expr.startswith("$"):
+        return None
+
+    steps = []
+    position = 1
+    while position < len(expr):
+        if expr.startswith("..", position):
+            position += 2
+            match = _NAME.match(expr, position)
+            if not match:
+                return None
+            steps.append((DESCENDANT, match.group(0)))
+            position = match.end()
+        elif expr[position] == ".":
+            position += 1
+            if expr.startswith("*", position):
+                steps.append((WILDCARD, None))
+                position += 1
+                continue
+            match = _NAME.match(expr, position)
+            if not match:
+                return None
+            steps.append((CHILD, match.group(0)))
+            position = match.end()
+        elif expr[position] == "[":
+            match = _BRACKET.match(expr, position)
+            if not match:
+                return None
+            index, single, double, star = match.groups()
+            # 与 jsonpath 一致，下标同时匹配同名的字典键
+            if index is not None:
+                steps.append((CHILD, index))
+            elif star:
+                steps.append((WILDCARD, None))
+            else:
+                steps.append((CHILD, single if single is not None else double))
+            position = match.end()
+        else:
+            return None
+
+    return tuple(steps)
+
+
+@lru_cache(maxsize=2048)
+def compile_path(expr: str) -> JsonPath:
+    """
+    编译JSONPath表达式，编译结果在整个进程内缓存
+
+    :param expr: JSONPath表达式
+    :type expr: str
+    :rtype: JsonPath
+    """
+    return JsonPath(expr, _parse(expr))
+
+
+def build_key_index(data: Any) -> Dict[str, List[Any]]:
+    """
+    一次遍历建立 key -> 值列表 的索引，等价于对每个 key 执行 ``$..key``
+
+    :param data: 已解析的JSON数据
+    :type data: Any
+    :rtype: Dict[str, List[Any]]
+    """
+    index: Dict[str, List[Any]] = defaultdict(list)
+
+    # 先登记当前节点的全部键值，再依次深入子节点，与递归下降的结果顺序一致
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for key, value in node.items():
+                index[key].append(value)
+            children = node.values()
+        elif isinstance(node, list):
+            children = node
+        else:
+            continue
+        stack.extend(c for c in reversed(list(children)) if isinstance(c, (dict, list)))
+
+    return dict(index)
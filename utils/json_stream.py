@@ -0,0 +1,552 @@
+import re
+import json
+import codecs
+from dataclasses import dataclass, field
+from json.decoder import JSONDecodeError, scanstring
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+from utils.json_path import CHILD, DESCENDANT, WILDCARD, JsonPath, compile_path
+
+# 解析事件类型
+START_MAP = "start_map"
+MAP_KEY = "map_key"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+VALUE = "value"
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER = re.compile(r"-?(?:0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+# 跳过对象或数组时一次匹配除括号外的全部内容，括号可能出现在字符串中
+_SKIP = re.compile(r'(?:[^"{}\[\]]+|"[^"\\]*(?:\\.[^"\\]*)*")*')
+_LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+_DECODER = json.JSONDecoder()
+_PLAIN_KEY = re.compile(r"[A-Za-z0-9_-]+")
+
+# 词法单元类型
+_STRING = "string"
+_SCALAR = "scalar"
+_EOF = "eof"
+
+# 对象或数组没有完整地位于缓冲区中
+NOT_DECODED = object()
+
+
+class JsonEvents:
+    """
+    增量JSON解析器
+
+    逐块读取字节并产出 ``(事件类型, 值)`` ，缓冲区只保留未解析完的数据，
+    内存占用取决于块大小与单个字符串的长度，与文档大小无关。
+
+    收到 ``start_map`` 或 ``start_array`` 后可以调用 :meth:`decode` 整体解析
+    或 :meth:`skip` 跳过该对象或数组，二者都不再产出其内部事件与结束事件。
+    """
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str = "utf-8"):
+        """
+        :param chunks: 响应体字节块，如 ``response.iter_content(65536)``
+        :type chunks: Iterable[bytes]
+        :param encoding: 响应体编码
+        :type encoding: str
+        """
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._consumed = False
+        self._span = (0, 0)
+        self.bytes_read = 0
+
+    def _fill(self) -> bool:
+        """读取下一块数据追加到未解析的缓冲区，没有更多数据时返回False"""
+        if self._eof:
+            return False
+        for chunk in self._chunks:
+            self.bytes_read += len(chunk)
+            text = self._decoder.decode(chunk)
+            if text:
+                self._buffer = self._buffer[self._pos :] + text
+                self._pos = 0
+                return True
+        self._eof = True
+        tail = self._decoder.decode(b"", final=True)
+        self._buffer = self._buffer[self._pos :] + tail
+        self._pos = 0
+        return bool(tail)
+
+    def _error(self, message: str) -> JSONDecodeError:
+        return JSONDecodeError(message, self._buffer, self._pos)
+
+    def _skip_whitespace(self) -> bool:
+        """跳过空白字符，文档已读完时返回False"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return True
+            if not self._fill():
+                return False
+
+    def _token(self) -> Tuple[str, Any]:
+        """读取下一个词法单元，数据不完整时继续读取"""
+        if not self._skip_whitespace():
+            return _EOF, None
+
+        char = self._buffer[self._pos]
+        if char in "{}[],:":
+            self._pos += 1
+            return char, None
+
+        if char == '"':
+            while True:
+                try:
+                    value, self._pos = scanstring(self._buffer, self._pos + 1)
+                    return _STRING, value
+                except JSONDecodeError:
+                    if not self._fill():
+                        raise
+
+        if char in _LITERALS:
+            word, value = _LITERALS[char]
+            while len(self._buffer) - self._pos < len(word) and self._fill():
+                pass
+            if not self._buffer.startswith(word, self._pos):
+                raise self._error("无效的JSON字面量")
+            self._pos += len(word)
+            return _SCALAR, value
+
+        match = _NUMBER.match(self._buffer, self._pos)
+        while self._partial_number(match) and self._fill():
+            match = _NUMBER.match(self._buffer, self._pos)
+        if not match:
+            raise self._error("无效的JSON内容")
+        self._pos = match.end()
+        fraction, exponent = match.groups()
+        number = match.group(0)
+        return _SCALAR, float(number) if fraction or exponent else int(number)
+
+    def _partial_number(self, match: Optional[re.Match]) -> bool:
+        """数字可能被分块截断，如 ``-`` 、 ``1.`` 、 ``1e`` 或恰好位于缓冲区末尾"""
+        if match is None:
+            return len(self._buffer) - self._pos < 2
+        end = match.end()
+        return end == len(self._buffer) or self._buffer[end] in ".eE+-"
+
+    def _token_is(self, char: str) -> bool:
+        """下一个非空白字符为 char 时消费并返回True，否则不移动位置"""
+        self._skip_whitespace()
+        if self._buffer.startswith(char, self._pos):
+            self._pos += 1
+            return True
+        return False
+
+    def _key(self) -> str:
+        kind, key = self._token()
+        if kind != _STRING:
+            raise self._error("对象的键必须是字符串")
+        if self._token()[0] != ":":
+            raise self._error("对象的键后缺少冒号")
+        return key
+
+    def decode(self) -> Any:
+        """
+        刚开始的对象或数组完整地位于缓冲区中时，使用C实现的 :mod:`json` 一次解析，
+        否则返回 :data:`NOT_DECODED` ，继续逐个产出事件
+
+        解析结果的大小不超过缓冲区，内存占用仍与文档大小无关。
+        """
+        start = self._pos - 1
+        try:
+            value, self._pos = _DECODER.raw_decode(self._buffer, start)
+        except JSONDecodeError:
+            return NOT_DECODED
+        self._consumed = True
+        self._span = (start, self._pos)
+        return value
+
+    def decoded_may_contain(self, key: str) -> bool:
+        """
+        上一次整体解析的原文中是否可能含有键 key，在原文中直接查找，避免遍历解析结果
+
+        只对由字母、数字、下划线与连字符组成的键判断，原文含 ``\\u`` 转义时无法判断。
+        """
+        if not _PLAIN_KEY.fullmatch(key):
+            return True
+        start, end = self._span
+        return (
+            self._buffer.find(f'"{key}"', start, end) != -1
+            or self._buffer.find("\\u", start, end) != -1
+        )
+
+    def skip(self):
+        """
+        跳过刚开始的对象或数组：只在C实现的正则中匹配字符串与普通字符，
+        逐个处理的只有括号
+        """
+        depth = 1
+        while depth:
+            self._pos = _SKIP.match(self._buffer, self._pos).end()
+            if self._pos >= len(self._buffer) or self._buffer[self._pos] == '"':
+                # 缓冲区末尾的字符串不完整
+                if not self._fill():
+                    raise self._error("JSON结构不完整")
+                continue
+            depth += 1 if self._buffer[self._pos] in "{[" else -1
+            self._pos += 1
+        self._consumed = True
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        stack: List[str] = []
+        kind, value = self._token()
+        while True:
+            # 读取一个值
+            if kind == "{":
+                yield START_MAP, None
+                if self._consumed:
+                    self._consumed = False
+                elif self._token_is("}"):
+                    yield END_MAP, None
+                else:
+                    stack.append("}")
+                    yield MAP_KEY, self._key()
+                    kind, value = self._token()
+                    continue
+            elif kind == "[":
+                yield START_ARRAY, None
+                if self._consumed:
+                    self._consumed = False
+                elif self._token_is("]"):
+                    yield END_ARRAY, None
+                else:
+                    stack.append("]")
+                    kind, value = self._token()
+                    continue
+            elif kind in (_STRING, _SCALAR):
+                yield VALUE, value
+            else:
+                raise self._error("缺少JSON值")
+
+            # 值结束后读取分隔符或容器结束符
+            while stack:
+                kind, value = self._token()
+                if kind == ",":
+                    if stack[-1] == "}":
+                        yield MAP_KEY, self._key()
+                    kind, value = self._token()
+                    break
+                if kind != stack[-1]:
+                    raise self._error("JSON结构不完整")
+                stack.pop()
+                yield (END_MAP if kind == "}" else END_ARRAY), None
+            else:
+                if self._token()[0] != _EOF:
+                    raise self._error("JSON文档结束后存在多余内容")
+                return
+
+
+Steps = Tuple[Tuple[str, Any], ...]
+
+
+def _advance(steps: Steps, states: FrozenSet[int], is_index: bool, name: Any):
+    """
+    按路径中的一层推进表达式的匹配状态
+
+    状态 i 表示已匹配前 i 个步骤；``..key`` 可以跳过任意层，因此停留在原状态。
+    """
+    advanced = set()
+    for i in states:
+        if i == len(steps):
+            continue
+        kind, arg = steps[i]
+        if kind == DESCENDANT:
+            advanced.add(i)
+            if not is_index and name == arg:
+                advanced.add(i + 1)
+        elif kind == WILDCARD or (str(name) if is_index else name) == arg:
+            advanced.add(i + 1)
+    return frozenset(advanced)
+
+
+def _single(steps: Steps) -> bool:
+    """只由子节点步骤组成的表达式最多只有一个匹配值，找到后即可停止查找"""
+    return all(kind == CHILD for kind, _ in steps)
+
+
+def _may_contain(steps: Steps, events: JsonEvents) -> bool:
+    """最后一步的键不在整体解析的原文中时不可能命中"""
+    kind, arg = steps[-1]
+    if kind == WILDCARD or arg.isdigit():
+        return True
+    return events.decoded_may_contain(arg)
+
+
+def _find_inside(
+    steps: Steps, states: FrozenSet[int], value: Any, events: JsonEvents
+) -> List[Any]:
+    """在已整体解析的对象或数组内查找只由子节点组成的表达式，最多只有一个匹配值"""
+    if not _may_contain(steps, events):
+        return []
+    for i in sorted(states):
+        if i < len(steps):
+            found = JsonPath("", steps[i:]).find(value)
+            if found:
+                return found[:1]
+    return []
+
+
+# 整体解析的对象或数组中没有匹配值
+_MISSING = object()
+
+
+def _prune(value: Any, steps: Steps, states: FrozenSet[int]) -> Any:
+    """保留整体解析的对象或数组中的匹配值及其祖先结构，没有匹配值时返回 _MISSING"""
+    if len(steps) in states:
+        return value
+    if isinstance(value, dict):
+        pruned = {}
+        for key, child in value.items():
+            advanced = _advance(steps, states, False, key)
+            if advanced:
+                kept = _prune(child, steps, advanced)
+                if kept is not _MISSING:
+                    pruned[key] = kept
+        return pruned if pruned else _MISSING
+    if isinstance(value, list):
+        pruned = []
+        for index, child in enumerate(value):
+            advanced = _advance(steps, states, True, index)
+            if advanced:
+                kept = _prune(child, steps, advanced)
+                if kept is not _MISSING:
+                    pruned.extend([None] * (index - len(pruned)))
+                    pruned.append(kept)
+        return pruned if pruned else _MISSING
+    return _MISSING
+
+
+class _Tree:
+    """
+    按文档顺序还原全部匹配值及其祖先结构，其余节点省略，数组中省略的元素以 None 占位
+
+    省略的节点不是匹配值，也不在到达匹配值的路径上，在还原的结构上执行表达式，
+    匹配值与顺序都与在完整文档上执行时一致。
+    """
+
+    def __init__(self):
+        self.root = None
+
+    def insert(self, location: List[List[Any]], value: Any):
+        """
+        :param location: 值所在的每一层 [是否为数组, 键名或下标]
+        :type location: List[List[Any]]
+        :param value: 匹配值或只含匹配值的结构
+        :type value: Any
+        """
+        if not location:
+            self.root = value
+            return
+        if self.root is None:
+            self.root = [] if location[0][0] else {}
+        node = self.root
+        for depth, (is_index, name) in enumerate(location):
+            if depth == len(location) - 1:
+                child = value
+            else:
+                child = [] if location[depth + 1][0] else {}
+            if is_index:
+                node.extend([None] * (name - len(node)))
+                if len(node) == name:
+                    node.append(child)
+                node = node[name]
+            else:
+                node = node.setdefault(name, child)
+
+
+class _Builder:
+    """从事件中还原命中路径但无法整体解析的大对象或数组"""
+
+    def __init__(self, root: Any, exprs: List[str], top_key: str):
+        self.root = root
+        self.exprs = exprs
+        self.top_key = top_key
+        self._stack = [root]
+        self._key = None
+
+    def feed(self, event: str, value: Any) -> bool:
+        """处理一个事件，对象或数组还原完成时返回True"""
+        if event == MAP_KEY:
+            self._key = value
+            return False
+        if event in (END_MAP, END_ARRAY):
+            self._stack.pop()
+            return not self._stack
+
+        item = {} if event == START_MAP else [] if event == START_ARRAY else value
+        parent = self._stack[-1]
+        if isinstance(parent, dict):
+            parent[self._key] = item
+        else:
+            parent.append(item)
+        if event in (START_MAP, START_ARRAY):
+            self._stack.append(item)
+        return False
+
+
+@dataclass
+class StreamResult:
+    """流式解析结果"""
+
+    # 表达式 -> 匹配值列表，与 :meth:`JsonPath.find` 的结果与顺序一致
+    found: Dict[str, List[Any]] = field(default_factory=dict)
+    # 命中的顶层字段
+    top: Dict[str, Any] = field(default_factory=dict)
+    # 已读取的字节数
+    bytes_read: int = 0
+    # 是否读取了完整的文档
+    complete: bool = False
+
+
+def scan(
+    chunks: Iterable[bytes], exprs: Iterable[str], encoding: str = "utf-8"
+) -> StreamResult:
+    """
+    边读取边解析JSON，查找各表达式的匹配值
+
+    只由子节点步骤组成的表达式(如 ``$.a.b`` 、 ``$.a[0]`` )最多只有一个匹配值，
+    全部找到后立即停止读取；含 ``..`` 或 ``*`` 的表达式需要读取完整文档，
+    收集全部匹配值及其祖先结构，最后在还原的结构上执行表达式，
+    结果与顺序与非流式的 :meth:`ResponseView.find` 一致。
+
+    外层结构逐个事件解析，完整位于缓冲区中的对象或数组整体解析后查找；
+    不可能包含任何匹配值的大对象或数组直接跳过。
+
+    :param chunks: 响应体字节块
+    :type chunks: Iterable[bytes]
+    :param exprs: JSONPath表达式，只支持 ``$.a.b`` 、 ``$.a[0]`` 、 ``$.a[*]`` 与 ``$..key``
+    :type exprs: Iterable[str]
+    :param encoding: 响应体编码
+    :type encoding: str
+    :rtype: StreamResult
+    """
+    pending: Dict[str, Steps] = {}
+    # 可能有多个匹配值的表达式，读取完整文档后在还原的结构上查找
+    trees: Dict[str, _Tree] = {}
+    for expr in exprs:
+        path = compile_path(expr)
+        if not path.compiled:
+            raise ValueError(f"流式模式不支持的JSONPath表达式: {expr}")
+        pending[expr] = path.steps
+        if not _single(path.steps):
+            trees[expr] = _Tree()
+
+    result = StreamResult()
+    events = JsonEvents(chunks, encoding)
+    # 当前所在的每一层：[是否为数组, 键名或下标]，以及进入该层时各表达式的匹配状态
+    location: List[List[Any]] = []
+    parents: List[Dict[str, FrozenSet[int]]] = [
+        {expr: frozenset([0]) for expr in pending}
+    ]
+    builders: List[_Builder] = []
+
+    def resolve(exprs: List[str], value: Any, top_key: str):
+        for expr in exprs:
+            result.found[expr] = [value]
+        if top_key is not None:
+            result.top[top_key] = value
+
+    def feed(event: str, value: Any) -> List[_Builder]:
+        active = []
+        for builder in builders:
+            if builder.feed(event, value):
+                resolve(builder.exprs, builder.root, builder.top_key)
+            else:
+                active.append(builder)
+        return active
+
+    for event, value in events:
+        if event == MAP_KEY:
+            location[-1][1] = value
+            builders = feed(event, value)
+        elif event in (END_MAP, END_ARRAY):
+            location.pop()
+            parents.pop()
+            builders = feed(event, value)
+        else:
+            if location and location[-1][0]:
+                location[-1][1] += 1
+
+            states = parents[-1]
+            if location:
+                is_index, name = location[-1]
+                states = {
+                    expr: _advance(pending[expr], states[expr], is_index, name)
+                    for expr in pending
+                }
+            top_key = None
+            if len(location) == 1 and not location[0][0]:
+                top_key = location[0][1]
+            matched = [e for e in pending if len(pending[e]) in states[e]]
+
+            if event != VALUE:
+                # 不可能包含任何匹配值的对象或数组直接跳过
+                inside = any(i < len(pending[e]) for e in pending for i in states[e])
+                if not (matched or inside or builders):
+                    events.skip()
+                    continue
+                # 根节点始终逐个事件解析
+                if location:
+                    decoded = events.decode()
+                    if decoded is not NOT_DECODED:
+                        event, value = VALUE, decoded
+
+            # 先把当前事件交给进行中的还原，再登记新的还原
+            builders = feed(event, value)
+
+            single = [e for e in matched if e not in trees]
+            for expr in single:
+                del pending[expr]
+            if matched and event == VALUE:
+                resolve(single, value, top_key)
+                for expr in matched:
+                    if expr in trees:
+                        trees[expr].insert(location, value)
+            elif matched:
+                root = {} if event == START_MAP else []
+                builders.append(_Builder(root, single, top_key))
+                for expr in matched:
+                    if expr in trees:
+                        trees[expr].insert(location, root)
+
+            if event == VALUE and isinstance(value, (dict, list)):
+                for expr in list(pending):
+                    steps = pending[expr]
+                    if expr in matched:
+                        continue
+                    if expr in trees:
+                        if _may_contain(steps, events):
+                            kept = _prune(value, steps, states[expr])
+                            if kept is not _MISSING:
+                                trees[expr].insert(location, kept)
+                        continue
+                    found = _find_inside(steps, states[expr], value, events)
+                    if found:
+                        del pending[expr]
+                        resolve([expr], found[0], None)
+            elif event != VALUE:
+                location.append([event == START_ARRAY, -1])
+                # 已整体命中的表达式不再查找其内部，内部的匹配值已包含在还原的值中
+                parents.append(
+                    {e: frozenset() if e in matched else s for e, s in states.items()}
+                )
+
+        if not pending and not builders:
+            break
+
+    for expr, tree in trees.items():
+        path = compile_path(expr)
+        result.found[expr] = path.find(tree.root) if tree.root is not None else []
+
+    # 提前停止时仍处于某个容器内部
+    result.complete = not location
+    result.bytes_read = events.bytes_read
+    return result
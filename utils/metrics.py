@@ -0,0 +1,193 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
+
+# 直方图分桶上界(秒)
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """固定分桶的耗时直方图，同时记录次数、总和与最值"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "min": round(self.min or 0.0, 6),
+            "max": round(self.max, 6),
+        }
+
+
+class MetricsRegistry:
+    """
+    进程内指标注册表
+
+    记录计数器与耗时直方图，按指标名与标签聚合，内存占用与样本数量无关；
+    会话结束时导出为 JSON 或 Prometheus 文本格式。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """
+        记录一次耗时
+
+        :param name: 指标名，如 executor_phase_seconds
+        :type name: str
+        :param value: 耗时(秒)
+        :type value: float
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels: Any):
+        """
+        累加计数器
+
+        :param name: 指标名，如 executor_cases_total
+        :type name: str
+        :param value: 增量
+        :type value: float
+        """
+        key = self._key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """使用 perf_counter 计时代码块，异常退出时同样记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def __bool__(self) -> bool:
+        return bool(self._histograms or self._counters)
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """导出为 指标名 -> [{labels, 统计值}] 结构"""
+        with self._lock:
+            result = {
+                name: [
+                    {"labels": dict(key), **histogram.to_dict()}
+                    for key, histogram in series.items()
+                ]
+                for name, series in self._histograms.items()
+            }
+            for name, series in self._counters.items():
+                result[name] = [
+                    {"labels": dict(key), "value": value}
+                    for key, value in series.items()
+                ]
+        return result
+
+    def to_prometheus(self) -> str:
+        """导出为 Prometheus 文本格式"""
+        lines = []
+        with self._lock:
+            for name, series in self._histograms.items():
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    bounds = [str(b) for b in histogram.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, histogram.counts):
+                        cumulative += count
+                        labels = _labels(key + (("le", bound),))
+                        lines.append(f"{name}_bucket{labels} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(key)} {histogram.sum}")
+                    lines.append(f"{name}_count{_labels(key)} {histogram.count}")
+            for name, series in self._counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: str, name: str = "metrics") -> List[str]:
+        """
+        将指标写入 <name>.json 与 <name>.prom
+
+        :param directory: 输出目录
+        :type directory: str
+        :param name: 文件名(不含扩展名)
+        :type name: str
+        :return: 写入的文件路径
+        :rtype: List[str]
+        """
+        os.makedirs(directory, exist_ok=True)
+        json_path = os.path.join(directory, f"{name}.json")
+        prom_path = os.path.join(directory, f"{name}.prom")
+        with open(json_path, mode="w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        with open(prom_path, mode="w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        return [json_path, prom_path]
+
+
+def _labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in key
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# 全局指标注册表
+metrics = MetricsRegistry()
@@ -0,0 +1,244 @@
+import os
+import hashlib
+import time
+import uuid
+import mimetypes
+from root import ROOT_PATH
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, Union
+
+# 每次从文件读取的块大小
+CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class FilePart:
+    """
+    待上传的文件
+
+    Yaml中可以直接写文件路径，也可以写成字典指定文件名与类型::
+
+        files:
+          file: tests/test_data/files/a.txt
+          images:
+            - path: tests/test_data/files/b.png
+              filename: avatar.png
+              content_type: image/png
+    """
+
+    field: str
+    path: str
+    filename: str = None
+    content_type: str = None
+
+    def __post_init__(self):
+        self.path = os.path.join(ROOT_PATH, self.path)
+        if self.filename is None:
+            self.filename = os.path.basename(self.path)
+        if self.content_type is None:
+            guessed = mimetypes.guess_type(self.filename)[0]
+            self.content_type = guessed or "application/octet-stream"
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+
+def parse_files(files: Dict[str, Any]) -> List[FilePart]:
+    """
+    解析Yaml中的上传文件配置，同一字段可以上传多个文件
+
+    :param files: 字段名与 文件路径、文件配置字典 或二者列表组成的字典
+    :type files: Dict[str, Any]
+    """
+    parts = []
+    for name, specs in files.items():
+        for spec in specs if isinstance(specs, list) else [specs]:
+            if isinstance(spec, dict):
+                parts.append(FilePart(field=name, **spec))
+            else:
+                parts.append(FilePart(field=name, path=str(spec)))
+    return parts
+
+
+# 与浏览器一致(HTML5)的字段名与文件名转义
+_QUOTE = {ord('"'): "%22", ord("\\"): "\\\\"}
+_QUOTE.update({c: f"%{c:02X}" for c in range(0x20) if c != 0x1B})
+
+
+def _quote(value: str) -> str:
+    return value.translate(_QUOTE)
+
+
+class MultipartEncoder:
+    """
+    流式 multipart/form-data 请求体
+
+    实现 ``read`` 与 ``__len__`` ，requests 据此设置 Content-Length 并分块发送，
+    文件内容按 ``chunk_size`` 读取，内存占用与文件大小无关。
+    同一时刻只打开一个文件，读完即关闭；:meth:`close` 关闭未读完的文件。
+    """
+
+    def __init__(
+        self,
+        files: Dict[str, Any],
+        fields: Dict[str, Any] = None,
+        chunk_size: int = CHUNK_SIZE,
+    ):
+        """
+        :param files: Yaml中的上传文件配置
+        :type files: Dict[str, Any]
+        :param fields: 普通表单字段
+        :type fields: Dict[str, Any]
+        :param chunk_size: 文件读取块大小
+        :type chunk_size: int
+        """
+        self.boundary = uuid.uuid4().hex
+        self.chunk_size = chunk_size
+        self.files = parse_files(files)
+
+        # 请求体由 字节片段 与 文件 依次组成
+        self._segments: List[Union[bytes, FilePart]] = []
+        for name, values in (fields or {}).items():
+            for value in values if isinstance(values, list) else [values]:
+                self._segments.append(
+                    self._header(name) + str(value).encode("utf-8") + b"\r\n"
+                )
+        for part in self.files:
+            self._segments.append(
+                self._header(part.field, part.filename, part.content_type)
+            )
+            self._segments.append(part)
+            self._segments.append(b"\r\n")
+        self._segments.append(f"--{self.boundary}--\r\n".encode())
+
+        self.length = sum(
+            s.size if isinstance(s, FilePart) else len(s) for s in self._segments
+        )
+
+        self._index = 0
+        self._offset = 0
+        self._file: BinaryIO = None
+        self.bytes_read = 0
+        self.started: float = None
+        self.finished: float = None
+
+    def _header(self, name: str, filename: str = None, content_type: str = None):
+        disposition = f'form-data; name="{_quote(name)}"'
+        if filename is not None:
+            disposition += f'; filename="{_quote(filename)}"'
+        lines = [f"--{self.boundary}", f"Content-Disposition: {disposition}"]
+        if content_type is not None:
+            lines.append(f"Content-Type: {content_type}")
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self.length
+
+    def fingerprint(self) -> str:
+        """
+        不读取文件内容的请求体摘要
+
+        由表单字段、文件的字段名、文件名、类型与大小计算，随机分隔符不参与计算。
+        """
+        digest = hashlib.sha1()
+        boundary = self.boundary.encode()
+        for segment in self._segments:
+            if isinstance(segment, FilePart):
+                digest.update(str(segment.size).encode())
+            else:
+                digest.update(segment.replace(boundary, b"boundary"))
+        return digest.hexdigest()
+
+    def _next_chunk(self, size: int) -> bytes:
+        """读取当前片段中不超过 size 字节的数据，当前片段读完时切换到下一片段"""
+        segment = self._segments[self._index]
+        if isinstance(segment, bytes):
+            chunk = segment[self._offset : self._offset + size]
+            self._offset += len(chunk)
+            if self._offset >= len(segment):
+                self._index, self._offset = self._index + 1, 0
+            return chunk
+
+        if self._file is None:
+            self._file = open(segment.path, "rb")
+        chunk = self._file.read(size)
+        if len(chunk) < size:
+            self._file.close()
+            self._file = None
+            self._index += 1
+        return chunk
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        读取请求体
+
+        :param size: 最大字节数，小于0时按块大小读取
+        :type size: int
+        """
+        if self.started is None:
+            self.started = time.perf_counter()
+        size = self.chunk_size if size is None or size < 0 else size
+
+        chunks, remaining = [], size
+        while remaining > 0 and self._index < len(self._segments):
+            chunk = self._next_chunk(remaining)
+            chunks.append(chunk)
+            remaining -= len(chunk)
+
+        data = b"".join(chunks)
+        self.bytes_read += len(data)
+        if self._index >= len(self._segments) and self.finished is None:
+            self.finished = time.perf_counter()
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            chunk = self.read(self.chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+    def stats(self) -> Dict[str, Any]:
+        """上传统计：文件数、字节数、耗时与吞吐量"""
+        end = self.finished or time.perf_counter()
+        seconds = end - self.started if self.started else 0.0
+        return {
+            "files": len(self.files),
+            "bytes": self.bytes_read,
+            "seconds": round(seconds, 6),
+            "mb_per_second": (
+                round(self.bytes_read / seconds / 1024 / 1024, 3) if seconds else None
+            ),
+        }
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "MultipartEncoder":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def multipart_headers(
+    encoder: MultipartEncoder, headers: Dict[str, Any] = None
+) -> Dict[str, Any]:
+    """
+    使用请求体的 Content-Type 替换请求头中原有的 Content-Type
+
+    :param encoder: 流式请求体
+    :type encoder: MultipartEncoder
+    :param headers: 原请求头
+    :type headers: Dict[str, Any]
+    """
+    merged = {k: v for k, v in (headers or {}).items() if k.lower() != "content-type"}
+    merged["Content-Type"] = encoder.content_type
+    return merged
@@ -0,0 +1,179 @@
+import os
+import sys
+import uuid
+import shutil
+import argparse
+import tempfile
+import subprocess
+from pathlib import Path
+from root import ROOT_PATH
+from typing import List
+from utils import sharding
+from utils.history import RUN_ID_ENV, HistoryStore
+from utils.shared_cache import SHARED_CACHE_ENV, WORKER_ENV
+
+# 与 pytest.ini 保持一致的报告目录
+REPORT_PATH = Path(ROOT_PATH) / "report"
+ALLURE_RESULTS = REPORT_PATH / "allure-results"
+COVERAGE_REPORT = REPORT_PATH / "cov-report"
+
+
+def collect(pytest_args: List[str]) -> List[str]:
+    """
+    收集测试用例节点ID
+
+    :param pytest_args: 传递给 pytest 的参数
+    :type pytest_args: List[str]
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "pytest", "-o", "addopts=", "--collect-only", "-q"]
+        + pytest_args,
+        cwd=ROOT_PATH,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode not in (0, 5):
+        raise RuntimeError(f"收集测试用例失败:\n{result.stdout}\n{result.stderr}")
+    return [line for line in result.stdout.splitlines() if "::" in line]
+
+
+def _is_path(arg: str) -> bool:
+    return not arg.startswith("-") and os.path.exists(
+        os.path.join(ROOT_PATH, arg.split("::")[0])
+    )
+
+
+def partition(
+    nodeids: List[str], workers: int, env: str, slowest_first: bool = False
+) -> List[List[str]]:
+    """按历史耗时均衡分配测试用例，同一测试类中的用例分配到同一进程"""
+    store = HistoryStore()
+    try:
+        durations = store.durations(env)
+    finally:
+        store.close()
+    buckets = [
+        sharding.plan(nodeids, durations, (index, workers), slowest_first)
+        for index in range(1, workers + 1)
+    ]
+    return [bucket for bucket in buckets if bucket]
+
+
+def run(
+    pytest_args: List[str],
+    workers: int = None,
+    coverage: bool = True,
+    slowest_first: bool = False,
+) -> int:
+    """
+    多进程运行测试，各进程共享登录令牌等提取变量，报告与覆盖率合并输出
+
+    :param pytest_args: 传递给 pytest 的参数，如 ["-E", "local", "-m", "demo"]
+    :type pytest_args: List[str]
+    :param workers: 进程数，默认为CPU核数
+    :type workers: int
+    :param coverage: 是否统计并合并覆盖率
+    :type coverage: bool
+    :param slowest_first: 各进程内耗时最长的用例组优先执行
+    :type slowest_first: bool
+    :return: 退出码，全部进程通过时为0
+    :rtype: int
+    """
+    workers = workers or os.cpu_count() or 1
+    if "-E" not in pytest_args:
+        # 与 pytest.ini 中的默认环境保持一致
+        pytest_args = ["-E", "local"] + pytest_args
+    nodeids = collect(pytest_args)
+    if not nodeids:
+        print("未收集到测试用例")
+        return 5
+
+    # 各进程只执行分配到的节点ID，去掉参数中的测试路径
+    options = [arg for arg in pytest_args if not _is_path(arg)]
+
+    # 报告目录只在开始时清理一次，各进程写入同一目录
+    shutil.rmtree(ALLURE_RESULTS, ignore_errors=True)
+    ALLURE_RESULTS.mkdir(parents=True, exist_ok=True)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="pytest-parallel-"))
+    env = dict(os.environ)
+    env[SHARED_CACHE_ENV] = str(work_dir / "shared_cache.json")
+    # 各进程的结果记入同一次运行历史
+    env[RUN_ID_ENV] = uuid.uuid4().hex
+
+    processes = []
+    env_name = pytest_args[pytest_args.index("-E") + 1]
+    buckets = partition(nodeids, workers, env_name, slowest_first)
+    for index, bucket in enumerate(buckets):
+        args_file = work_dir / f"worker-{index}.args"
+        args_file.write_text("\n".join(bucket), encoding="utf-8")
+        log_file = open(work_dir / f"worker-{index}.log", mode="w", encoding="utf-8")
+
+        command = [sys.executable, "-m", "pytest", "-o", "addopts=", "-v", "-s"]
+        command += options + ["--alluredir", str(ALLURE_RESULTS), f"@{args_file}"]
+
+        worker_env = dict(env)
+        worker_env[WORKER_ENV] = str(index)
+        if coverage:
+            # 覆盖率阈值只在合并后检查
+            command += ["--cov=.", "--cov-config=.coveragerc", "--cov-report="]
+            command += ["--cov-fail-under=0"]
+            worker_env["COVERAGE_FILE"] = str(Path(ROOT_PATH) / f".coverage.{index}")
+
+        process = subprocess.Popen(
+            command,
+            cwd=ROOT_PATH,
+            env=worker_env,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+        )
+        processes.append((index, process, log_file, len(bucket)))
+
+    exit_code = 0
+    for index, process, log_file, count in processes:
+        code = process.wait()
+        log_file.close()
+        print(f"====== worker-{index}: {count} 个用例, 退出码 {code} ======")
+        print(Path(log_file.name).read_text(encoding="utf-8"))
+        # 没有收集到用例(5)不视为失败
+        if code not in (0, 5) and not exit_code:
+            exit_code = code
+
+    if coverage:
+        _combine_coverage()
+
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return exit_code
+
+
+def _combine_coverage():
+    """合并各进程的覆盖率数据并输出报告"""
+    commands = [
+        ["combine", "--rcfile=.coveragerc"],
+        ["report", "--rcfile=.coveragerc"],
+        ["html", "--rcfile=.coveragerc", "-d", str(COVERAGE_REPORT)],
+    ]
+    for command in commands:
+        subprocess.run([sys.executable, "-m", "coverage"] + command, cwd=ROOT_PATH)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="多进程运行测试，未识别的参数原样传递给 pytest"
+    )
+    parser.add_argument("-n", "--workers", type=int, default=None, help="进程数")
+    parser.add_argument("--no-cov", action="store_true", help="不统计覆盖率")
+    parser.add_argument(
+        "--slowest-first", action="store_true", help="耗时最长的用例组优先执行"
+    )
+    args, pytest_args = parser.parse_known_args(argv)
+    return run(
+        pytest_args,
+        workers=args.workers,
+        coverage=not args.no_cov,
+        slowest_first=args.slowest_first,
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import heapq
+import statistics
+from typing import Dict, List, Tuple
+
+# 没有任何历史耗时时使用的默认耗时(秒)
+DEFAULT_DURATION = 1.0
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """
+    解析分片参数，如 ``2/4`` 表示共4个分片中的第2个
+
+    :param text: 分片参数
+    :type text: str
+    :return: (分片序号(从1开始), 分片总数)
+    :rtype: Tuple[int, int]
+    """
+    try:
+        index, total = (int(v) for v in text.split("/"))
+    except ValueError:
+        raise ValueError(f"分片参数格式应为 i/n: {text}")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"分片序号超出范围: {text}")
+    return index, total
+
+
+def group_key(nodeid: str) -> str:
+    """
+    同一测试类(或模块级测试函数所在的文件)内的用例通过上下文变量串联，
+    作为整体分配，保持原有执行顺序
+    """
+    return nodeid.rsplit("::", 1)[0]
+
+
+def estimate(nodeids: List[str], durations: Dict[str, float]) -> Dict[str, float]:
+    """
+    估算每个用例的耗时，没有历史记录的用例使用已知耗时的中位数
+
+    :param nodeids: 用例节点ID
+    :type nodeids: List[str]
+    :param durations: 历史耗时
+    :type durations: Dict[str, float]
+    """
+    known = [durations[n] for n in nodeids if n in durations]
+    default = statistics.median(known) if known else DEFAULT_DURATION
+    return {n: durations.get(n, default) for n in nodeids}
+
+
+def plan(
+    nodeids: List[str],
+    durations: Dict[str, float],
+    shard: Tuple[int, int] = None,
+    slowest_first: bool = False,
+) -> List[str]:
+    """
+    按历史耗时分片与排序
+
+    分片采用最长处理时间优先(LPT)装箱：按耗时从大到小依次放入当前总耗时最小的分片；
+    ``slowest_first`` 时分片内耗时最长的用例组最先执行。
+
+    :param nodeids: 按收集顺序排列的用例节点ID
+    :type nodeids: List[str]
+    :param durations: 历史耗时(秒)
+    :type durations: Dict[str, float]
+    :param shard: (分片序号, 分片总数)，为空时不分片
+    :type shard: Tuple[int, int]
+    :param slowest_first: 是否耗时最长的用例组优先执行
+    :type slowest_first: bool
+    :return: 当前分片中按执行顺序排列的用例节点ID
+    :rtype: List[str]
+    """
+    cost = estimate(nodeids, durations)
+
+    groups: Dict[str, List[str]] = {}
+    for nodeid in nodeids:
+        groups.setdefault(group_key(nodeid), []).append(nodeid)
+    weight = {key: sum(cost[n] for n in members) for key, members in groups.items()}
+    order = {key: index for index, key in enumerate(groups)}
+
+    selected = list(groups)
+    if shard:
+        index, total = shard
+        heap = [(0.0, i) for i in range(total)]
+        assigned: List[List[str]] = [[] for _ in range(total)]
+        for key in sorted(groups, key=lambda k: (-weight[k], order[k])):
+            load, i = heapq.heappop(heap)
+            assigned[i].append(key)
+            heapq.heappush(heap, (load + weight[key], i))
+        selected = sorted(assigned[index - 1], key=order.get)
+
+    if slowest_first:
+        selected.sort(key=lambda k: (-weight[k], order[k]))
+
+    return [nodeid for key in selected for nodeid in groups[key]]
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+# 多进程运行时共享缓存文件路径的环境变量
+SHARED_CACHE_ENV = "PYTEST_SHARED_CACHE"
+# 多进程运行时的进程编号
+WORKER_ENV = "PYTEST_WORKER"
+
+
+class FileLock:
+    """
+    基于 O_CREAT | O_EXCL 锁文件的跨进程互斥锁
+
+    持有锁期间后台线程定期更新锁文件的修改时间，锁内执行耗时较长的操作(如登录)时
+    锁不会被其他进程误判为失效；持有锁的进程异常退出后不再更新，
+    超过 ``stale`` 秒的锁文件视为失效并被清理。
+    """
+
+    def __init__(self, path: str, timeout: float = 60, stale: float = 120):
+        self.path = str(path)
+        self.timeout = timeout
+        self.stale = stale
+        self._held: threading.Event = None
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                self._start_heartbeat()
+                return
+            except FileExistsError:
+                self._remove_stale()
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"获取文件锁超时: {self.path}")
+            time.sleep(0.05)
+
+    def _remove_stale(self):
+        try:
+            if time.time() - os.path.getmtime(self.path) > self.stale:
+                os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _start_heartbeat(self):
+        """每隔 stale/4 秒更新锁文件的修改时间，直到释放锁"""
+        self._held = held = threading.Event()
+
+        def beat():
+            while not held.wait(self.stale / 4):
+                try:
+                    os.utime(self.path)
+                except FileNotFoundError:
+                    return
+
+        threading.Thread(target=beat, name="file-lock-heartbeat", daemon=True).start()
+
+    def release(self):
+        if self._held is not None:
+            self._held.set()
+            self._held = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class SharedCache:
+    """
+    多进程共享的过期变量缓存
+
+    以JSON文件保存 key -> {value, expires_at}，读写均在文件锁内完成；
+    :meth:`get_or_create` 在锁内执行生成函数，同一时刻只有一个进程会执行登录等操作。
+    """
+
+    def __init__(self, path: str, lock_timeout: float = 60):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = FileLock(f"{self.path}.lock", timeout=lock_timeout)
+
+    @classmethod
+    def from_env(cls) -> "SharedCache":
+        """多进程运行器设置了共享缓存路径时返回缓存，否则返回None"""
+        path = os.environ.get(SHARED_CACHE_ENV)
+        return cls(path) if path else None
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.path, mode="r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _dump(self, data: Dict[str, Any]):
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, mode="w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _valid(self, entry: Dict[str, Any]) -> bool:
+        return entry is not None and (
+            entry["expires_at"] is None or entry["expires_at"] > time.time()
+        )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        读取未过期的缓存值
+
+        :param key: 缓存键
+        :type key: str
+        """
+        with self.lock:
+            entry = self._load().get(key)
+        return entry["value"] if self._valid(entry) else default
+
+    def set(self, key: str, value: Any, ttl: float = None):
+        """
+        写入缓存值，值需可被JSON序列化
+
+        :param key: 缓存键
+        :type key: str
+        :param value: 缓存值
+        :type value: Any
+        :param ttl: 有效期(秒)，为空时不过期
+        :type ttl: float
+        """
+        with self.lock:
+            self._set(key, value, ttl)
+
+    def _set(self, key: str, value: Any, ttl: float = None):
+        data = {k: v for k, v in self._load().items() if self._valid(v)}
+        data[key] = {
+            "value": value,
+            "expires_at": time.time() + ttl if ttl else None,
+        }
+        self._dump(data)
+
+    def get_or_create(
+        self, key: str, factory: Callable[[], Any], ttl: float = None
+    ) -> tuple:
+        """
+        读取缓存值，缓存不存在或已过期时在锁内调用 ``factory`` 生成并写入
+
+        :param key: 缓存键
+        :type key: str
+        :param factory: 生成缓存值的函数，抛出异常时不写入缓存
+        :type factory: Callable[[], Any]
+        :param ttl: 有效期(秒)
+        :type ttl: float
+        :return: (缓存值, 是否命中缓存)
+        :rtype: tuple
+        """
+        with self.lock:
+            entry = self._load().get(key)
+            if self._valid(entry):
+                return entry["value"], True
+            value = factory()
+            self._set(key, value, ttl)
+            return value, False
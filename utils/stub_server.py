@@ -0,0 +1,138 @@
+import json
+import time
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from typing import Any, Dict, List, Tuple, Union
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.yaml_parse import read_yaml
+
+
+@dataclass
+class Route:
+    """
+    桩服务路由
+
+    ``payload_size`` 大于0时在响应体中追加 ``payload`` 字段，使响应体约为指定字节数；
+    ``latency`` 为响应前等待的毫秒数。
+    """
+
+    path: str
+    method: str = "GET"
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Any = field(default_factory=dict)
+    payload_size: int = 0
+    latency: float = 0
+
+    def __post_init__(self):
+        self.method = self.method.upper()
+        self.content = self._render()
+
+    def _render(self) -> bytes:
+        """响应体在加载路由时生成一次，请求时直接写出"""
+        body = self.body
+        if self.payload_size and isinstance(body, dict):
+            size = len(json.dumps(body).encode("utf-8"))
+            body = {**body, "payload": "x" * max(self.payload_size - size - 15, 0)}
+        if isinstance(body, (dict, list)):
+            self.headers.setdefault("Content-Type", "application/json")
+            return json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.headers.setdefault("Content-Type", "text/plain; charset=utf-8")
+        return str(body).encode("utf-8")
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与响应体合并写出并关闭 Nagle 算法，避免延迟确认带来的额外等待
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    routes: Dict[Tuple[str, str], Route] = {}
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        route = self.routes.get((self.command, urlsplit(self.path).path.lstrip("/")))
+        if route is None:
+            self._write(404, {"Content-Type": "application/json"}, b'{"code":404}')
+            return
+        if route.latency:
+            time.sleep(route.latency / 1000)
+        self._write(route.status, route.headers, route.content)
+
+    def _write(self, status: int, headers: Dict[str, str], content: bytes):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    进程内桩服务，路由与响应在YAML中声明
+
+    >>> - path: api/user/login
+    >>>   method: POST
+    >>>   body: {status: 1, data: {token: {access_token: Bearer x}}}
+    >>>   payload_size: 4096
+    >>>   latency: 5
+
+    可作为上下文管理器使用，退出时关闭服务。
+    """
+
+    def __init__(
+        self,
+        routes: Union[str, List[Dict[str, Any]]],
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        :param routes: 路由YAML文件路径或路由列表
+        :type routes: Union[str, List[Dict[str, Any]]]
+        :param host: 监听地址
+        :type host: str
+        :param port: 监听端口，0表示随机端口
+        :type port: int
+        """
+        if isinstance(routes, str):
+            routes = read_yaml(routes)
+        table = {}
+        for item in routes:
+            route = Route(**item)
+            table[(route.method, route.path.lstrip("/"))] = route
+
+        handler = type("StubHandler", (_StubHandler,), {"routes": table})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread: threading.Thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name="stub-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -4,6 +4,9 @@ from pathlib import Path
 from root import ROOT_PATH
 from typing import Any, Dict
 
+# 优先使用 libyaml 提供的 C 解析器
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 
 class YAMLParser:
     """YAML文件解析类"""
@@ -34,24 +37,39 @@ class YAMLParser:
             if file_path
             else self._set_full_path__(self.file_path)
         )
-        case_list = []
         with open(file=file_path, mode="r", encoding=self.encoding) as f:
-            data = yaml.safe_load(f)
-            if isinstance(data, list) and len(data) <= 1:
-                info = data[0].get("info")
-                cases = data[0].get("cases")
+            return self.normalize(yaml.load(f, Loader=SafeLoader), file_path)
 
-                if not info and not cases:
-                    return data
+    def normalize(self, data: Any, file_path: str = None) -> Any:
+        """
+        将 info + cases 结构的流程文件展开为 [info, case] 列表，其他结构原样返回
 
-                for case in cases:
-                    _case = [info, case]
-                    case_list.append(_case)
+        每个步骤的 info 中加入流程标识(文件路径)、步骤序号与步骤总数，
+        按步骤分别执行时据此区分不同的流程。
 
-                return case_list
-            else:
+        :param data: yaml解析结果
+        :type data: Any
+        :param file_path: 流程文件路径
+        :type file_path: str
+        """
+        case_list = []
+        if isinstance(data, list) and len(data) <= 1:
+            info = data[0].get("info")
+            cases = data[0].get("cases")
+
+            if not info and not cases:
                 return data
 
+            for index, case in enumerate(cases):
+                step = info
+                if isinstance(info, dict):
+                    step = dict(info, flow=file_path, step=index, steps=len(cases))
+                case_list.append([step, case])
+
+            return case_list
+        else:
+            return data
+
     def read_by_section(
         self, file_path: str = None, section: str = None
     ) -> Dict[str, Any]: